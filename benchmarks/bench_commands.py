@@ -0,0 +1,190 @@
+"""End-to-end benchmarks for every CLI command on a synthetic repository.
+
+Generates a repository with ``synthetic_repo.py``, then times ``init``,
+``status``, ``preamble``, ``log-query``, ``logs search`` and ``update`` in
+fresh interpreters, plus the scanner in-process. Each scenario is measured
+cold (AI/.cache and AI/index removed before every run) and warm (caches left
+from the previous run).
+
+Results can be written as JSON and compared against an earlier run, failing
+when a median regresses by more than ``--tolerance`` percent.
+
+Usage:
+    python benchmarks/bench_commands.py [--files 2000] [--runs 5] [--json out.json]
+        [--compare baseline.json] [--tolerance 25] [--only preamble,scanner]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic_repo import RepoSpec, generate  # noqa: E402
+
+
+CLI = [sys.executable, "-m", "ai_assist.cli"]
+
+# name -> CLI arguments
+COMMANDS = {
+    "init": ["init", "--force"],
+    "status": ["status"],
+    "preamble": ["preamble", "--topic", "billing"],
+    "log-query": ["log-query", "--model", "bench", "--prompt", "How is billing done?",
+                  "--response", "Through the invoice service.", "--topic", "billing"],
+    "logs-search": ["logs", "search", "invoice", "--limit", "20"],
+    "update": ["update", "--set", "project.description=benchmark run"],
+}
+
+
+def clear_caches(root: Path) -> None:
+    """Remove every derived cache so the next command starts cold."""
+    for name in (".cache", "index"):
+        shutil.rmtree(root / "AI" / name, ignore_errors=True)
+
+
+def time_runs(fn: Callable[[], None], runs: int, reset: Optional[Callable[[], None]] = None) -> List[float]:
+    """Time ``fn`` ``runs`` times in milliseconds, calling ``reset`` before each run."""
+    timings = []
+    for _ in range(runs):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run_cli(root: Path, args: List[str]) -> None:
+    subprocess.run(CLI + args, cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+
+def scan(root: Path, cold: bool) -> None:
+    """Run the scanner in-process, with or without the persisted index."""
+    from ai_assist.scanner import FileIndex, get_index_path, scan_project
+
+    index = FileIndex(get_index_path(root)) if cold else FileIndex.load(get_index_path(root))
+    scan_project(root, index)
+    index.save()
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    return {
+        "min_ms": round(min(timings), 2),
+        "median_ms": round(statistics.median(timings), 2),
+        "max_ms": round(max(timings), 2),
+    }
+
+
+def run(root: Path, runs: int, only: Optional[List[str]] = None) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Benchmark every selected scenario in an already generated repository."""
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    run_cli(root, ["init"])
+
+    for name, args in COMMANDS.items():
+        if only and name not in only:
+            continue
+        cold = time_runs(lambda: run_cli(root, args), runs, reset=lambda: clear_caches(root))
+        run_cli(root, args)  # populate caches
+        warm = time_runs(lambda: run_cli(root, args), runs)
+        results[name] = {"cold": summarize(cold), "warm": summarize(warm)}
+
+    if not only or "scanner" in only:
+        cold = time_runs(lambda: scan(root, cold=True), runs)
+        warm = time_runs(lambda: scan(root, cold=False), runs)
+        results["scanner"] = {"cold": summarize(cold), "warm": summarize(warm)}
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Print median deltas against a baseline and return regressed scenarios."""
+    regressions = []
+    for name, modes in results.items():
+        for mode, summary in modes.items():
+            before = baseline.get("results", {}).get(name, {}).get(mode)
+            if not before:
+                continue
+            delta = (summary["median_ms"] - before["median_ms"]) / max(before["median_ms"], 1e-9) * 100
+            flag = ""
+            if delta > tolerance:
+                flag = "  <-- regression"
+                regressions.append(f"{name}/{mode}")
+            print(f"{name:>12} {mode:>4}: {before['median_ms']:9.1f} -> {summary['median_ms']:9.1f} ms "
+                  f"({delta:+.1f}%){flag}")
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        output = subprocess.run(["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.strip() or None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    defaults = RepoSpec(log_records=5000)
+    for field_name, value in asdict(defaults).items():
+        parser.add_argument(f"--{field_name.replace('_', '-')}", type=int, default=value,
+                            help=f"Synthetic repo {field_name.replace('_', ' ')} (default: {value})")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario and mode")
+    parser.add_argument("--only", help="Comma-separated scenarios to run (default: all)")
+    parser.add_argument("--repo", help="Generate into (and keep) this directory instead of a temp dir")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=25.0,
+                        help="Allowed median slowdown in percent before --compare fails")
+    options = parser.parse_args()
+
+    spec = RepoSpec(**{name: getattr(options, name) for name in asdict(defaults)})
+    only = options.only.split(",") if options.only else None
+
+    workdir = Path(options.repo) if options.repo else Path(tempfile.mkdtemp(prefix="ai-assist-bench-"))
+    try:
+        start = time.perf_counter()
+        counts = generate(workdir, spec)
+        print(f"Generated {counts} in {time.perf_counter() - start:.1f}s at {workdir}", file=sys.stderr)
+        results = run(workdir, options.runs, only)
+    finally:
+        if not options.repo:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    for name, modes in results.items():
+        print(f"{name:>12}: cold {modes['cold']['median_ms']:9.1f} ms   warm {modes['warm']['median_ms']:9.1f} ms")
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "spec": asdict(spec),
+        "runs": options.runs,
+        "results": results,
+    }
+    if options.json_path:
+        with open(options.json_path, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+    if options.compare:
+        with open(options.compare) as handle:
+            regressions = compare(results, json.load(handle), options.tolerance)
+        if regressions:
+            print(f"Regressions beyond {options.tolerance}%: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
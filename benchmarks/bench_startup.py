@@ -0,0 +1,96 @@
+"""Cold-start latency benchmark for the ai-assist CLI.
+
+Runs ``ai-assist --version`` and ``ai-assist status`` in fresh interpreters
+and reports min/median wall time. Use ``--max-ms`` to fail when the median
+regresses past a threshold (e.g. in CI).
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 20] [--max-ms 100] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+SCENARIOS = {
+    "version": ["--version"],
+    "status": ["status"],
+}
+
+
+def time_command(args: List[str], cwd: str, runs: int) -> List[float]:
+    """Run the CLI ``runs`` times and return wall times in milliseconds."""
+    command = [sys.executable, "-m", "ai_assist.cli", *args]
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run(runs: int) -> Dict[str, Dict[str, float]]:
+    """Benchmark every scenario inside a throwaway initialized project."""
+    results = {}
+    with tempfile.TemporaryDirectory() as project:
+        Path(project, "README.md").write_text("# Benchmark project\n")
+        subprocess.run([sys.executable, "-m", "ai_assist.cli", "init"], cwd=project,
+                       stdout=subprocess.DEVNULL, check=True)
+
+        # Interpreter startup alone, as a baseline for the CLI numbers
+        baseline = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+            baseline.append((time.perf_counter() - start) * 1000)
+        results["python"] = _summarize(baseline)
+
+        for name, args in SCENARIOS.items():
+            # One warm-up run populates caches in AI/.cache
+            time_command(args, project, 1)
+            results[name] = _summarize(time_command(args, project, runs))
+    return results
+
+
+def _summarize(timings: List[float]) -> Dict[str, float]:
+    return {
+        "min_ms": round(min(timings), 2),
+        "median_ms": round(statistics.median(timings), 2),
+        "max_ms": round(max(timings), 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Runs per scenario")
+    parser.add_argument("--max-ms", type=float, help="Fail if a CLI scenario's median exceeds this")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    options = parser.parse_args()
+
+    results = run(options.runs)
+    for name, summary in results.items():
+        print(f"{name:>10}: median {summary['median_ms']:.1f} ms (min {summary['min_ms']:.1f} ms)")
+
+    if options.json_path:
+        with open(options.json_path, "w") as handle:
+            json.dump({"python": sys.version.split()[0], "platform": os.uname().sysname, "results": results},
+                      handle, indent=2)
+
+    if options.max_ms is not None:
+        slow = [name for name in SCENARIOS if results[name]["median_ms"] > options.max_ms]
+        if slow:
+            print(f"Startup regression: {', '.join(slow)} exceeded {options.max_ms} ms", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Synthetic repository generator for benchmarks.
+
+Builds a deterministic project tree of configurable size: source files
+(Python, TypeScript, Go, Markdown) spread over nested packages, bulky
+ignored directories (``node_modules``, ``.venv``, ``build``) that a correct
+walker must prune, a ``.gitignore``, and optionally a pre-filled query log.
+
+Usage:
+    python benchmarks/synthetic_repo.py OUT_DIR [--files 2000] [--depth 4]
+        [--ignored-files 2000] [--log-records 10000] [--seed 0]
+"""
+
+import argparse
+import random
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List
+
+
+WORDS = (
+    "account api auth batch billing buffer cache client config context customer "
+    "data event export feature file handler index invoice job ledger log model "
+    "notify order parser payment policy query queue record report request "
+    "response route schema search session shipment stream task token user "
+    "validator webhook worker"
+).split()
+
+TOPICS = ("api", "billing", "auth", "search", "storage", "frontend", "testing")
+MODELS = ("gpt-4o", "claude-3-5-sonnet", "llama-3-70b")
+
+
+@dataclass
+class RepoSpec:
+    """Shape of a synthetic repository."""
+
+    files: int = 2000
+    depth: int = 4
+    lines: int = 120
+    ignored_files: int = 2000
+    log_records: int = 0
+    seed: int = 0
+
+
+def _name(rng: random.Random, parts: int = 2) -> str:
+    return "_".join(rng.choice(WORDS) for _ in range(parts))
+
+
+def _python_file(rng: random.Random, lines: int) -> str:
+    out = [f'"""{_name(rng).replace("_", " ").capitalize()} utilities."""', "", "import os", ""]
+    while len(out) < lines:
+        cls = "".join(word.capitalize() for word in _name(rng).split("_"))
+        out += [f"class {cls}:", f'    """Manage {_name(rng, 1)} records."""', ""]
+        for _ in range(rng.randint(2, 5)):
+            method = _name(rng)
+            out += [
+                f"    def {method}(self, {_name(rng, 1)}, limit: int = 10) -> list:",
+                f'        """Return {_name(rng, 1)} entries for {method}."""',
+                f"        items = [x for x in range(limit) if x % {rng.randint(2, 9)}]",
+                "        return items",
+                "",
+            ]
+    return "\n".join(out[:lines]) + "\n"
+
+
+def _typescript_file(rng: random.Random, lines: int) -> str:
+    out = [f"import {{ {_name(rng, 1)} }} from './{_name(rng, 1)}';", ""]
+    while len(out) < lines:
+        name = "".join(word.capitalize() for word in _name(rng).split("_"))
+        out += [f"export interface {name}Props {{", f"  {_name(rng, 1)}: string;", "}", ""]
+        out += [f"export class {name}Service {{"]
+        for _ in range(rng.randint(2, 4)):
+            out += [
+                f"  async {_name(rng, 1)}{name}(id: string): Promise<{name}Props> {{",
+                f"    return fetch(`/api/{_name(rng, 1)}/${{id}}`).then((r) => r.json());",
+                "  }",
+            ]
+        out += ["}", ""]
+    return "\n".join(out[:lines]) + "\n"
+
+
+def _go_file(rng: random.Random, lines: int) -> str:
+    out = [f"package {_name(rng, 1)}", "", 'import "fmt"', ""]
+    while len(out) < lines:
+        name = "".join(word.capitalize() for word in _name(rng).split("_"))
+        out += [f"type {name} struct {{", f"\t{_name(rng, 1).capitalize()} string", "}", ""]
+        out += [
+            f"func (s *{name}) Handle{name}(id string) error {{",
+            f'\tfmt.Println("{_name(rng)}", id)',
+            "\treturn nil",
+            "}",
+            "",
+        ]
+    return "\n".join(out[:lines]) + "\n"
+
+
+def _markdown_file(rng: random.Random, lines: int) -> str:
+    out = [f"# {_name(rng).replace('_', ' ').title()}", ""]
+    while len(out) < lines:
+        out += [f"## {_name(rng).replace('_', ' ').title()}", ""]
+        out += [" ".join(rng.choice(WORDS) for _ in range(14)) + ".", ""]
+    return "\n".join(out[:lines]) + "\n"
+
+
+GENERATORS = (
+    (".py", _python_file, 5),
+    (".ts", _typescript_file, 2),
+    (".go", _go_file, 1),
+    (".md", _markdown_file, 1),
+)
+
+
+def _directories(rng: random.Random, spec: RepoSpec) -> List[Path]:
+    """A pool of nested package directories to spread files over."""
+    dirs = [Path("src")]
+    for _ in range(max(spec.files // 20, 1)):
+        parent = rng.choice(dirs)
+        if len(parent.parts) < spec.depth:
+            dirs.append(parent / _name(rng, 1))
+    return dirs
+
+
+def generate(root: Path, spec: RepoSpec) -> Dict[str, int]:
+    """Write a synthetic repository under ``root``.
+
+    Args:
+        root: Target directory (created if missing)
+        spec: Repository shape
+
+    Returns:
+        Dict[str, int]: Counts of what was written
+    """
+    rng = random.Random(spec.seed)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "README.md").write_text("# Synthetic benchmark project\n\nGenerated for ai-assist benchmarks.\n")
+    (root / ".gitignore").write_text("build/\n*.log\n.venv/\nnode_modules/\n")
+
+    kinds = [(suffix, fn) for suffix, fn, weight in GENERATORS for _ in range(weight)]
+    dirs = _directories(rng, spec)
+    written = 0
+    for number in range(spec.files):
+        suffix, fn = rng.choice(kinds)
+        directory = root / rng.choice(dirs)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{_name(rng)}_{number}{suffix}").write_text(fn(rng, spec.lines))
+        written += 1
+
+    ignored = 0
+    for number in range(spec.ignored_files):
+        base = rng.choice(("node_modules", ".venv/lib/site-packages", "build"))
+        directory = root / base / _name(rng, 1) / _name(rng, 1)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"dep_{number}.js").write_text("module.exports = function () { return 42; };\n" * 20)
+        ignored += 1
+
+    if spec.log_records:
+        _write_logs(root, rng, spec.log_records)
+
+    return {"files": written, "ignored_files": ignored, "log_records": spec.log_records}
+
+
+def _write_logs(root: Path, rng: random.Random, count: int) -> None:
+    """Pre-fill the query log through the real LogStore."""
+    from ai_assist.logstore import LogStore
+
+    store = LogStore.for_project(root, compression="gzip")
+    batch = []
+    for number in range(count):
+        batch.append({
+            "model": rng.choice(MODELS),
+            "topic": rng.choice(TOPICS),
+            "prompt": f"How does {_name(rng)} interact with {_name(rng)}? ({number})",
+            "response": " ".join(rng.choice(WORDS) for _ in range(40)),
+        })
+        if len(batch) == 1000:
+            store.append_many(batch)
+            batch = []
+    if batch:
+        store.append_many(batch)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir", help="Directory to create the repository in")
+    defaults = RepoSpec()
+    for field_name, value in asdict(defaults).items():
+        parser.add_argument(f"--{field_name.replace('_', '-')}", type=int, default=value)
+    options = parser.parse_args()
+
+    spec = RepoSpec(**{name: getattr(options, name) for name in asdict(defaults)})
+    counts = generate(Path(options.out_dir), spec)
+    print(", ".join(f"{value} {name.replace('_', ' ')}" for name, value in counts.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
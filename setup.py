@@ -5,14 +5,19 @@ setup(
     version="0.1.0",
     packages=find_packages(where="src"),
     package_dir={"": "src"},
+    package_data={"ai_assist": ["builtin_templates/*.j2"]},
     install_requires=[
         "click>=8.0.0",
         "pyyaml>=6.0",
         "jinja2>=3.0.0",
     ],
+    extras_require={
+        "zstd": ["zstandard>=0.21"],
+        "vectors": ["numpy>=1.22"],
+    },
     entry_points={
         "console_scripts": [
-            "ai-assist=ai_assist.cli:main",
+            "ai-assist=ai_assist.client:run",
         ],
     },
     python_requires=">=3.10",
@@ -0,0 +1,250 @@
+"""Run one ai-assist command across many projects in parallel.
+
+Every project runs in its own ``ai-assist`` subprocess started in the
+project root, so a crash, a hang or process-wide state (working directory,
+caches, environment) in one project never affects another. A pool of
+threads keeps up to ``workers`` subprocesses running; each is killed, with
+its whole process group, once it exceeds the per-project timeout.
+"""
+
+import glob
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from .core import AIAssistError, validate_project_root
+
+
+# Commands that make sense to run unattended across projects
+BATCH_COMMANDS = ("status", "init", "preamble", "update")
+
+# Captured output kept per project in the report (the tail is kept)
+OUTPUT_LIMIT = 16 * 1024
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timeout"
+STATUS_INVALID = "invalid"
+
+
+@dataclass
+class ProjectResult:
+    """Outcome of running the batch command in one project."""
+
+    root: str
+    status: str
+    exit_code: Optional[int] = None
+    duration: float = 0.0
+    stdout: str = ""
+    stderr: str = ""
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchReport:
+    """Aggregated results of a batch run."""
+
+    command: str
+    args: List[str]
+    workers: int
+    timeout: Optional[float]
+    duration: float = 0.0
+    projects: List[ProjectResult] = field(default_factory=list)
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """Number of projects per status."""
+        counts = {status: 0 for status in (STATUS_OK, STATUS_FAILED, STATUS_TIMEOUT, STATUS_INVALID)}
+        for result in self.projects:
+            counts[result.status] += 1
+        return counts
+
+    @property
+    def ok(self) -> bool:
+        """True if the command succeeded in every project."""
+        return all(result.status == STATUS_OK for result in self.projects)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the report as JSON-serializable data."""
+        return {
+            "command": self.command,
+            "args": self.args,
+            "workers": self.workers,
+            "timeout": self.timeout,
+            "duration": round(self.duration, 3),
+            "summary": self.counts,
+            "projects": [asdict(result) for result in self.projects],
+        }
+
+
+def expand_roots(paths: Iterable[str], patterns: Iterable[str] = ()) -> List[str]:
+    """Expand explicit paths and glob patterns into candidate directories.
+
+    Args:
+        paths: Project root paths, used as given
+        patterns: Glob patterns (``~`` and ``**`` are supported)
+
+    Returns:
+        List[str]: Candidates in input order, without duplicates
+    """
+    candidates = list(paths)
+    for pattern in patterns:
+        matches = sorted(glob.glob(os.path.expanduser(pattern), recursive=True))
+        candidates.extend(match for match in matches if os.path.isdir(match))
+
+    seen = set()
+    unique = []
+    for candidate in candidates:
+        key = os.path.realpath(candidate)
+        if key not in seen:
+            seen.add(key)
+            unique.append(candidate)
+    return unique
+
+
+def validate_root(path: str) -> Path:
+    """Validate one candidate root.
+
+    Raises:
+        AIAssistError: If the path is not a directory or not inside a project
+    """
+    if not os.path.isdir(path):
+        raise AIAssistError(f"'{path}' is not a directory")
+    return validate_project_root(path)
+
+
+def _tail(data: bytes) -> str:
+    text = data.decode("utf-8", errors="replace")
+    return text if len(text) <= OUTPUT_LIMIT else text[-OUTPUT_LIMIT:]
+
+
+def _kill_group(process: subprocess.Popen) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, AttributeError):
+        process.kill()
+
+
+def run_project(root: Path, argv: Sequence[str], timeout: Optional[float] = None) -> ProjectResult:
+    """Run ``ai-assist <argv>`` in one project root.
+
+    Args:
+        root: Validated project root (the working directory of the command)
+        argv: Arguments after the program name
+        timeout: Seconds before the command is killed; None waits forever
+
+    Returns:
+        ProjectResult: Exit status, duration and captured output
+    """
+    start = time.perf_counter()
+    try:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "ai_assist.cli", *argv],
+            cwd=str(root),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,  # Own process group, so a timeout kills pool workers too
+        )
+    except OSError as e:
+        return ProjectResult(str(root), STATUS_FAILED, error=f"Cannot start ai-assist: {e}")
+
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+        timed_out = False
+    except subprocess.TimeoutExpired:
+        _kill_group(process)
+        stdout, stderr = process.communicate()
+        timed_out = True
+
+    result = ProjectResult(
+        str(root),
+        STATUS_OK if process.returncode == 0 else STATUS_FAILED,
+        exit_code=process.returncode,
+        duration=round(time.perf_counter() - start, 3),
+        stdout=_tail(stdout),
+        stderr=_tail(stderr),
+    )
+    if timed_out:
+        result.status = STATUS_TIMEOUT
+        result.error = f"Timed out after {timeout:g}s"
+    return result
+
+
+def run_batch(
+    roots: Sequence[str],
+    command: str,
+    args: Sequence[str] = (),
+    workers: int = 4,
+    timeout: Optional[float] = None,
+    jobs: Optional[int] = None,
+    on_result: Optional[Callable[[ProjectResult], None]] = None,
+) -> BatchReport:
+    """Run a command in every project concurrently.
+
+    Args:
+        roots: Candidate project roots (see ``expand_roots``)
+        command: One of ``BATCH_COMMANDS``
+        args: Extra arguments for the command
+        workers: Maximum number of projects processed at once
+        timeout: Per-project timeout in seconds
+        jobs: ``--jobs`` for each project's file pipeline. Defaults to the
+            CPU count divided by ``workers``, so workers do not oversubscribe.
+        on_result: Called with each result as soon as it is available
+
+    Returns:
+        BatchReport: Results in the order of ``roots``
+
+    Raises:
+        AIAssistError: If the command is not supported
+    """
+    if command not in BATCH_COMMANDS:
+        raise AIAssistError(f"Unsupported batch command '{command}'. Choose from: {', '.join(BATCH_COMMANDS)}")
+
+    report = BatchReport(command, list(args), workers, timeout)
+    start = time.perf_counter()
+    if jobs is None:
+        jobs = max(1, (os.cpu_count() or 1) // workers)
+    argv = ["--jobs", str(jobs), command, *args]
+
+    results: List[Optional[ProjectResult]] = [None] * len(roots)
+    tasks = []
+    seen = set()
+    for position, candidate in enumerate(roots):
+        try:
+            root = validate_root(candidate)
+        except AIAssistError as e:
+            results[position] = ProjectResult(str(candidate), STATUS_INVALID, error=str(e))
+            continue
+        if root in seen:
+            # Two candidates inside the same project: run it once
+            results[position] = ProjectResult(
+                str(candidate), STATUS_INVALID, error=f"Duplicate of project root '{root}'"
+            )
+            continue
+        seen.add(root)
+        tasks.append((position, root))
+
+    if on_result is not None:
+        for result in results:
+            if result is not None:
+                on_result(result)
+
+    if tasks:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_project, root, argv, timeout): position for position, root in tasks}
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                if on_result is not None:
+                    on_result(result)
+
+    report.projects = [result for result in results if result is not None]
+    report.duration = time.perf_counter() - start
+    return report
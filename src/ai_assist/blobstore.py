@@ -0,0 +1,317 @@
+"""Content-addressed, deduplicating blob store for large logged text.
+
+Bodies are split into content-defined chunks, and each distinct chunk is
+stored once, compressed, under ``AI/blobs/chunks``. A blob is a manifest
+listing its chunk digests, stored under ``AI/blobs/manifests`` and named by
+the digest of the whole body. Storing the same preamble with a different
+question at the end writes only the chunks around the change plus a small
+manifest.
+
+Chunk boundaries are anchored to line ends: after at least
+``MIN_CHUNK_BYTES``, a chunk ends at the first line whose CRC-32 hits the
+boundary mask. Boundaries therefore depend on content rather than offsets,
+so an insertion only changes the chunks around it. Over-long lines are
+split at ``MAX_CHUNK_BYTES``. Hashing per line (in C) rather than per byte
+with a rolling hash keeps chunking fast in pure Python.
+
+Layout::
+
+    AI/blobs/chunks/ab/cdef...     codec byte + compressed chunk
+    AI/blobs/manifests/12/3456...  concatenated 16-byte chunk digests
+"""
+
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+
+from .core import AIAssistError, get_ai_directory_path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+MIN_CHUNK_BYTES = 2 * 1024
+MAX_CHUNK_BYTES = 64 * 1024
+
+# A line ends a chunk when crc32(line) & BOUNDARY_MASK == 0 (about one line in 64)
+BOUNDARY_MASK = 0x3F
+
+DIGEST_SIZE = 16
+
+# Decompressed chunks kept in memory for reads
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+
+_CODEC_NONE = b"n"
+_CODEC_ZLIB = b"z"
+_CODEC_ZSTD = b"s"
+
+
+class BlobStoreError(AIAssistError):
+    """Raised when a blob cannot be stored or read."""
+    pass
+
+
+def _is_hex(text: str) -> bool:
+    try:
+        bytes.fromhex(text)
+    except ValueError:
+        return False
+    return True
+
+
+def get_blobs_directory_path(project_root: Union[str, Path]) -> Path:
+    """Get the path to the blob store.
+
+    Args:
+        project_root: Path to the project root
+
+    Returns:
+        Path: Path to AI/blobs (may not exist yet)
+    """
+    return get_ai_directory_path(project_root) / "blobs"
+
+
+def digest(data: bytes) -> str:
+    """Return the hex content digest used for chunk and blob ids."""
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+
+
+def split_chunks(data: bytes) -> Iterator[bytes]:
+    """Split bytes into content-defined chunks.
+
+    Args:
+        data: Bytes to split
+
+    Yields:
+        bytes: Consecutive chunks that concatenate back to ``data``
+    """
+    start = 0
+    position = 0
+    size = len(data)
+    while position < size:
+        end = data.find(b"\n", position)
+        end = size if end < 0 else end + 1
+        if end - start > MAX_CHUNK_BYTES:
+            # Over-long line: cut at the size limit
+            end = start + MAX_CHUNK_BYTES
+            yield data[start:end]
+            start = position = end
+            continue
+        if end - start >= MIN_CHUNK_BYTES and zlib.crc32(data[position:end]) & BOUNDARY_MASK == 0:
+            yield data[start:end]
+            start = end
+        position = end
+    if start < size:
+        yield data[start:]
+
+
+class BlobStore:
+    """Deduplicating chunk store with compressed, content-addressed files."""
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        compression: str = "auto",
+        cache_bytes: int = DEFAULT_CACHE_BYTES,
+    ):
+        self.directory = Path(directory)
+        if compression == "auto":
+            compression = "zstd" if zstandard is not None else "zlib"
+        if compression == "zstd" and zstandard is None:
+            raise BlobStoreError("zstd compression requires the 'zstandard' package")
+        if compression not in ("zstd", "zlib", "none"):
+            raise BlobStoreError(f"Unknown blob compression '{compression}'")
+        self.compression = compression
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        self.chunks_written = 0
+        self.bytes_written = 0
+
+    @classmethod
+    def for_project(cls, project_root: Union[str, Path], **kwargs) -> "BlobStore":
+        """Create a store for a project's ``AI/blobs`` directory."""
+        return cls(get_blobs_directory_path(project_root), **kwargs)
+
+    # -- paths -----------------------------------------------------------
+
+    def _chunk_path(self, chunk_id: str) -> Path:
+        return self.directory / "chunks" / chunk_id[:2] / chunk_id[2:]
+
+    def _manifest_path(self, blob_id: str) -> Path:
+        return self.directory / "manifests" / blob_id[:2] / blob_id[2:]
+
+    # -- writing ---------------------------------------------------------
+
+    def put(self, data: Union[bytes, str], fsync: bool = False, written: Optional[List[Path]] = None) -> str:
+        """Store a body and return its blob id.
+
+        Bodies already in the store cost one hash and one ``stat``; new
+        bodies only write chunks that are not stored yet.
+
+        Args:
+            data: Body to store (text is encoded as UTF-8)
+            fsync: Flush new files to stable storage before returning
+            written: If given, new files and directories are appended to it
+                so a batch can flush them all with one ``sync`` call
+
+        Returns:
+            str: Blob id (hex digest of the body)
+
+        Raises:
+            BlobStoreError: If the blob cannot be written
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        blob_id = digest(data)
+        manifest_path = self._manifest_path(blob_id)
+        if manifest_path.exists():
+            return blob_id
+
+        manifest = bytearray()
+        try:
+            for chunk in split_chunks(data):
+                chunk_digest = hashlib.blake2b(chunk, digest_size=DIGEST_SIZE).digest()
+                manifest += chunk_digest
+                chunk_path = self._chunk_path(chunk_digest.hex())
+                if not chunk_path.exists():
+                    self._write(chunk_path, self._compress(chunk), fsync, written)
+                    self.chunks_written += 1
+            # Written last: a manifest only exists once all of its chunks do
+            self._write(manifest_path, bytes(manifest), fsync, written)
+        except OSError as e:
+            raise BlobStoreError(f"Failed to store blob in '{self.directory}': {e}")
+        return blob_id
+
+    def _write(self, path: Path, data: bytes, fsync: bool, written: Optional[List[Path]] = None) -> None:
+        """Write a content-addressed file; concurrent writers produce identical bytes."""
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            handle = open(tmp_path, "wb")
+        except FileNotFoundError:
+            if written is not None:
+                missing = path.parent
+                while not missing.exists():
+                    written.append(missing)
+                    missing = missing.parent
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(tmp_path, "wb")
+        try:
+            with handle:
+                handle.write(data)
+                if fsync:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            raise
+        if written is not None:
+            written.append(path)
+        self.bytes_written += len(data)
+
+    def sync(self, written: Iterable[Path]) -> None:
+        """Flush files and directories collected by ``put(written=...)``.
+
+        Each path is flushed, then each directory holding one, so the new
+        directory entries are durable too.
+
+        Raises:
+            BlobStoreError: If a file cannot be flushed
+        """
+        paths = list(dict.fromkeys(written))
+        for path in paths + [d for d in dict.fromkeys(p.parent for p in paths) if d not in paths]:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                if path.is_dir():
+                    continue  # Directories cannot be flushed on every platform
+                raise BlobStoreError(f"Failed to flush '{path}': {e}")
+
+    def _compress(self, chunk: bytes) -> bytes:
+        if self.compression == "zstd":
+            return _CODEC_ZSTD + zstandard.ZstdCompressor().compress(chunk)
+        if self.compression == "zlib":
+            return _CODEC_ZLIB + zlib.compress(chunk, 6)
+        return _CODEC_NONE + chunk
+
+    # -- reading ---------------------------------------------------------
+
+    def exists(self, blob_id: str) -> bool:
+        """Return True if a blob is stored."""
+        return self._manifest_path(blob_id).exists()
+
+    def chunk_ids(self, blob_id: str) -> List[str]:
+        """Return the chunk ids of a blob, in order.
+
+        Raises:
+            BlobStoreError: If the blob does not exist
+        """
+        if not isinstance(blob_id, str) or len(blob_id) != DIGEST_SIZE * 2 or not _is_hex(blob_id):
+            raise BlobStoreError(f"Invalid blob id {blob_id!r}")
+        try:
+            manifest = self._manifest_path(blob_id).read_bytes()
+        except OSError:
+            raise BlobStoreError(f"Blob '{blob_id}' not found in '{self.directory}'")
+        return [manifest[i:i + DIGEST_SIZE].hex() for i in range(0, len(manifest), DIGEST_SIZE)]
+
+    def get(self, blob_id: str) -> bytes:
+        """Return a blob's bytes.
+
+        Raises:
+            BlobStoreError: If the blob or one of its chunks is missing or corrupt
+        """
+        return b"".join(self._read_chunk(chunk_id) for chunk_id in self.chunk_ids(blob_id))
+
+    def get_text(self, blob_id: str) -> str:
+        """Return a blob decoded as UTF-8."""
+        return self.get(blob_id).decode("utf-8", errors="replace")
+
+    def _read_chunk(self, chunk_id: str) -> bytes:
+        with self._lock:
+            cached = self._cache.get(chunk_id)
+            if cached is not None:
+                self._cache.move_to_end(chunk_id)
+                return cached
+
+        try:
+            raw = self._chunk_path(chunk_id).read_bytes()
+        except OSError:
+            raise BlobStoreError(f"Blob chunk '{chunk_id}' is missing from '{self.directory}'")
+        codec, payload = raw[:1], raw[1:]
+        try:
+            if codec == _CODEC_ZLIB:
+                chunk = zlib.decompress(payload)
+            elif codec == _CODEC_ZSTD:
+                if zstandard is None:
+                    raise BlobStoreError("Reading zstd-compressed blobs requires the 'zstandard' package")
+                chunk = zstandard.ZstdDecompressor().decompress(payload)
+            elif codec == _CODEC_NONE:
+                chunk = payload
+            else:
+                raise BlobStoreError(f"Blob chunk '{chunk_id}' has unknown codec {codec!r}")
+        except zlib.error as e:
+            raise BlobStoreError(f"Blob chunk '{chunk_id}' is corrupt: {e}")
+
+        with self._lock:
+            if chunk_id not in self._cache and len(chunk) <= self.cache_bytes:
+                self._cache[chunk_id] = chunk
+                self._cached_bytes += len(chunk)
+                while self._cached_bytes > self.cache_bytes:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cached_bytes -= len(evicted)
+        return chunk
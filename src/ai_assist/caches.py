@@ -0,0 +1,484 @@
+"""Registry, quotas, eviction and hit statistics for the caches under ``AI/``.
+
+Every cache the tool keeps is described by a ``CacheSpec``: where it lives,
+how it can be evicted and its default quota. Quotas cap a cache's size and
+the age of its entries. Defaults can be overridden per project in
+``AI/cache.json``, which is meant to be committed:
+
+    {"summaries": {"max_size": "32M", "max_age": "14d"}}
+
+Eviction depends on the cache layout:
+
+* entry caches (a directory of independent files, e.g. template bytecode)
+  drop their least recently used files first. Code that hits an entry
+  calls ``touch`` so its mtime records the last use;
+* caches with a ``pruner`` (e.g. the summaries file) evict their own
+  entries through that function;
+* other caches (single files or indexes) are removed as a whole when they
+  exceed their quota, and are rebuilt on the next run.
+
+Hits and misses are counted in memory with ``record`` and merged into
+``AI/.cache/cache_stats.json`` once per command by ``flush_stats``.
+
+This module only uses the standard library, so ``status`` can report cache
+usage without loading the caches themselves.
+"""
+
+import importlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .core import AIAssistError, atomic_write_bytes, file_lock, get_ai_directory_path, get_cache_directory_path
+
+
+QUOTAS_FILENAME = "cache.json"
+STATS_FILENAME = "cache_stats.json"
+
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$", re.IGNORECASE)
+_AGE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+_AGE_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+class CacheError(AIAssistError):
+    """Raised for unknown caches or invalid quotas."""
+    pass
+
+
+@dataclass(frozen=True)
+class Quota:
+    """Limits for one cache; None means unlimited."""
+
+    max_bytes: Optional[int] = None
+    max_age: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class CacheSpec:
+    """Description of one cache.
+
+    Attributes:
+        name: Name used by ``ai-assist cache`` and in statistics
+        description: One-line description for ``cache stats``
+        paths: Locations relative to the AI directory
+        entries: True if ``paths`` are directories of independent entry files
+        quota: Default quota
+        pruner: ``"module:function"`` evicting entries of a single-file
+            cache, called as ``fn(path, quota, now)`` and returning
+            ``(entries_removed, bytes_freed)``
+    """
+
+    name: str
+    description: str
+    paths: Tuple[str, ...]
+    entries: bool = False
+    quota: Quota = Quota()
+    pruner: Optional[str] = None
+
+
+@dataclass
+class CacheUsage:
+    """Footprint and statistics of one cache."""
+
+    name: str
+    bytes: int = 0
+    files: int = 0
+    oldest: Optional[float] = None
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        """Fraction of lookups that hit, or None without lookups."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+
+CACHES: Dict[str, CacheSpec] = {}
+
+# (project root, cache name) -> [hits, misses, evictions] not yet flushed
+_pending: Dict[Tuple[str, str], List[int]] = {}
+
+
+def register_cache(spec: CacheSpec) -> CacheSpec:
+    """Add a cache to the registry (modules owning a cache call this at import)."""
+    CACHES[spec.name] = spec
+    return spec
+
+
+register_cache(CacheSpec(
+    "context", "Parsed AI_CONTEXT.yaml", (".cache/context.json",),
+))
+register_cache(CacheSpec(
+    "summaries", "Structural outlines of source files", (".cache/summaries.json",),
+    quota=Quota(64 * 1024 ** 2, 90 * 86400), pruner="ai_assist.summarize:prune_summary_cache",
+))
+register_cache(CacheSpec(
+    "templates", "Compiled Jinja2 template bytecode", (".cache/jinja2",),
+    entries=True, quota=Quota(16 * 1024 ** 2, 30 * 86400),
+))
+register_cache(CacheSpec(
+    "preambles", "Rendered preambles with their dependency fingerprints", (".cache/preambles",),
+    entries=True, quota=Quota(64 * 1024 ** 2, 30 * 86400),
+))
+register_cache(CacheSpec(
+    "file-index", "File fingerprints and extraction metadata",
+    (".cache/file_index.sqlite", ".cache/file_index.sqlite-wal", ".cache/file_index.sqlite-shm"),
+))
+register_cache(CacheSpec(
+    "retrieval", "BM25 chunk index used for ranking", ("index",),
+))
+
+
+def get_spec(name: str) -> CacheSpec:
+    """Return a registered cache.
+
+    Raises:
+        CacheError: If no cache has that name
+    """
+    try:
+        return CACHES[name]
+    except KeyError:
+        raise CacheError(f"Unknown cache '{name}'. Known caches: {', '.join(sorted(CACHES))}")
+
+
+# -- quotas --------------------------------------------------------------
+
+
+def parse_size(text: Union[str, int]) -> int:
+    """Parse a size such as ``512K``, ``64M`` or ``1.5GiB`` into bytes.
+
+    Raises:
+        CacheError: If the text is not a size
+    """
+    if isinstance(text, int):
+        return text
+    match = _SIZE_RE.match(str(text))
+    if not match:
+        raise CacheError(f"Invalid size '{text}' (expected e.g. 512K, 64M, 2G)")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def parse_age(text: Union[str, int, float]) -> float:
+    """Parse an age such as ``90s``, ``12h`` or ``30d`` into seconds.
+
+    Raises:
+        CacheError: If the text is not an age
+    """
+    if isinstance(text, (int, float)):
+        return float(text)
+    match = _AGE_RE.match(str(text))
+    if not match:
+        raise CacheError(f"Invalid age '{text}' (expected e.g. 12h, 30d, 2w)")
+    return float(match.group(1)) * _AGE_UNITS[match.group(2).lower()]
+
+
+def format_size(size: float) -> str:
+    """Format a byte count for display."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def format_age(seconds: float) -> str:
+    """Format a duration in its largest whole unit."""
+    for unit, length in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= length:
+            return f"{int(seconds // length)}{unit}"
+    return f"{int(seconds)}s"
+
+
+def get_quotas_path(project_root: Union[str, Path]) -> Path:
+    """Get the path to the per-project quota overrides (``AI/cache.json``)."""
+    return get_ai_directory_path(project_root) / QUOTAS_FILENAME
+
+
+def _read_json(path: Path) -> dict:
+    try:
+        with open(path, "rb") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_quotas(project_root: Union[str, Path]) -> Dict[str, Quota]:
+    """Return the effective quota of every cache.
+
+    Raises:
+        CacheError: If ``AI/cache.json`` holds an invalid size or age
+    """
+    overrides = _read_json(get_quotas_path(project_root))
+    quotas = {}
+    for name, spec in CACHES.items():
+        quota = spec.quota
+        override = overrides.get(name)
+        if isinstance(override, dict):
+            max_bytes, max_age = quota.max_bytes, quota.max_age
+            if "max_size" in override:
+                max_bytes = None if override["max_size"] is None else parse_size(override["max_size"])
+            if "max_age" in override:
+                max_age = None if override["max_age"] is None else parse_age(override["max_age"])
+            quota = Quota(max_bytes, max_age)
+        quotas[name] = quota
+    return quotas
+
+
+def quota_for(project_root: Union[str, Path], name: str) -> Quota:
+    """Return one cache's effective quota, falling back to its default if
+    ``AI/cache.json`` is invalid (``cache stats`` reports the error)."""
+    try:
+        return load_quotas(project_root)[name]
+    except CacheError:
+        return get_spec(name).quota
+
+
+def set_quota(project_root: Union[str, Path], name: str, max_size: Optional[str], max_age: Optional[str]) -> Quota:
+    """Store a quota override in ``AI/cache.json``.
+
+    Args:
+        project_root: Path to the project root
+        name: Cache name
+        max_size: Size such as ``64M``, ``none`` for unlimited, or None to keep
+        max_age: Age such as ``30d``, ``none`` for unlimited, or None to keep
+
+    Returns:
+        Quota: The cache's new effective quota
+    """
+    get_spec(name)
+    path = get_quotas_path(project_root)
+    with file_lock(get_cache_directory_path(project_root) / "cache.lock"):
+        overrides = _read_json(path)
+        entry = overrides.get(name) if isinstance(overrides.get(name), dict) else {}
+        for key, value, parse in (("max_size", max_size, parse_size), ("max_age", max_age, parse_age)):
+            if value is None:
+                continue
+            if str(value).lower() == "none":
+                entry[key] = None
+            else:
+                parse(value)  # Validate before writing
+                entry[key] = value
+        overrides[name] = entry
+        atomic_write_bytes(path, (json.dumps(overrides, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+    return load_quotas(project_root)[name]
+
+
+# -- statistics ----------------------------------------------------------
+
+
+def record(project_root: Union[str, Path], name: str, hits: int = 0, misses: int = 0, evictions: int = 0) -> None:
+    """Count cache lookups in memory; ``flush_stats`` persists them."""
+    counters = _pending.setdefault((str(project_root), name), [0, 0, 0])
+    counters[0] += hits
+    counters[1] += misses
+    counters[2] += evictions
+
+
+def get_stats_path(project_root: Union[str, Path]) -> Path:
+    """Get the path to the persisted cache statistics."""
+    return get_cache_directory_path(project_root) / STATS_FILENAME
+
+
+def load_stats(project_root: Union[str, Path]) -> Dict[str, Dict[str, int]]:
+    """Return persisted ``{"hits", "misses", "evictions"}`` counts per cache."""
+    data = _read_json(get_stats_path(project_root))
+    return {name: counts for name, counts in data.items() if isinstance(counts, dict)}
+
+
+def flush_stats() -> None:
+    """Merge counts recorded in this process into each project's statistics.
+
+    Nothing is written when no counter moved. The file is replaced
+    atomically but not fsynced: losing a few counts in a crash is fine.
+    Failures are ignored: statistics must never make a command fail.
+    """
+    by_root: Dict[str, Dict[str, List[int]]] = {}
+    for (root, name), counters in _pending.items():
+        if any(counters):
+            by_root.setdefault(root, {})[name] = counters
+    _pending.clear()
+
+    for root, counts in by_root.items():
+        if not get_cache_directory_path(root).parent.is_dir():
+            continue  # Not initialized; do not create AI/ as a side effect
+        try:
+            with file_lock(get_cache_directory_path(root) / "cache.lock"):
+                stats = load_stats(root)
+                for name, (hits, misses, evictions) in counts.items():
+                    entry = stats.setdefault(name, {})
+                    entry["hits"] = entry.get("hits", 0) + hits
+                    entry["misses"] = entry.get("misses", 0) + misses
+                    entry["evictions"] = entry.get("evictions", 0) + evictions
+                atomic_write_bytes(get_stats_path(root), json.dumps(stats, sort_keys=True).encode("utf-8"), fsync=False)
+        except (AIAssistError, OSError):
+            continue
+
+
+def reset_stats(project_root: Union[str, Path], names: Optional[List[str]] = None) -> None:
+    """Forget persisted statistics for some caches (all when ``names`` is None)."""
+    path = get_stats_path(project_root)
+    with file_lock(get_cache_directory_path(project_root) / "cache.lock"):
+        stats = {} if names is None else {k: v for k, v in load_stats(project_root).items() if k not in names}
+        atomic_write_bytes(path, json.dumps(stats, sort_keys=True).encode("utf-8"))
+
+
+# -- usage and eviction --------------------------------------------------
+
+
+def touch(path: Union[str, Path]) -> None:
+    """Mark an entry file as used now, for LRU eviction."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _files(path: Path) -> Iterator[Tuple[str, os.stat_result]]:
+    """Yield ``(path, stat)`` for a file, or for every file below a directory."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return
+    if not os.path.isdir(path):
+        yield str(path), st
+        return
+    for directory, _, names in os.walk(path):
+        for name in names:
+            file_path = os.path.join(directory, name)
+            try:
+                yield file_path, os.stat(file_path)
+            except OSError:
+                continue
+
+
+def usage(project_root: Union[str, Path], name: str) -> CacheUsage:
+    """Measure a cache's size and attach its statistics.
+
+    Only ``stat`` calls are made; no cache is loaded.
+    """
+    spec = get_spec(name)
+    ai_dir = get_ai_directory_path(project_root)
+    result = CacheUsage(name)
+    for rel_path in spec.paths:
+        for _, st in _files(ai_dir / rel_path):
+            result.bytes += st.st_size
+            result.files += 1
+            if result.oldest is None or st.st_mtime < result.oldest:
+                result.oldest = st.st_mtime
+    counts = load_stats(project_root).get(name, {})
+    result.hits = counts.get("hits", 0)
+    result.misses = counts.get("misses", 0)
+    result.evictions = counts.get("evictions", 0)
+    return result
+
+
+def prune(
+    project_root: Union[str, Path],
+    name: str,
+    quota: Optional[Quota] = None,
+    now: Optional[float] = None,
+) -> Tuple[int, int]:
+    """Evict entries until a cache is within its quota.
+
+    Args:
+        project_root: Path to the project root
+        name: Cache name
+        quota: Limits to apply. Defaults to the project's effective quota.
+        now: Current time (for tests)
+
+    Returns:
+        Tuple[int, int]: Entries (or files) removed and bytes freed
+    """
+    spec = get_spec(name)
+    quota = quota if quota is not None else load_quotas(project_root)[name]
+    if quota.max_bytes is None and quota.max_age is None:
+        return 0, 0
+    now = time.time() if now is None else now
+    ai_dir = get_ai_directory_path(project_root)
+
+    if spec.pruner is not None:
+        module_name, attr = spec.pruner.split(":")
+        pruner: Callable = getattr(importlib.import_module(module_name), attr)
+        removed, freed = pruner(ai_dir / spec.paths[0], quota, now)
+    else:
+        files = sorted(
+            ((st.st_mtime, st.st_size, path) for rel_path in spec.paths for path, st in _files(ai_dir / rel_path)),
+            reverse=True,
+        )
+        total = sum(size for _, size, _ in files)
+        if spec.entries:
+            # Keep the most recently used files that fit in the quota
+            victims = []
+            kept = 0
+            for mtime, size, path in files:
+                expired = quota.max_age is not None and now - mtime > quota.max_age
+                if expired or (quota.max_bytes is not None and kept + size > quota.max_bytes):
+                    victims.append((size, path))
+                else:
+                    kept += size
+        else:
+            oldest = min((mtime for mtime, _, _ in files), default=now)
+            over = (quota.max_bytes is not None and total > quota.max_bytes) or (
+                quota.max_age is not None and now - oldest > quota.max_age
+            )
+            victims = [(size, path) for _, size, path in files] if over else []
+        removed = freed = 0
+        for size, path in victims:
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            removed += 1
+            freed += size
+
+    if removed:
+        record(project_root, name, evictions=removed)
+    return removed, freed
+
+
+def enforce(project_root: Union[str, Path], *names: str) -> None:
+    """Prune caches to their quotas after a write, ignoring failures."""
+    try:
+        quotas = load_quotas(project_root)
+    except CacheError:
+        return
+    for name in names:
+        try:
+            prune(project_root, name, quotas[name])
+        except (AIAssistError, OSError):
+            continue
+
+
+def clear(project_root: Union[str, Path], name: str) -> Tuple[int, int]:
+    """Delete a cache entirely; it is rebuilt on demand.
+
+    Returns:
+        Tuple[int, int]: Files removed and bytes freed
+    """
+    spec = get_spec(name)
+    ai_dir = get_ai_directory_path(project_root)
+    removed = freed = 0
+    for rel_path in spec.paths:
+        target = ai_dir / rel_path
+        for path, st in list(_files(target)):
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            removed += 1
+            freed += st.st_size
+        if target.is_dir():
+            for directory, _, _ in sorted(os.walk(target), key=lambda entry: entry[0], reverse=True):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    pass
+    return removed, freed
@@ -1,179 +1,108 @@
-"""Main CLI interface for AI Project Assistant."""
+"""Main CLI interface for AI Project Assistant.
 
-import click
-import sys
-from pathlib import Path
-from typing import Optional
+``ai-assist`` runs from git hooks and editor integrations many times per
+minute, so this module stays lightweight: subcommands live in
+``ai_assist.commands`` and are imported (together with yaml, jinja2 and the
+scanner) only when the command actually runs.
+"""
 
-from .core import (
-    validate_project_root,
-    ensure_ai_directory,
-    get_ai_directory_path,
-    AIAssistError
-)
+import importlib
+import sys
+from typing import Dict, List, Optional
 
+import click
 
-@click.group()
-@click.version_option(version="0.1.0", prog_name="ai-assist")
+from . import __version__, instrument
+
+
+# Command name -> "module:attribute" of the click command
+LAZY_COMMANDS = {
+    "init": "ai_assist.commands.init:init",
+    "preamble": "ai_assist.commands.preamble:preamble",
+    "log-query": "ai_assist.commands.log_query:log_query",
+    "log-ingest": "ai_assist.commands.log_ingest:log_ingest",
+    "logs": "ai_assist.commands.logs:logs",
+    "update": "ai_assist.commands.update:update",
+    "status": "ai_assist.commands.status:status",
+    "serve": "ai_assist.commands.serve:serve",
+    "batch": "ai_assist.commands.batch:batch",
+    "cache": "ai_assist.commands.cache:cache",
+}
+
+
+class LazyGroup(click.Group):
+    """Click group that imports subcommands on first use."""
+
+    def __init__(self, *args, lazy_subcommands: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name in self.lazy_subcommands and cmd_name not in self.commands:
+            self.add_command(self._load(cmd_name), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load(self, cmd_name: str) -> click.Command:
+        module_name, attr = self.lazy_subcommands[cmd_name].split(":")
+        command = getattr(importlib.import_module(module_name), attr)
+        if not isinstance(command, click.Command):
+            raise click.ClickException(f"Lazy command '{cmd_name}' is not a click command")
+        return command
+
+
+@click.group(cls=LazyGroup, lazy_subcommands=LAZY_COMMANDS)
+@click.version_option(version=__version__, prog_name="ai-assist")
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=None,
+              help='Worker count for parallel file processing (default: CPU count)')
+@click.option('--timings', is_flag=True,
+              help='Print a per-phase timing breakdown and counters to stderr')
+@click.option('--profile', 'profile_path', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Run the command under cProfile and write stats to this file')
 @click.pass_context
-def main(ctx):
+def main(ctx, jobs, timings, profile_path):
     """AI Project Assistant - Maintain AI-ready project context and generate LLM preambles.
-    
+
     This tool must be run from your project root directory and will create/manage
     an AI/ directory containing your project's AI context and generated files.
+
+    Set AI_ASSIST_METRICS to a file path (or "-" for stderr) to append the
+    timing data of every invocation as JSON lines.
     """
     # Ensure that ctx.obj exists and is a dict (for sharing data between commands)
     ctx.ensure_object(dict)
+    # The serve daemon presets jobs=1: forking worker pools from its threads is unsafe
+    ctx.obj.setdefault('jobs', jobs)
 
+    instrument.reset()
+    command = ctx.invoked_subcommand
 
-@main.command()
-@click.option('--force', is_flag=True, help='Overwrite existing AI_CONTEXT.yaml if it exists')
-@click.pass_context
-def init(ctx, force):
-    """Initialize AI directory and create AI_CONTEXT.yaml template."""
-    try:
-        # Validate we're in a project root
-        project_root = validate_project_root()
-        click.echo(f"✓ Project root detected: {project_root}")
-        
-        # Create AI directory
-        ai_dir = ensure_ai_directory(project_root)
-        click.echo(f"✓ AI directory ready: {ai_dir}")
-        
-        # Create AI_CONTEXT.yaml (implementation will be in Phase 2)
-        context_file = ai_dir / "AI_CONTEXT.yaml"
-        if context_file.exists() and not force:
-            click.echo(f"⚠️  AI_CONTEXT.yaml already exists. Use --force to overwrite.")
-            return
-        
-        # For now, create a placeholder - full implementation in Phase 2
-        click.echo("📝 Creating AI_CONTEXT.yaml template...")
-        context_file.write_text("# AI_CONTEXT.yaml - Template (Phase 2 implementation pending)\n")
-        click.echo(f"🎉 Initialization complete! AI context ready in {ai_dir}")
-        
-    except AIAssistError as e:
-        click.echo(f"❌ Error: {e}", err=True)
-        sys.exit(1)
-    except Exception as e:
-        click.echo(f"❌ Unexpected error: {e}", err=True)
-        sys.exit(1)
-
-
-@main.command()
-@click.option('--topic', required=True, help='Topic for the preamble (e.g., api, frontend, testing)')
-@click.option('--format', default='markdown', type=click.Choice(['markdown', 'txt']), 
-              help='Output format for the preamble')
-@click.pass_context
-def preamble(ctx, topic, format):
-    """Generate AI preamble for a specific topic."""
-    try:
-        # Validate we're in a project root and AI directory exists
-        project_root = validate_project_root()
-        ai_dir = get_ai_directory_path(project_root)
-        
-        if not ai_dir.exists():
-            raise AIAssistError(
-                "AI directory not found. Run 'ai-assist init' first to initialize the project."
-            )
-        
-        # Placeholder for Phase 3 implementation
-        click.echo(f"🔄 Generating preamble for topic: {topic}")
-        click.echo(f"📁 AI directory: {ai_dir}")
-        click.echo("⏳ Preamble generation will be implemented in Phase 3")
-        
-    except AIAssistError as e:
-        click.echo(f"❌ Error: {e}", err=True)
-        sys.exit(1)
-
-
-@main.command()
-@click.option('--model', required=True, help='AI model used (e.g., gpt-4, claude-3)')
-@click.option('--prompt', required=True, help='The prompt sent to the AI model')
-@click.option('--response', help='AI model response (optional, can be added later)')
-@click.option('--format', default='markdown', type=click.Choice(['markdown', 'json']),
-              help='Log format')
-@click.pass_context
-def log_query(ctx, model, prompt, response, format):
-    """Log AI query and response for traceability."""
-    try:
-        # Validate we're in a project root and AI directory exists
-        project_root = validate_project_root()
-        ai_dir = get_ai_directory_path(project_root)
-        
-        if not ai_dir.exists():
-            raise AIAssistError(
-                "AI directory not found. Run 'ai-assist init' first to initialize the project."
-            )
-        
-        # Placeholder for Phase 4 implementation
-        click.echo(f"📝 Logging query for model: {model}")
-        click.echo(f"📁 AI directory: {ai_dir}")
-        click.echo("⏳ Query logging will be implemented in Phase 4")
-        
-    except AIAssistError as e:
-        click.echo(f"❌ Error: {e}", err=True)
-        sys.exit(1)
-
-
-@main.command()
-@click.option('--key', required=True, help='Configuration key to update')
-@click.option('--value', required=True, help='New value for the configuration key')
-@click.pass_context
-def update(ctx, key, value):
-    """Update AI_CONTEXT.yaml configuration."""
-    try:
-        # Validate we're in a project root and AI directory exists
-        project_root = validate_project_root()
-        ai_dir = get_ai_directory_path(project_root)
-        
-        context_file = ai_dir / "AI_CONTEXT.yaml"
-        if not context_file.exists():
-            raise AIAssistError(
-                "AI_CONTEXT.yaml not found. Run 'ai-assist init' first to initialize the project."
-            )
-        
-        # Placeholder for Phase 2 implementation
-        click.echo(f"🔄 Updating {key} = {value}")
-        click.echo("⏳ Context updating will be implemented in Phase 2")
-        
-    except AIAssistError as e:
-        click.echo(f"❌ Error: {e}", err=True)
-        sys.exit(1)
-
-
-@main.command()
-@click.pass_context
-def status(ctx):
-    """Show current AI project status and configuration."""
-    try:
-        # Validate we're in a project root
-        project_root = validate_project_root()
-        ai_dir = get_ai_directory_path(project_root)
-        
-        click.echo("🔍 AI Project Assistant Status")
-        click.echo(f"📁 Project Root: {project_root}")
-        click.echo(f"📁 AI Directory: {ai_dir}")
-        click.echo(f"✓ AI Directory Exists: {'Yes' if ai_dir.exists() else 'No'}")
-        
-        if ai_dir.exists():
-            context_file = ai_dir / "AI_CONTEXT.yaml"
-            click.echo(f"✓ AI_CONTEXT.yaml: {'Yes' if context_file.exists() else 'No'}")
-            
-            # List files in AI directory
-            ai_files = list(ai_dir.glob("*"))
-            if ai_files:
-                click.echo("\n📄 Files in AI directory:")
-                for file in sorted(ai_files):
-                    click.echo(f"  • {file.name}")
-            else:
-                click.echo("\n📄 AI directory is empty")
-        else:
-            click.echo("\n💡 Run 'ai-assist init' to initialize the AI directory")
-            
-    except AIAssistError as e:
-        click.echo(f"❌ Error: {e}", err=True)
-        sys.exit(1)
+    def report():
+        if timings:
+            instrument.write_report(sys.stderr, command)
+        instrument.emit_metrics(command)
+        # Only commands that touched a cache have statistics to persist
+        if "ai_assist.caches" in sys.modules:
+            sys.modules["ai_assist.caches"].flush_stats()
+
+    ctx.call_on_close(report)
+
+    if profile_path:
+        import cProfile
+
+        profiler = cProfile.Profile()
+
+        def finish_profile():
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            click.echo(f"🔬 Profile written to {profile_path}", err=True)
+
+        # Close callbacks run in reverse order: stop profiling before reporting
+        ctx.call_on_close(finish_profile)
+        profiler.enable()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,235 @@
+"""Console entry point and client for the ``ai-assist serve`` daemon.
+
+``run`` is what the ``ai-assist`` script calls. When a daemon serves the
+current project and the command is one it handles, the arguments are sent
+over its Unix socket and the output is streamed back, without importing
+click or any command module. Otherwise the regular CLI runs.
+
+Wire format: both directions use frames of a one-byte kind and a four-byte
+big-endian payload length. The client sends one ``r`` (run) frame whose
+payload is NUL-separated: working directory, number of environment entries,
+``NAME=value`` entries, then the arguments; or one ``s`` (stop) frame. The
+daemon answers with ``o`` (stdout bytes) and ``e`` (stderr bytes) frames and
+ends with ``x``, whose payload is the exit code as a signed four-byte integer.
+
+This module only imports the standard library modules it needs, since it
+runs before every command.
+"""
+
+import os
+import socket
+import stat
+import struct
+import sys
+
+
+SOCKET_FILENAME = "daemon.sock"
+
+# Unix socket paths are limited to about 108 bytes
+MAX_SOCKET_PATH = 100
+
+# Commands forwarded to a running daemon. ``init``, ``update`` (which may
+# read stdin) and ``serve`` itself always run locally.
+FORWARDED_COMMANDS = frozenset({"preamble", "status", "logs", "log-query"})
+
+# Set to any non-empty value to never forward to a daemon
+NO_DAEMON_ENV = "AI_ASSIST_NO_DAEMON"
+
+# Client environment variables applied while a forwarded command runs
+FORWARDED_ENV = ("AI_ASSIST_METRICS",)
+
+# Global options of ``ai-assist`` that take a value
+_VALUE_OPTIONS = ("--jobs", "-j", "--profile")
+
+FRAME_HEADER = struct.Struct(">cI")
+EXIT_CODE = struct.Struct(">i")
+
+
+def socket_path(project_root) -> str:
+    """Return the daemon socket path for a project root.
+
+    ``AI/.cache/daemon.sock`` unless that is too long for a Unix socket, in
+    which case a per-user path in the temp directory is derived from the root.
+    """
+    root = os.path.realpath(str(project_root))
+    path = os.path.join(root, "AI", ".cache", SOCKET_FILENAME)
+    if len(os.fsencode(path)) <= MAX_SOCKET_PATH:
+        return path
+    import hashlib
+    import tempfile
+
+    digest = hashlib.sha1(os.fsencode(root)).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"ai-assist-{os.getuid()}-{digest}.sock")
+
+
+def is_daemon_socket(path) -> bool:
+    """Return True if ``path`` is a socket only the current user can use.
+
+    The daemon creates its socket with mode 0600. Anything else at that path
+    (a regular file, a symlink, another user's socket) is never connected to.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid() and stat.S_IMODE(st.st_mode) == 0o600
+
+
+def find_socket(start=None):
+    """Return the daemon socket serving ``start``, if one exists.
+
+    Walks upward to the nearest git checkout or initialized AI directory,
+    the same roots ``find_project_root`` prefers, so a nested project never
+    talks to its parent's daemon.
+    """
+    directory = os.path.realpath(start or os.getcwd())
+    while True:
+        if os.path.isfile(os.path.join(directory, "AI", "AI_CONTEXT.yaml")):
+            path = socket_path(directory)
+            return path if is_daemon_socket(path) else None
+        if os.path.exists(os.path.join(directory, ".git")):
+            return None
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def forwardable_command(argv):
+    """Return the subcommand in ``argv`` if it should go to a daemon."""
+    if os.environ.get(NO_DAEMON_ENV):
+        return None
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg in _VALUE_OPTIONS:
+            skip = True
+        elif not arg.startswith("-"):
+            return arg if arg in FORWARDED_COMMANDS else None
+    return None
+
+
+def send_frame(sock: socket.socket, kind: bytes, payload: bytes) -> None:
+    """Send one frame."""
+    sock.sendall(FRAME_HEADER.pack(kind, len(payload)) + payload)
+
+
+def _recv_exact(reader, size: int) -> bytes:
+    data = reader.read(size)
+    if len(data) < size:
+        raise ConnectionError("Connection to the ai-assist daemon was lost")
+    return data
+
+
+def _connect(path: str, timeout=None):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def read_response(sock: socket.socket, stdout, stderr) -> int:
+    """Copy output frames to binary streams and return the exit code."""
+    reader = sock.makefile("rb")
+    while True:
+        kind, length = FRAME_HEADER.unpack(_recv_exact(reader, FRAME_HEADER.size))
+        payload = _recv_exact(reader, length)
+        if kind == b"x":
+            return EXIT_CODE.unpack(payload)[0]
+        target = stdout if kind == b"o" else stderr
+        target.write(payload)
+        target.flush()
+
+
+def encode_request(argv, cwd: str, env) -> bytes:
+    """Encode a run request payload (arguments cannot contain NUL bytes)."""
+    fields = [cwd, str(len(env))] + [f"{name}={value}" for name, value in env.items()] + list(argv)
+    return "\0".join(fields).encode("utf-8", "surrogateescape")
+
+
+def decode_request(payload: bytes):
+    """Decode a run request payload into ``(argv, cwd, env)``."""
+    fields = payload.decode("utf-8", "surrogateescape").split("\0")
+    cwd, count = fields[0], int(fields[1])
+    env = dict(entry.split("=", 1) for entry in fields[2:2 + count])
+    return fields[2 + count:], cwd, env
+
+
+def forward(argv, start=None, stdout=None, stderr=None):
+    """Run a CLI command in the project's daemon, if one is running.
+
+    Args:
+        argv: CLI arguments (without the program name)
+        start: Directory the command runs in. Defaults to the current directory.
+        stdout: Binary stream for the command's stdout. Defaults to ``sys.stdout.buffer``.
+        stderr: Binary stream for the command's stderr. Defaults to ``sys.stderr.buffer``.
+
+    Returns:
+        Optional[int]: Exit code, or None if no daemon is reachable and the
+        command should run locally
+    """
+    cwd = os.path.realpath(start or os.getcwd())
+    path = find_socket(cwd)
+    if path is None:
+        return None
+    sock = _connect(path)
+    if sock is None:
+        return None
+
+    stderr = stderr or sys.stderr.buffer
+    env = {name: os.environ[name] for name in FORWARDED_ENV if name in os.environ}
+    with sock:
+        try:
+            send_frame(sock, b"r", encode_request(argv, cwd, env))
+        except OSError:
+            return None
+        try:
+            return read_response(sock, stdout or sys.stdout.buffer, stderr)
+        except OSError as e:
+            stderr.write(f"❌ Error: {e}\n".encode("utf-8"))
+            return 1
+
+
+def stop_daemon(project_root, timeout: float = 5.0) -> bool:
+    """Ask a project's daemon to shut down.
+
+    Returns:
+        bool: True if a daemon was running and acknowledged
+    """
+    path = socket_path(project_root)
+    sock = _connect(path, timeout) if is_daemon_socket(path) else None
+    if sock is None:
+        return False
+    with sock:
+        try:
+            send_frame(sock, b"s", b"")
+            read_response(sock, _Discard(), _Discard())
+        except OSError:
+            return False
+    return True
+
+
+class _Discard:
+    def write(self, data) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+
+def run() -> None:
+    """``ai-assist`` entry point: forward to a daemon or run the CLI."""
+    argv = sys.argv[1:]
+    if forwardable_command(argv) is not None:
+        code = forward(argv)
+        if code is not None:
+            sys.exit(code)
+
+    from .cli import main
+
+    main()
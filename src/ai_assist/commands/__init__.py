@@ -0,0 +1,5 @@
+"""CLI subcommands.
+
+Each command lives in its own module so that ``ai_assist.cli`` can import it
+only when it is invoked.
+"""
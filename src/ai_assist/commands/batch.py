@@ -0,0 +1,86 @@
+"""``ai-assist batch`` command."""
+
+import click
+import json
+import shlex
+import sys
+
+from ..batch import (
+    BATCH_COMMANDS,
+    STATUS_OK,
+    expand_roots,
+    run_batch,
+)
+from ..core import atomic_writer, AIAssistError
+
+
+_STATUS_ICONS = {"ok": "✅", "failed": "❌", "timeout": "⏱️ ", "invalid": "⚠️ "}
+
+
+@click.command()
+@click.argument('command', type=click.Choice(BATCH_COMMANDS))
+@click.argument('roots', nargs=-1, type=click.Path(file_okay=False))
+@click.option('--glob', 'patterns', multiple=True, metavar='PATTERN',
+              help='Glob of project roots (quote it); may be repeated')
+@click.option('--from-file', type=click.File('r'),
+              help='File with one project root per line ("-" reads stdin)')
+@click.option('--args', 'command_args', default='', metavar='ARGS',
+              help='Arguments for the command, shell-quoted (e.g. "--topic api -o AI/PREAMBLE.md")')
+@click.option('--workers', '-w', default=4, show_default=True, type=click.IntRange(min=1),
+              help='Projects processed at the same time')
+@click.option('--timeout', type=click.FloatRange(min=0, min_open=True), default=None,
+              help='Seconds before a project is killed and reported as timed out')
+@click.option('--report', 'report_path', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Write the JSON report to this file instead of stdout')
+@click.pass_context
+def batch(ctx, command, roots, patterns, from_file, command_args, workers, timeout, report_path):
+    """Run COMMAND in many projects in parallel and report the results as JSON.
+
+    Each project root is validated and gets its own ai-assist process, so a
+    slow or failing project never holds up the others. Progress goes to
+    stderr; the exit code is 1 if any project did not succeed.
+    """
+    try:
+        candidates = list(roots)
+        if from_file is not None:
+            candidates.extend(line.strip() for line in from_file if line.strip() and not line.startswith('#'))
+        candidates = expand_roots(candidates, patterns)
+        if not candidates:
+            raise AIAssistError("No project roots given. Pass paths, --glob or --from-file.")
+
+        try:
+            args = shlex.split(command_args)
+        except ValueError as e:
+            raise AIAssistError(f"Invalid --args: {e}")
+
+        click.echo(f"🚀 Running '{command}' in {len(candidates)} projects with {workers} workers", err=True)
+
+        def progress(result):
+            detail = f" ({result.error})" if result.error and result.status != STATUS_OK else ""
+            click.echo(f"{_STATUS_ICONS[result.status]} {result.root} [{result.duration:.1f}s]{detail}", err=True)
+
+        report = run_batch(
+            candidates, command, args,
+            workers=workers, timeout=timeout, jobs=ctx.obj.get('jobs'), on_result=progress,
+        )
+
+        data = json.dumps(report.to_dict(), indent=2, ensure_ascii=False) + "\n"
+        if report_path:
+            with atomic_writer(report_path) as out:
+                out.write(data)
+            click.echo(f"📝 Report written to {report_path}", err=True)
+        else:
+            click.echo(data, nl=False)
+
+        counts = report.counts
+        click.echo(
+            "📊 " + ", ".join(f"{count} {status}" for status, count in counts.items() if count)
+            + f" in {report.duration:.1f}s",
+            err=True,
+        )
+        if not report.ok:
+            sys.exit(1)
+
+    except AIAssistError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
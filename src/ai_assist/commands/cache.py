@@ -0,0 +1,141 @@
+"""``ai-assist cache`` command group."""
+
+import click
+import json
+import sys
+
+from .. import caches
+from ..core import (
+    validate_project_root,
+    get_ai_directory_path,
+    AIAssistError
+)
+from ..instrument import phase
+
+
+def _project_root():
+    project_root = validate_project_root()
+    if not get_ai_directory_path(project_root).exists():
+        raise AIAssistError(
+            "AI directory not found. Run 'ai-assist init' first to initialize the project."
+        )
+    return project_root
+
+
+def _names(names):
+    for name in names:
+        caches.get_spec(name)
+    return list(names) or list(caches.CACHES)
+
+
+def _format_quota(quota):
+    size = caches.format_size(quota.max_bytes) if quota.max_bytes is not None else "unlimited"
+    age = caches.format_age(quota.max_age) if quota.max_age is not None else "unlimited"
+    return f"max size {size}, max age {age}"
+
+
+@click.group()
+def cache():
+    """Inspect, prune and clear the caches in AI/.cache and AI/index."""
+
+
+@cache.command()
+@click.option('--json', 'as_json', is_flag=True, help='Emit the statistics as JSON')
+@click.option('--reset', is_flag=True, help='Forget the recorded hit and miss counts')
+def stats(as_json, reset):
+    """Show the size, quota and hit rate of every cache."""
+    try:
+        project_root = _project_root()
+        if reset:
+            caches.reset_stats(project_root)
+            click.echo("🧹 Cache statistics reset", err=True)
+            return
+
+        with phase("measure"):
+            quotas = caches.load_quotas(project_root)
+            usages = [caches.usage(project_root, name) for name in caches.CACHES]
+
+        if as_json:
+            click.echo(json.dumps({
+                u.name: {
+                    "bytes": u.bytes,
+                    "files": u.files,
+                    "hits": u.hits,
+                    "misses": u.misses,
+                    "evictions": u.evictions,
+                    "max_bytes": quotas[u.name].max_bytes,
+                    "max_age": quotas[u.name].max_age,
+                }
+                for u in usages
+            }, indent=2))
+            return
+
+        click.echo(f"💾 Caches: {caches.format_size(sum(u.bytes for u in usages))} total")
+        for u in usages:
+            spec = caches.CACHES[u.name]
+            rate = f"{u.hit_rate:.0%}" if u.hit_rate is not None else "n/a"
+            click.echo(f"\n  {u.name} — {spec.description}")
+            click.echo(f"    size: {caches.format_size(u.bytes)} in {u.files:,} files ({_format_quota(quotas[u.name])})")
+            click.echo(f"    hit rate: {rate} ({u.hits:,} hits, {u.misses:,} misses, {u.evictions:,} evicted)")
+
+    except AIAssistError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+
+
+@cache.command()
+@click.argument('names', nargs=-1)
+def prune(names):
+    """Evict entries until caches are within their quotas (all caches by default)."""
+    try:
+        project_root = _project_root()
+        with phase("prune"):
+            total_removed = total_freed = 0
+            for name in _names(names):
+                removed, freed = caches.prune(project_root, name)
+                if removed:
+                    click.echo(f"🧹 {name}: evicted {removed:,} entries ({caches.format_size(freed)})")
+                total_removed += removed
+                total_freed += freed
+        click.echo(f"✅ Pruned {total_removed:,} entries, freed {caches.format_size(total_freed)}")
+
+    except AIAssistError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+
+
+@cache.command()
+@click.argument('names', nargs=-1)
+def clear(names):
+    """Delete caches entirely (all caches by default); they are rebuilt on demand."""
+    try:
+        project_root = _project_root()
+        with phase("clear"):
+            total = 0
+            for name in _names(names):
+                _, freed = caches.clear(project_root, name)
+                total += freed
+        click.echo(f"✅ Cleared {', '.join(_names(names))}, freed {caches.format_size(total)}")
+
+    except AIAssistError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+
+
+@cache.command()
+@click.argument('name')
+@click.option('--max-size', help="Size limit such as 512K, 64M or 1G ('none' for unlimited)")
+@click.option('--max-age', help="Evict entries unused for this long, such as 12h or 30d ('none' for unlimited)")
+def quota(name, max_size, max_age):
+    """Show or set the quota of cache NAME (stored in AI/cache.json)."""
+    try:
+        project_root = _project_root()
+        if max_size is None and max_age is None:
+            result = caches.load_quotas(project_root)[caches.get_spec(name).name]
+        else:
+            result = caches.set_quota(project_root, name, max_size, max_age)
+        click.echo(f"📏 {name}: {_format_quota(result)}")
+
+    except AIAssistError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
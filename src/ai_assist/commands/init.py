@@ -0,0 +1,49 @@
+"""``ai-assist init`` command."""
+
+import click
+import sys
+
+from ..context_manager import ContextManager, default_context
+from ..core import (
+    validate_project_root,
+    ensure_ai_directory,
+    get_project_name,
+    AIAssistError
+)
+from ..gitstate import record_state
+from ..instrument import phase
+
+
+@click.command()
+@click.option('--force', is_flag=True, help='Overwrite existing AI_CONTEXT.yaml if it exists')
+@click.pass_context
+def init(ctx, force):
+    """Initialize AI directory and create AI_CONTEXT.yaml template."""
+    try:
+        # Validate we're in a project root
+        with phase("validate"):
+            project_root = validate_project_root()
+        click.echo(f"✓ Project root detected: {project_root}")
+        
+        # Create AI directory
+        ai_dir = ensure_ai_directory(project_root)
+        click.echo(f"✓ AI directory ready: {ai_dir}")
+        
+        # Create AI_CONTEXT.yaml
+        manager = ContextManager(project_root)
+        if manager.exists() and not force:
+            click.echo(f"⚠️  AI_CONTEXT.yaml already exists. Use --force to overwrite.")
+            return
+        
+        click.echo("📝 Creating AI_CONTEXT.yaml template...")
+        with phase("write"):
+            manager.write(default_context(get_project_name(project_root)))
+            record_state(project_root)
+        click.echo(f"🎉 Initialization complete! AI context ready in {ai_dir}")
+        
+    except AIAssistError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"❌ Unexpected error: {e}", err=True)
+        sys.exit(1)
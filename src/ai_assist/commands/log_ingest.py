@@ -0,0 +1,76 @@
+"""``ai-assist log-ingest`` command."""
+
+import click
+import sys
+
+from ..core import (
+    validate_project_root,
+    get_ai_directory_path,
+    AIAssistError
+)
+from ..ingest import DEFAULT_MAX_BATCH, DEFAULT_QUEUE_SIZE, run
+from ..instrument import phase
+from ..logstore import COMPRESSION_CHOICES, LogStore
+
+
+@click.command()
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False), default=None,
+              help='Listen on this Unix socket instead of reading stdin')
+@click.option('--acks', is_flag=True, help='Print one JSON line per record ({"id": ...} or {"error": ...}) to stdout')
+@click.option('--max-batch', default=DEFAULT_MAX_BATCH, show_default=True, type=click.IntRange(min=1),
+              help='Most records committed (and fsynced) together')
+@click.option('--max-delay', default=10.0, show_default=True, type=click.FloatRange(min=0),
+              help='Milliseconds to wait for more records before committing a partial batch')
+@click.option('--queue-size', default=DEFAULT_QUEUE_SIZE, show_default=True, type=click.IntRange(min=1),
+              help='Records buffered before input is paused (backpressure)')
+@click.option('--fsync/--no-fsync', default=True, show_default=True, help='Flush each batch to stable storage')
+@click.option('--compression', default='auto', type=click.Choice(COMPRESSION_CHOICES),
+              help='Compression for sealed log segments')
+@click.pass_context
+def log_ingest(ctx, socket_path, acks, max_batch, max_delay, queue_size, fsync, compression):
+    """Log many queries from newline-delimited JSON in one process.
+
+    Each line is a record like log-query writes: {"model": ..., "prompt": ...,
+    "response": ..., "topic": ...}. Records are appended in batches with a
+    single fsync per batch. Reads stdin until EOF, or with --socket serves
+    clients until interrupted; socket clients get one JSON response line
+    per record once it is committed.
+    """
+    try:
+        with phase("validate"):
+            project_root = validate_project_root()
+            ai_dir = get_ai_directory_path(project_root)
+        
+        if not ai_dir.exists():
+            raise AIAssistError(
+                "AI directory not found. Run 'ai-assist init' first to initialize the project."
+            )
+        
+        store = LogStore.for_project(project_root, compression=compression)
+        
+        def reject(number, reason):
+            click.echo(f"⚠️  Skipping line {number}: {reason}", err=True)
+        
+        def ready():
+            click.echo(f"📥 Ingesting from {socket_path} (Ctrl+C to stop)", err=True)
+        
+        with phase("write"):
+            stats = run(
+                store,
+                socket_path=socket_path,
+                acks=sys.stdout.buffer if acks and socket_path is None else None,
+                on_reject=reject,
+                on_ready=ready,
+                max_batch=max_batch,
+                max_delay=max_delay / 1000,
+                queue_size=queue_size,
+                fsync=fsync,
+            )
+        
+        click.echo(f"📝 Logged {stats.summary()} to {store.directory}", err=True)
+        if stats.failed:
+            sys.exit(1)
+        
+    except AIAssistError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
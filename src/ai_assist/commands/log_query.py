@@ -0,0 +1,56 @@
+"""``ai-assist log-query`` command."""
+
+import click
+import json
+import sys
+
+from ..core import (
+    validate_project_root,
+    get_ai_directory_path,
+    AIAssistError
+)
+from ..instrument import phase
+from ..logstore import COMPRESSION_CHOICES, LogStore
+
+
+@click.command()
+@click.option('--model', required=True, help='AI model used (e.g., gpt-4, claude-3)')
+@click.option('--prompt', required=True, help='The prompt sent to the AI model')
+@click.option('--response', help='AI model response (optional, can be added later)')
+@click.option('--topic', help='Topic the query relates to (e.g., api, frontend)')
+@click.option('--format', default='markdown', type=click.Choice(['markdown', 'json']),
+              help='Output format for the logged entry')
+@click.option('--compression', default='auto', type=click.Choice(COMPRESSION_CHOICES),
+              help='Compression for sealed log segments')
+@click.pass_context
+def log_query(ctx, model, prompt, response, topic, format, compression):
+    """Log AI query and response for traceability."""
+    try:
+        # Validate we're in a project root and AI directory exists
+        with phase("validate"):
+            project_root = validate_project_root()
+            ai_dir = get_ai_directory_path(project_root)
+        
+        if not ai_dir.exists():
+            raise AIAssistError(
+                "AI directory not found. Run 'ai-assist init' first to initialize the project."
+            )
+        
+        record = {"model": model, "prompt": prompt, "response": response}
+        if topic:
+            record["topic"] = topic
+        
+        with phase("write"):
+            store = LogStore.for_project(project_root, compression=compression)
+            record_id = store.append(record)
+        
+        if format == 'json':
+            click.echo(json.dumps({"id": record_id, **record}, ensure_ascii=False))
+        else:
+            click.echo(f"📝 Logged query for model: {model}")
+            click.echo(f"🆔 Record: {record_id}")
+            click.echo(f"📁 Log directory: {store.directory}")
+        
+    except AIAssistError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
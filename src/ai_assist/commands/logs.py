@@ -0,0 +1,81 @@
+"""``ai-assist logs`` command group."""
+
+import click
+import json
+import sys
+
+from ..core import (
+    validate_project_root,
+    get_ai_directory_path,
+    AIAssistError
+)
+from ..instrument import phase
+from ..logindex import LogQuery, parse_timestamp, search_logs
+from ..logstore import MISSING_FIELD, LogStore
+
+
+@click.group()
+def logs():
+    """Search and inspect logged AI queries."""
+
+
+@logs.command()
+@click.argument('text', required=False)
+@click.option('--model', help='Only show queries for this model')
+@click.option('--topic', help='Only show queries logged with this topic')
+@click.option('--since', help='Only show queries at or after this ISO 8601 time')
+@click.option('--until', help='Only show queries at or before this ISO 8601 time')
+@click.option('--limit', type=click.IntRange(min=1), help='Stop after this many matches')
+@click.option('--format', default='markdown', type=click.Choice(['markdown', 'json']),
+              help='Output format (json emits one record per line)')
+@click.pass_context
+def search(ctx, text, model, topic, since, until, limit, format):
+    """Search logged queries by model, topic, time range and free TEXT."""
+    try:
+        with phase("validate"):
+            project_root = validate_project_root()
+            ai_dir = get_ai_directory_path(project_root)
+        
+        if not ai_dir.exists():
+            raise AIAssistError(
+                "AI directory not found. Run 'ai-assist init' first to initialize the project."
+            )
+        
+        query = LogQuery(
+            model=model,
+            topic=topic,
+            since=parse_timestamp(since) if since else None,
+            until=parse_timestamp(until) if until else None,
+            text=text,
+        )
+        
+        # Results are streamed as segments are searched
+        with phase("search"):
+            matches = 0
+            unresolved = 0
+            for record_id, record in search_logs(LogStore.for_project(project_root), query):
+                if MISSING_FIELD in record:
+                    unresolved += 1
+                if format == 'json':
+                    click.echo(json.dumps({"id": record_id, **record}, ensure_ascii=False))
+                else:
+                    prompt = " ".join(str(record.get("prompt", "")).split())
+                    if len(prompt) > 80:
+                        prompt = prompt[:77] + "..."
+                    topic_label = f" ({record['topic']})" if record.get("topic") else ""
+                    click.echo(
+                        f"🔎 {record_id}  {record.get('timestamp', '')}  "
+                        f"[{record.get('model', '?')}]{topic_label} {prompt}"
+                    )
+                matches += 1
+                if limit is not None and matches >= limit:
+                    break
+        
+        if format != 'json':
+            click.echo(f"📊 {matches} matching queries", err=True)
+        if unresolved:
+            click.echo(f"⚠️  {unresolved} matching queries reference missing blobs in AI/blobs", err=True)
+        
+    except AIAssistError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
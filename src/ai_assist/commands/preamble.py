@@ -0,0 +1,189 @@
+"""``ai-assist preamble`` command."""
+
+import click
+import filecmp
+import os
+import shutil
+import sys
+
+import time
+
+from .. import caches
+from ..context_manager import ContextManager
+from ..core import (
+    validate_project_root,
+    get_ai_directory_path,
+    atomic_writer,
+    AIAssistError
+)
+from ..instrument import phase
+from ..memo import PreambleMemo, collect_dependencies
+from ..tokens import DEFAULT_MAX_TOKENS
+
+
+@click.command()
+@click.option('--topic', required=True, help='Topic for the preamble (e.g., api, frontend, testing)')
+@click.option('--format', default='markdown', type=click.Choice(['markdown', 'txt']), 
+              help='Output format for the preamble')
+@click.option('--max-tokens', default=DEFAULT_MAX_TOKENS, show_default=True, type=click.IntRange(min=1),
+              help='Token budget for the generated preamble')
+@click.option('--exact-tokens', is_flag=True, help='Count tokens exactly with tiktoken instead of estimating')
+@click.option('--git-changes', is_flag=True,
+              help='Use git to find files changed since the last run instead of trusting mtimes')
+@click.option('--summaries/--full-files', default=True, show_default=True,
+              help='Show structural outlines instead of full contents for supported languages')
+@click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Write the preamble to this file (replaced atomically) instead of stdout')
+@click.option('--memo/--no-memo', default=True, show_default=True,
+              help='Reuse the last preamble for these options if none of its inputs changed')
+@click.pass_context
+def preamble(ctx, topic, format, max_tokens, exact_tokens, git_changes, summaries, output, memo):
+    """Generate AI preamble for a specific topic."""
+    try:
+        # Validate we're in a project root and AI directory exists
+        with phase("validate"):
+            project_root = validate_project_root()
+            ai_dir = get_ai_directory_path(project_root)
+        
+        if not ai_dir.exists():
+            raise AIAssistError(
+                "AI directory not found. Run 'ai-assist init' first to initialize the project."
+            )
+        
+        # Serve a repeat request from the stored output after a stat per dependency
+        stored = PreambleMemo(project_root, topic, format, max_tokens, exact_tokens, summaries)
+        if memo:
+            with phase("memo"):
+                hit = stored.lookup()
+            if hit is not None:
+                _emit(hit.path, output)
+                age = caches.format_age(max(time.time() - hit.created_at, 0))
+                click.echo(
+                    f"♻️  Reused preamble for topic '{topic}' ({hit.sections} sections, rendered {age} ago): "
+                    f"{len(hit.dependencies):,} dependencies unchanged",
+                    err=True
+                )
+                return
+        
+        # Only a rebuild needs the scanner, pipeline, ranking and templates
+        from ..gitstate import detect_changes, record_state
+        from ..pipeline import PipelineStats, run_pipeline
+        from ..preamble import build_sections, select_for_budget
+        from ..retrieval import refresh_index
+        from ..scanner import FileIndex, get_index_path, scan_project
+        from ..summarize import SummaryCache, get_summary_cache_path, summarize_records
+        from ..templates import render_preamble
+        
+        click.echo(f"🔄 Generating preamble for topic: {topic}", err=True)
+        click.echo(f"📁 AI directory: {ai_dir}", err=True)
+        
+        # Incrementally refresh the file-fingerprint index
+        with phase("scan"):
+            index = FileIndex.load(get_index_path(project_root))
+            changes = None
+            if git_changes:
+                changes = detect_changes(project_root)
+                if changes is None:
+                    click.echo("⚠️  No usable git baseline (missing or rewritten history); doing a full scan", err=True)
+                else:
+                    click.echo(f"🌿 {len(changes.changed)} files changed since {changes.since[:12]}", err=True)
+            scan = scan_project(project_root, index, unchanged=changes.is_unchanged if changes else None)
+        click.echo(
+            f"📊 Scanned {len(scan.files)} files "
+            f"({len(scan.added)} added, {len(scan.modified)} modified, "
+            f"{len(scan.removed)} removed)",
+            err=True
+        )
+        
+        # Extract metadata for files without up-to-date results
+        with phase("extract"):
+            pending = [record.path for record in scan.files if record.meta is None]
+            if pending:
+                stats = PipelineStats()
+                for path, metadata in run_pipeline(project_root, pending, jobs=ctx.obj.get('jobs'), stats=stats):
+                    index.set_meta(path, metadata or {})
+                click.echo(f"⚡ Processed files: {stats.summary()}", err=True)
+
+            outlines = None
+            if summaries:
+                cache = SummaryCache.load(get_summary_cache_path(project_root))
+                stats = PipelineStats()
+                outlines = summarize_records(
+                    project_root, [record for record in index if record.meta], cache,
+                    jobs=ctx.obj.get('jobs'), stats=stats,
+                )
+                if stats.files_discovered:
+                    click.echo(f"🧩 Summarized files: {stats.summary()}", err=True)
+        
+        # Fill the token budget with the most relevant sections
+        with phase("rank"):
+            manager = ContextManager(project_root)
+            context = manager.load() if manager.exists() else None
+            retrieval, updated = refresh_index(project_root, index, context)
+            click.echo(f"🧭 Retrieval index: {retrieval.live_count} chunks ({updated} sources updated)", err=True)
+            ranking = retrieval.source_scores(topic)
+
+            sections = build_sections(
+                project_root, index, topic, format, context,
+                exact=exact_tokens, ranking=ranking, summaries=outlines,
+            )
+            selected = select_for_budget(topic, sections, max_tokens, format, exact=exact_tokens)
+
+        # Sections are written (and flushed) one at a time as they render
+        with phase("render"):
+            complete = True
+            if output:
+                with atomic_writer(output) as handle:
+                    tee = stored.tee(handle)
+                    render_preamble(tee, topic, selected, format, project_root, context=context)
+                size = os.path.getsize(output)
+                click.echo(f"📝 Wrote {len(selected)} sections ({size:,} bytes) to {output}", err=True)
+            else:
+                tee = stored.tee(sys.stdout)
+                try:
+                    render_preamble(tee, topic, selected, format, project_root, context=context)
+                except BrokenPipeError:
+                    # The reader (e.g. `head`) went away; still save the caches below
+                    devnull = os.open(os.devnull, os.O_WRONLY)
+                    os.dup2(devnull, sys.stdout.fileno())
+                    complete = False
+
+        with phase("write"):
+            index.save()
+            if summaries:
+                cache.prune(caches.quota_for(project_root, "summaries"))
+                cache.save()
+            if complete:
+                # Every indexed file feeds the ranking, so all of them are dependencies
+                known = {record.path: (record.mtime_ns, record.size) for record in scan.files}
+                deps = collect_dependencies(scan.dirs, known, context)
+                stored.store(tee, len(selected), deps, context, known)
+            else:
+                tee.discard()
+            caches.enforce(project_root, "templates", "preambles")
+            record_state(project_root)
+        
+    except AIAssistError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+
+
+def _emit(path, output):
+    """Copy a stored preamble to ``output`` or stdout."""
+    if not output:
+        try:
+            with open(path, encoding="utf-8", newline="") as handle:
+                shutil.copyfileobj(handle, sys.stdout)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+        return
+    try:
+        if filecmp.cmp(path, output, shallow=False):
+            return  # Already up to date; rewriting would only bump mtimes
+    except OSError:
+        pass
+    with open(path, "rb") as source, atomic_writer(output, "wb") as handle:
+        shutil.copyfileobj(source, handle)
+    click.echo(f"📝 Wrote {os.path.getsize(output):,} bytes to {output}", err=True)
@@ -0,0 +1,60 @@
+"""``ai-assist serve`` command."""
+
+import click
+import sys
+
+from ..client import stop_daemon
+from ..core import (
+    validate_project_root,
+    get_ai_directory_path,
+    AIAssistError
+)
+from ..daemon import Daemon
+
+
+@click.command()
+@click.option('--poll', is_flag=True, help='Watch for changes by polling instead of inotify')
+@click.option('--poll-interval', default=1.0, show_default=True, type=click.FloatRange(min=0.05),
+              help='Seconds between polling snapshots')
+@click.option('--idle-timeout', type=click.FloatRange(min=1), default=None,
+              help='Exit after this many seconds without requests')
+@click.option('--stop', is_flag=True, help='Stop the daemon running for this project')
+@click.pass_context
+def serve(ctx, poll, poll_interval, idle_timeout, stop):
+    """Keep indexes warm in a background daemon for fast repeated commands.
+
+    Runs in the foreground; start it with '&' or from a process manager.
+    While it runs, preamble, status, logs and log-query are forwarded to it
+    transparently. Set AI_ASSIST_NO_DAEMON=1 to bypass it.
+    """
+    try:
+        project_root = validate_project_root()
+
+        if stop:
+            if stop_daemon(project_root):
+                click.echo("🛑 Daemon stopped", err=True)
+            else:
+                click.echo("⚠️  No daemon is running for this project", err=True)
+            return
+
+        if not get_ai_directory_path(project_root).exists():
+            raise AIAssistError(
+                "AI directory not found. Run 'ai-assist init' first to initialize the project."
+            )
+
+        daemon = Daemon(project_root, polling=poll, poll_interval=poll_interval, idle_timeout=idle_timeout)
+        daemon.bind()
+        daemon.refresh()
+        watcher = daemon.start_watcher()
+        click.echo(f"🛰️  Serving {project_root} on {daemon.socket_path} ({watcher} watcher)", err=True)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            daemon.close()
+        click.echo(f"🛑 Daemon stopped after {daemon.requests} requests", err=True)
+
+    except AIAssistError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
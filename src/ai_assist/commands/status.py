@@ -0,0 +1,79 @@
+"""``ai-assist status`` command."""
+
+import click
+import sys
+
+from .. import caches
+from ..context_manager import ContextError, ContextManager
+from ..core import (
+    validate_project_root,
+    get_ai_directory_path,
+    AIAssistError
+)
+from ..indexdb import get_index_path, read_info
+from ..instrument import phase
+
+
+@click.command()
+@click.pass_context
+def status(ctx):
+    """Show current AI project status and configuration."""
+    try:
+        # Validate we're in a project root
+        with phase("validate"):
+            project_root = validate_project_root()
+            ai_dir = get_ai_directory_path(project_root)
+        
+        click.echo("🔍 AI Project Assistant Status")
+        click.echo(f"📁 Project Root: {project_root}")
+        click.echo(f"📁 AI Directory: {ai_dir}")
+        click.echo(f"✓ AI Directory Exists: {'Yes' if ai_dir.exists() else 'No'}")
+        
+        if ai_dir.exists():
+            manager = ContextManager(project_root)
+            click.echo(f"✓ AI_CONTEXT.yaml: {'Yes' if manager.exists() else 'No'}")
+            if manager.exists():
+                try:
+                    with phase("load"):
+                        context = manager.load()
+                    click.echo(f"📚 Context sections: {', '.join(context) if context else '(none)'}")
+                except ContextError as e:
+                    # Keep reporting the rest; status is how users diagnose this
+                    click.echo(f"⚠️  AI_CONTEXT.yaml is invalid: {e}")
+            
+            # Read from the index's info table only, so this is instant on any project size
+            info = read_info(get_index_path(project_root))
+            if info is not None:
+                click.echo(
+                    f"🗂️  File index: {info.files} files, {caches.format_size(info.size_bytes)}, "
+                    f"updated {caches.format_age(info.age)} ago"
+                )
+            else:
+                click.echo("🗂️  File index: not built yet (run 'ai-assist preamble')")
+            
+            # Cache footprint from stat() calls and persisted hit counts only
+            usages = [caches.usage(project_root, name) for name in caches.CACHES]
+            click.echo(f"💾 Caches: {caches.format_size(sum(u.bytes for u in usages))} total")
+            for u in usages:
+                if u.files or u.hits or u.misses:
+                    rate = (
+                        f"hit rate {u.hit_rate:.0%} ({u.hits:,}/{u.hits + u.misses:,})"
+                        if u.hit_rate is not None else "no lookups yet"
+                    )
+                    click.echo(f"  • {u.name}: {caches.format_size(u.bytes)}, {rate}")
+            
+            # List files in AI directory
+            ai_files = list(ai_dir.glob("*"))
+            if ai_files:
+                click.echo("\n📄 Files in AI directory:")
+                for file in sorted(ai_files):
+                    click.echo(f"  • {file.name}")
+            else:
+                click.echo("\n📄 AI directory is empty")
+        else:
+            click.echo("\n💡 Run 'ai-assist init' to initialize the AI directory")
+            
+    except AIAssistError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+
@@ -0,0 +1,55 @@
+"""``ai-assist update`` command."""
+
+import click
+import sys
+
+from ..context_manager import ContextManager, parse_assignment, parse_yaml
+from ..core import validate_project_root, AIAssistError
+from ..instrument import phase
+
+
+@click.command()
+@click.option('--key', help='Configuration key to update (dotted paths allowed, e.g. project.name)')
+@click.option('--value', help='New value for the configuration key (parsed as YAML)')
+@click.option('--set', 'assignments', multiple=True, metavar='KEY=VALUE',
+              help='Set a dotted key to a YAML value; may be repeated')
+@click.option('--from-file', type=click.File('r'),
+              help='YAML/JSON mapping of dotted keys to values ("-" reads stdin)')
+@click.pass_context
+def update(ctx, key, value, assignments, from_file):
+    """Update AI_CONTEXT.yaml configuration.
+    
+    All assignments are applied in a single locked, atomic write.
+    """
+    try:
+        # Validate we're in a project root and AI directory exists
+        with phase("validate"):
+            project_root = validate_project_root()
+        
+        if (key is None) != (value is None):
+            raise AIAssistError("--key and --value must be used together.")
+        
+        updates = []
+        if from_file is not None:
+            batch = parse_yaml(from_file.read())
+            if not isinstance(batch, dict):
+                raise AIAssistError(f"{from_file.name} must contain a mapping of keys to values.")
+            updates.extend((str(batch_key), batch_value) for batch_key, batch_value in batch.items())
+        updates.extend(parse_assignment(assignment) for assignment in assignments)
+        if key is not None:
+            updates.append((key, parse_yaml(value)))
+        
+        if not updates:
+            raise AIAssistError("Nothing to update. Use --key/--value, --set KEY=VALUE or --from-file.")
+        
+        manager = ContextManager(project_root)
+        click.echo(f"🔄 Updating {len(updates)} key{'s' if len(updates) != 1 else ''}")
+        with phase("write"):
+            manager.update(updates)
+        for update_key, _ in updates:
+            click.echo(f"  • {update_key}")
+        click.echo(f"✓ Updated {manager.path}")
+        
+    except AIAssistError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
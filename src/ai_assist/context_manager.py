@@ -0,0 +1,451 @@
+"""Loading, caching and lazy access for AI_CONTEXT.yaml.
+
+Parsing a large context file is the expensive part of most commands, so the
+parsed document is cached twice, both keyed by the file's inode, mtime and
+size (atomic writes always produce a new inode):
+
+* in memory, for repeated loads within one process;
+* on disk in ``AI/.cache/context.json``, for later invocations.
+
+The on-disk cache stores every top-level section separately (its value as
+JSON plus its YAML text), so a cache hit only decodes the sections a command
+actually touches. Values JSON cannot represent exactly (dates, sets,
+non-string keys) are stored as YAML text only and re-parsed on access.
+The cache is plain data: ``AI/`` lives in the project tree, so a cloned
+repository must never be able to make loading it run code.
+
+A section's YAML text is its slice of the file as written, comments and
+quoting included, so updates write untouched sections back verbatim and
+only re-serialize the sections they change.
+"""
+
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union
+
+from . import caches
+from .core import (
+    AIAssistError,
+    atomic_write_bytes,
+    file_lock,
+    get_ai_directory_path,
+    get_cache_directory_path,
+)
+
+
+CONTEXT_FILENAME = "AI_CONTEXT.yaml"
+CACHE_FILENAME = "context.json"
+LEGACY_CACHE_FILENAME = "context.pickle"
+LOCK_FILENAME = "context.lock"
+CACHE_VERSION = 3
+
+# Per section: value as JSON (None if JSON cannot represent it) and YAML text
+Section = Tuple[Optional[str], str]
+
+# Anchors can tie sections together, so such files are never sliced
+_ANCHOR_RE = re.compile(r"(?:^|[\s\[{,:-])&[^\s,\[\]{}]")
+
+# Parsed contexts for this process, keyed by context file path
+_memory_cache: Dict[str, Tuple[Tuple[int, int, int], "LazyContext"]] = {}
+
+
+class ContextError(AIAssistError):
+    """Raised when AI_CONTEXT.yaml is missing or invalid."""
+    pass
+
+
+def get_context_path(project_root: Union[str, Path]) -> Path:
+    """Get the path to a project's AI_CONTEXT.yaml.
+
+    Args:
+        project_root: Path to the project root
+
+    Returns:
+        Path: Path to the context file (may not exist yet)
+    """
+    return get_ai_directory_path(project_root) / CONTEXT_FILENAME
+
+
+def default_context(project_name: str) -> Dict[str, Any]:
+    """Build the initial context document written by ``init``.
+
+    Args:
+        project_name: Name of the project
+
+    Returns:
+        Dict[str, Any]: Template context
+    """
+    return {
+        "project": {
+            "name": project_name,
+            "description": "",
+            "repository": "",
+        },
+        "tech_stack": {
+            "languages": [],
+            "frameworks": [],
+        },
+        "architecture": {
+            "overview": "",
+            "components": [],
+        },
+        "conventions": {
+            "coding_style": [],
+            "testing": "",
+        },
+        "topics": {},
+    }
+
+
+@lru_cache(maxsize=1)
+def _yaml() -> Tuple[Any, Any, Any]:
+    """Import yaml on first use, preferring the libyaml C loader and dumper.
+
+    Cache hits never need yaml, so commands like ``status`` skip the import.
+    """
+    import yaml
+
+    try:
+        from yaml import CSafeDumper as SafeDumper
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:  # libyaml not available
+        from yaml import SafeDumper, SafeLoader
+    return yaml, SafeLoader, SafeDumper
+
+
+def dump_yaml(data: Any) -> str:
+    """Serialize data as block-style YAML, preserving key order."""
+    yaml, _, dumper = _yaml()
+    return yaml.dump(data, Dumper=dumper, sort_keys=False, allow_unicode=True, default_flow_style=False)
+
+
+def parse_yaml(text: str) -> Any:
+    """Parse YAML with the libyaml loader when available."""
+    yaml, loader, _ = _yaml()
+    try:
+        return yaml.load(text, Loader=loader)
+    except yaml.YAMLError as e:
+        raise ContextError(f"Invalid YAML: {e}")
+
+
+def parse_assignment(text: str) -> Tuple[str, Any]:
+    """Parse a ``key=value`` assignment; the value is parsed as YAML.
+
+    Args:
+        text: Assignment such as ``project.name=demo`` or ``tags=[a, b]``
+
+    Returns:
+        Tuple[str, Any]: Dotted key and parsed value
+
+    Raises:
+        ContextError: If the assignment has no ``=`` or an empty key
+    """
+    key, sep, value = text.partition("=")
+    key = key.strip()
+    if not sep or not key:
+        raise ContextError(f"Invalid assignment '{text}'. Expected KEY=VALUE.")
+    return key, parse_yaml(value)
+
+
+def set_path(document: Dict[str, Any], dotted_key: str, value: Any) -> None:
+    """Set a dotted key in a nested mapping, creating mappings as needed.
+
+    Args:
+        document: Mapping to modify in place
+        dotted_key: Key such as ``project.owner.name``
+        value: Value to assign
+
+    Raises:
+        ContextError: If an intermediate key holds a non-mapping value
+    """
+    parts = dotted_key.split(".")
+    if not all(parts):
+        raise ContextError(f"Invalid key '{dotted_key}'")
+
+    node = document
+    for depth, part in enumerate(parts[:-1]):
+        child = node.get(part)
+        if child is None:
+            child = node[part] = {}
+        elif not isinstance(child, dict):
+            prefix = ".".join(parts[:depth + 1])
+            raise ContextError(f"Cannot set '{dotted_key}': '{prefix}' is not a mapping")
+        node = child
+    node[parts[-1]] = value
+
+
+def _json_payload(value: Any) -> Optional[str]:
+    try:
+        payload = json.dumps(value, ensure_ascii=False, allow_nan=False)
+    except (TypeError, ValueError):
+        return None  # e.g. dates or sets
+    # None for e.g. non-string keys, which JSON turns into strings
+    return payload if json.loads(payload) == value else None
+
+
+def encode_section(name: str, value: Any) -> Section:
+    """Serialize one top-level section for the context file and its cache."""
+    return _json_payload(value), dump_yaml({name: value})
+
+
+def parse_sections(text: str) -> Dict[str, Section]:
+    """Parse a context file into sections that keep their source text.
+
+    Each top-level key's text runs from the key (or the column-0 comments
+    and blank lines just above it) to the next section. Text before the
+    first key belongs to the first section. Files that cannot be cut into
+    self-contained slices (flow style, indented or duplicate top-level keys,
+    anchors) fall back to re-serialized text.
+
+    Args:
+        text: Contents of AI_CONTEXT.yaml
+
+    Returns:
+        Dict[str, Section]: Sections in file order
+
+    Raises:
+        ContextError: If the text is not valid YAML or not a mapping
+    """
+    yaml, loader_class, _ = _yaml()
+    loader = loader_class(text)
+    try:
+        node = loader.get_single_node()
+        document = loader.construct_document(node) if node is not None else None
+    except yaml.YAMLError as e:
+        raise ContextError(f"Invalid YAML: {e}")
+    finally:
+        loader.dispose()
+    if document is None:
+        return {}
+    if not isinstance(document, dict):
+        raise ContextError(f"{CONTEXT_FILENAME} must contain a mapping at the top level")
+
+    keys = [key for key, _ in node.value]
+    names = [str(name) for name in document]
+    sliceable = (
+        not node.flow_style
+        and len(keys) == len(names)
+        and all(key.start_mark.column == 0 for key in keys)
+        and not _ANCHOR_RE.search(text)
+    )
+    if not sliceable:
+        return {name: encode_section(name, value) for name, value in zip(names, document.values())}
+
+    lines = text.splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
+    starts = [0]
+    for key in keys[1:]:
+        start = key.start_mark.line
+        while start > starts[-1] + 1 and (lines[start - 1].startswith("#") or not lines[start - 1].strip()):
+            start -= 1
+        starts.append(start)
+    ends = starts[1:] + [len(lines)]
+    return {
+        name: (_json_payload(value), "".join(lines[start:end]))
+        for name, value, start, end in zip(names, document.values(), starts, ends)
+    }
+
+
+def _decode_section(name: str, section: Section) -> Any:
+    payload, text = section
+    if payload is not None:
+        return json.loads(payload)
+    document = parse_yaml(text)
+    return document.get(name) if isinstance(document, dict) else None
+
+
+class LazyContext(Mapping):
+    """Read-only mapping of context sections, decoded on first access."""
+
+    def __init__(self, sections: Dict[str, Section]):
+        self._sections = sections
+        self._values: Dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._values:
+            self._values[name] = _decode_section(name, self._sections[name])
+        return self._values[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sections)
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    def section_text(self, name: str) -> str:
+        """Return the YAML text of one section without materializing it."""
+        return self._sections[name][1]
+
+    def get_path(self, dotted_key: str, default: Any = None) -> Any:
+        """Look up a dotted key such as ``project.name``."""
+        head, _, rest = dotted_key.partition(".")
+        if head not in self._sections:
+            return default
+        value = self[head]
+        for part in rest.split(".") if rest else ():
+            if not isinstance(value, dict) or part not in value:
+                return default
+            value = value[part]
+        return value
+
+    def copy_section(self, name: str) -> Any:
+        """Return a private deep copy of a section, safe to modify."""
+        return _decode_section(name, self._sections[name])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize every section into a plain dict."""
+        return {name: self[name] for name in self._sections}
+
+    @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> "LazyContext":
+        """Build a lazy context from a parsed document."""
+        sections = {str(name): encode_section(str(name), value) for name, value in document.items()}
+        return cls(sections)
+
+
+class ContextManager:
+    """Access to a project's AI_CONTEXT.yaml with stat-keyed caching."""
+
+    def __init__(self, project_root: Union[str, Path]):
+        self.project_root = Path(project_root)
+        self.path = get_context_path(project_root)
+        self.cache_path = get_cache_directory_path(project_root) / CACHE_FILENAME
+        self.lock_path = get_cache_directory_path(project_root) / LOCK_FILENAME
+
+    def exists(self) -> bool:
+        """Return True if the context file exists."""
+        return self.path.exists()
+
+    def _stat_key(self) -> Tuple[int, int, int]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            raise ContextError(
+                f"{CONTEXT_FILENAME} not found. Run 'ai-assist init' first to initialize the project."
+            )
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def load(self) -> LazyContext:
+        """Load the context, using the memory or disk cache when fresh.
+
+        Returns:
+            LazyContext: Lazily materialized context sections
+
+        Raises:
+            ContextError: If the file is missing or is not a YAML mapping
+        """
+        key = self._stat_key()
+        cached = _memory_cache.get(str(self.path))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        context = self._load_disk_cache(key)
+        if context is None:
+            caches.record(self.project_root, "context", misses=1)
+            context = self._parse()
+            self._write_disk_cache(key, context)
+        else:
+            caches.record(self.project_root, "context", hits=1)
+
+        _memory_cache[str(self.path)] = (key, context)
+        return context
+
+    def _parse(self) -> LazyContext:
+        return LazyContext(parse_sections(self.path.read_text(encoding="utf-8")))
+
+    def _load_disk_cache(self, key: Tuple[int, int, int]) -> Optional[LazyContext]:
+        try:
+            with open(self.cache_path, "rb") as handle:
+                data = json.load(handle)
+            if data.get("version") != CACHE_VERSION or tuple(data.get("key", ())) != key:
+                return None
+            sections = {
+                name: (payload, text)
+                for name, (payload, text) in data["sections"].items()
+                if (payload is None or isinstance(payload, str)) and isinstance(text, str)
+            }
+        except (OSError, ValueError, TypeError, AttributeError, KeyError):
+            return None
+        if len(sections) != len(data["sections"]):
+            return None
+        return LazyContext(sections)
+
+    def _write_disk_cache(self, key: Tuple[int, int, int], context: LazyContext) -> None:
+        data = {"version": CACHE_VERSION, "key": list(key), "sections": context._sections}
+        try:
+            atomic_write_bytes(self.cache_path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        except AIAssistError:
+            # The cache is an optimization; a read-only AI directory still works
+            return
+        try:
+            os.unlink(self.cache_path.with_name(LEGACY_CACHE_FILENAME))
+        except OSError:
+            pass
+
+    def write(self, document: Mapping[str, Any]) -> None:
+        """Replace the context file atomically and refresh the caches.
+
+        Args:
+            document: Complete context document
+        """
+        with file_lock(self.lock_path):
+            self._write_sections(LazyContext.from_document(document)._sections)
+
+    def update(self, assignments: Iterable[Tuple[str, Any]]) -> LazyContext:
+        """Apply dotted-key assignments in one locked, atomic write.
+
+        The context is re-read under the lock, so concurrent updaters never
+        lose each other's changes. Only the top-level sections touched by the
+        assignments are re-serialized.
+
+        Args:
+            assignments: ``(dotted_key, value)`` pairs, applied in order
+
+        Returns:
+            LazyContext: The updated context
+
+        Raises:
+            ContextError: If the context is missing or a key cannot be set
+        """
+        with file_lock(self.lock_path):
+            context = self.load()
+            sections = dict(context._sections)
+            touched: Dict[str, Any] = {}
+
+            for dotted_key, value in assignments:
+                head, _, rest = dotted_key.partition(".")
+                if not head:
+                    raise ContextError(f"Invalid key '{dotted_key}'")
+                if head not in touched:
+                    touched[head] = context.copy_section(head) if head in sections else None
+                if not rest:
+                    touched[head] = value
+                    continue
+                if touched[head] is None:
+                    touched[head] = {}
+                if not isinstance(touched[head], dict):
+                    raise ContextError(f"Cannot set '{dotted_key}': '{head}' is not a mapping")
+                set_path(touched[head], rest, value)
+
+            for head, value in touched.items():
+                sections[head] = encode_section(head, value)
+            return self._write_sections(sections)
+
+    def _write_sections(self, sections: Dict[str, Section]) -> LazyContext:
+        """Write pre-serialized sections and refresh both caches."""
+        text = "".join(section_text for _, section_text in sections.values())
+        atomic_write_bytes(self.path, text.encode("utf-8"))
+        context = LazyContext(sections)
+        key = self._stat_key()
+        _memory_cache[str(self.path)] = (key, context)
+        self._write_disk_cache(key, context)
+        return context
+
+
+def clear_memory_cache() -> None:
+    """Drop all in-process parsed contexts."""
+    _memory_cache.clear()
@@ -1,8 +1,17 @@
 """Core utilities and validation for AI Project Assistant."""
 
 import os
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Union
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
 
 class AIAssistError(Exception):
@@ -20,8 +29,117 @@ class AIDirectoryError(AIAssistError):
     pass
 
 
+# Common indicators of a project root
+PROJECT_INDICATORS = (
+    # Version control
+    '.git',
+    '.gitignore',
+    # Python projects
+    'setup.py', 'pyproject.toml', 'requirements.txt', 'Pipfile',
+    # Node.js projects
+    'package.json',
+    # Other common project files
+    'README.md', 'README.rst', 'README.txt',
+    'Makefile', 'docker-compose.yml', 'Dockerfile',
+    # Source directories
+    'src', 'lib',
+)
+
+# Discovered roots for this process, keyed by resolved start directory
+_project_root_cache: Dict[str, "ProjectRoot"] = {}
+
+
+@dataclass(frozen=True)
+class ProjectRoot:
+    """A discovered project root and the indicators that identified it."""
+
+    path: Path
+    indicators: Tuple[str, ...]
+
+
+def _scan_indicators(directory: str) -> Tuple[Tuple[str, ...], bool]:
+    """List a directory once and report its project indicators.
+
+    Returns:
+        Tuple[Tuple[str, ...], bool]: Matched indicators, and whether the
+        directory is definitely a root (a git checkout or an initialized AI
+        directory)
+    """
+    try:
+        with os.scandir(directory) as it:
+            names = {entry.name for entry in it}
+    except OSError:
+        return (), False
+
+    matched = tuple(name for name in PROJECT_INDICATORS if name in names)
+    definite = ".git" in names or (
+        "AI" in names and os.path.isfile(os.path.join(directory, "AI", "AI_CONTEXT.yaml"))
+    )
+    return matched, definite
+
+
+def find_project_root(path: Optional[Union[str, Path]] = None) -> ProjectRoot:
+    """Find the project root for a directory, walking upward if needed.
+
+    Each candidate directory is listed once with ``os.scandir`` instead of
+    probing every indicator separately. The nearest ancestor that is a git
+    checkout or holds an initialized AI directory wins; otherwise the
+    nearest directory with any indicator is used. The filesystem root and
+    the home directory are never treated as project roots.
+
+    Results are cached for the process, keyed by the start directory, so a
+    nested project is never resolved to a root found from its parent.
+
+    Args:
+        path: Directory to start from. Defaults to the current working directory.
+
+    Returns:
+        ProjectRoot: Discovered root
+
+    Raises:
+        ProjectRootError: If no project root is found
+    """
+    start = os.path.realpath(os.getcwd() if path is None else str(path))
+    cached = _project_root_cache.get(start)
+    if cached is not None:
+        return cached
+
+    result = _discover_project_root(start)
+    _project_root_cache[start] = result
+    return result
+
+
+def _discover_project_root(start: str) -> ProjectRoot:
+    home = os.path.realpath(os.path.expanduser("~"))
+    nearest: Optional[ProjectRoot] = None
+    directory = start
+    while True:
+        parent = os.path.dirname(directory)
+        if parent == directory or directory == home:
+            break
+        matched, definite = _scan_indicators(directory)
+        if definite:
+            return ProjectRoot(Path(directory), matched)
+        if matched and nearest is None:
+            nearest = ProjectRoot(Path(directory), matched)
+        directory = parent
+
+    if nearest is not None:
+        return nearest
+    raise ProjectRootError(
+        f"Current directory '{start}' doesn't appear to be a project root. "
+        f"Expected to find at least one of: {', '.join(PROJECT_INDICATORS[:5])}... "
+        f"Please run ai-assist from your project root directory."
+    )
+
+
+def clear_project_root_cache() -> None:
+    """Forget discovered roots (for tests and long-lived processes)."""
+    _project_root_cache.clear()
+
+
 def validate_project_root(path: Optional[Union[str, Path]] = None) -> Path:
-    """Validate that we're running from a project root directory.
+    """Validate that we're running inside a project and return its root.
     
     Args:
         path: Optional path to validate. Defaults to current working directory.
@@ -32,39 +150,7 @@ def validate_project_root(path: Optional[Union[str, Path]] = None) -> Path:
     Raises:
         ProjectRootError: If not in a valid project root
     """
-    if path is None:
-        path = Path.cwd()
-    else:
-        path = Path(path)
-    
-    # Check if we're in a directory that looks like a project root
-    # Common indicators of project root:
-    project_indicators = [
-        # Version control
-        '.git',
-        '.gitignore',
-        # Python projects
-        'setup.py', 'pyproject.toml', 'requirements.txt', 'Pipfile',
-        # Node.js projects
-        'package.json',
-        # Other common project files
-        'README.md', 'README.rst', 'README.txt',
-        'Makefile', 'docker-compose.yml', 'Dockerfile',
-        # Source directories
-        'src', 'lib',
-    ]
-    
-    # Check if any indicators exist
-    has_indicators = any((path / indicator).exists() for indicator in project_indicators)
-    
-    if not has_indicators:
-        raise ProjectRootError(
-            f"Current directory '{path}' doesn't appear to be a project root. "
-            f"Expected to find at least one of: {', '.join(project_indicators[:5])}... "
-            f"Please run ai-assist from your project root directory."
-        )
-    
-    return path.resolve()
+    return find_project_root(path).path
 
 
 def get_ai_directory_path(project_root: Union[str, Path]) -> Path:
@@ -79,8 +165,23 @@ def get_ai_directory_path(project_root: Union[str, Path]) -> Path:
     return Path(project_root) / "AI"
 
 
+def get_cache_directory_path(project_root: Union[str, Path]) -> Path:
+    """Get the path to the cache directory inside the AI directory.
+
+    Args:
+        project_root: Path to the project root
+
+    Returns:
+        Path: Path to AI/.cache (may not exist yet)
+    """
+    return get_ai_directory_path(project_root) / ".cache"
+
+
 def ensure_ai_directory(project_root: Union[str, Path]) -> Path:
     """Ensure the AI directory exists, creating it if necessary.
+
+    A new AI directory gets a ``.gitignore`` that keeps the machine-local
+    caches (``.cache/`` and the retrieval ``index/``) out of version control.
     
     Args:
         project_root: Path to the project root
@@ -95,9 +196,113 @@ def ensure_ai_directory(project_root: Union[str, Path]) -> Path:
     
     try:
         ai_dir.mkdir(exist_ok=True)
-        return ai_dir
     except OSError as e:
         raise AIDirectoryError(f"Failed to create AI directory '{ai_dir}': {e}")
+    gitignore = ai_dir / GITIGNORE_FILENAME
+    if not gitignore.exists():
+        try:
+            atomic_write_bytes(gitignore, AI_GITIGNORE.encode("utf-8"))
+        except AIDirectoryError:
+            pass  # Only a convenience; the AI directory itself is usable
+    return ai_dir
+
+
+def atomic_write_bytes(path: Union[str, Path], data: bytes, fsync: bool = True) -> None:
+    """Write bytes to a file atomically via a temporary file and rename.
+
+    Readers either see the previous contents or the new contents, never a
+    partially written file.
+
+    Args:
+        path: Destination file path
+        data: Bytes to write
+        fsync: Flush the contents to stable storage before the rename
+
+    Raises:
+        AIDirectoryError: If the file cannot be written
+    """
+    with atomic_writer(path, "wb", fsync=fsync) as handle:
+        handle.write(data)
+
+
+@contextmanager
+def atomic_writer(
+    path: Union[str, Path],
+    mode: str = "w",
+    encoding: Optional[str] = "utf-8",
+    fsync: bool = True,
+) -> Iterator[IO]:
+    """Stream into a temporary file that replaces ``path`` when the block exits.
+
+    Like ``atomic_write_bytes``, but the contents never have to be held in
+    memory. If the block raises, the temporary file is removed and ``path``
+    is left untouched.
+
+    Args:
+        path: Destination file path
+        mode: ``"w"`` for text or ``"wb"`` for bytes
+        encoding: Text encoding (ignored in binary mode)
+        fsync: Flush the contents to stable storage before the rename
+
+    Yields:
+        IO: File handle to write to
+
+    Raises:
+        AIDirectoryError: If the file cannot be written
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(tmp_path, mode, encoding=None if "b" in mode else encoding)
+    except OSError as e:
+        raise AIDirectoryError(f"Failed to write '{path}': {e}")
+
+    try:
+        with handle:
+            yield handle
+            if fsync:
+                handle.flush()
+                os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+    except BaseException as e:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        if isinstance(e, OSError):
+            raise AIDirectoryError(f"Failed to write '{path}': {e}")
+        raise
+
+
+@contextmanager
+def file_lock(path: Union[str, Path]) -> Iterator[None]:
+    """Hold an exclusive advisory lock on a lock file.
+
+    On platforms without ``fcntl`` this is a no-op.
+
+    Args:
+        path: Lock file path (created if missing)
+
+    Raises:
+        AIDirectoryError: If the lock file cannot be opened
+    """
+    path = Path(path)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(path, "a+b")
+    except OSError as e:
+        raise AIDirectoryError(f"Failed to open lock file '{path}': {e}")
+
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        handle.close()
 
 
 def is_ai_directory_initialized(project_root: Union[str, Path]) -> bool:
@@ -127,4 +332,231 @@ def get_project_name(project_root: Union[str, Path]) -> str:
     project_root = Path(project_root)
     
     # Try to get name from directory
-    return project_root.name
\ No newline at end of file
+    return project_root.name
+
+
+# Ignore rules that apply to every project, with the lowest precedence, so a
+# project's own ignore files can re-include any of them with ``!pattern``.
+DEFAULT_IGNORE_PATTERNS = (
+    ".git/",
+    "/AI/",
+    "node_modules/",
+    ".venv/",
+    "venv/",
+    "__pycache__/",
+    ".tox/",
+    ".nox/",
+    ".mypy_cache/",
+    ".pytest_cache/",
+    ".ruff_cache/",
+    "*.egg-info/",
+    "/build/",
+    "/dist/",
+)
+
+GITIGNORE_FILENAME = ".gitignore"
+AIIGNORE_FILENAME = ".aiignore"
+
+# Written to AI/.gitignore by ``init``: caches are machine-local
+AI_GITIGNORE = "# Machine-local caches, rebuilt on demand\n.cache/\nindex/\n"
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate one gitignore glob (without flags) to a regex fragment."""
+    out: List[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+                continue
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+class IgnoreMatcher:
+    """Compiled gitignore-style rules from one ignore file.
+
+    All patterns are compiled into a single alternation regex, in reverse
+    order, so the first alternative that matches is the last matching rule
+    in the file (gitignore's "last match wins"). The index of the matching
+    group tells whether that rule was a negation.
+
+    Args:
+        patterns: Lines of an ignore file
+        base: Directory the file applies to, relative to the project root
+            (POSIX style, ``""`` for the root)
+    """
+
+    def __init__(self, patterns: Iterable[str], base: str = ""):
+        self.base = base
+        rules: List[Tuple[str, bool, bool]] = []
+        for line in patterns:
+            rule = self._parse(line)
+            if rule is not None:
+                rules.append(rule)
+
+        self._file_negated: List[bool] = []
+        self._dir_negated: List[bool] = []
+        file_parts: List[str] = []
+        dir_parts: List[str] = []
+        for regex, negated, dir_only in reversed(rules):
+            dir_parts.append(f"({regex})")
+            self._dir_negated.append(negated)
+            if not dir_only:
+                file_parts.append(f"({regex})")
+                self._file_negated.append(negated)
+
+        self._file_re = re.compile("|".join(file_parts)) if file_parts else None
+        self._dir_re = re.compile("|".join(dir_parts)) if dir_parts else None
+
+    @staticmethod
+    def _parse(line: str) -> Optional[Tuple[str, bool, bool]]:
+        line = line.rstrip("\n\r")
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            return None
+
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+
+        anchored = "/" in line
+        line = line.lstrip("/")
+        regex = _translate_glob(line)
+        if not anchored:
+            regex = "(?:.*/)?" + regex
+        return regex + r"\Z", negated, dir_only
+
+    def __bool__(self) -> bool:
+        return self._dir_re is not None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """Decide whether a path is ignored by these rules.
+
+        Args:
+            rel_path: Path relative to the project root, POSIX style
+            is_dir: Whether the path is a directory
+
+        Returns:
+            Optional[bool]: True if ignored, False if re-included by a
+            negated rule, None if no rule matches
+        """
+        regex, negated = (self._dir_re, self._dir_negated) if is_dir else (self._file_re, self._file_negated)
+        if regex is None:
+            return None
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        found = regex.match(rel_path)
+        if found is None:
+            return None
+        return not negated[found.lastindex - 1]
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], base: str = "") -> Optional["IgnoreMatcher"]:
+        """Load an ignore file, returning None if it is missing or has no rules."""
+        try:
+            with open(path, encoding="utf-8", errors="replace") as handle:
+                matcher = cls(handle, base)
+        except OSError:
+            return None
+        return matcher if matcher else None
+
+
+def _is_ignored(matchers: Sequence[IgnoreMatcher], rel_path: str, is_dir: bool) -> bool:
+    """Apply matchers in precedence order; the first with an opinion decides."""
+    for matcher in matchers:
+        decision = matcher.match(rel_path, is_dir)
+        if decision is not None:
+            return decision
+    return False
+
+
+def walk_project(project_root: Union[str, Path], dirs: bool = False) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Yield every non-ignored regular file in a project.
+
+    Honors ``.gitignore`` files at any depth, ``.git/info/exclude``,
+    ``AI/.aiignore`` and ``DEFAULT_IGNORE_PATTERNS``. Ignored directories are
+    pruned without being listed, and entries come from ``os.scandir`` so
+    callers can reuse their cached ``stat`` results.
+
+    Precedence, highest first: ``AI/.aiignore``, ``.gitignore`` files from the
+    deepest directory upwards, ``.git/info/exclude``, the built-in defaults.
+
+    Args:
+        project_root: Path to the project root
+        dirs: Also yield each non-ignored directory before descending into it
+
+    Yields:
+        Tuple[str, os.DirEntry]: POSIX-style relative path and entry of each file
+    """
+    root = str(project_root)
+    overrides = [m for m in (IgnoreMatcher.from_file(get_ai_directory_path(root) / AIIGNORE_FILENAME),) if m]
+    fallbacks = [m for m in (IgnoreMatcher.from_file(Path(root) / ".git" / "info" / "exclude"),) if m]
+    fallbacks.append(IgnoreMatcher(DEFAULT_IGNORE_PATTERNS))
+
+    # Each stack item: (directory path, relative prefix, gitignore matchers deepest first)
+    stack: List[Tuple[str, str, Tuple[IgnoreMatcher, ...]]] = [(root, "", ())]
+    while stack:
+        directory, prefix, gitignores = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        if any(entry.name == GITIGNORE_FILENAME for entry in entries):
+            local = IgnoreMatcher.from_file(os.path.join(directory, GITIGNORE_FILENAME), prefix.rstrip("/"))
+            if local is not None:
+                gitignores = (local,) + gitignores
+        matchers = overrides + list(gitignores) + fallbacks
+
+        for entry in entries:
+            rel_path = prefix + entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not _is_ignored(matchers, rel_path, True):
+                        if dirs:
+                            yield rel_path, entry
+                        stack.append((entry.path, rel_path + "/", gitignores))
+                elif entry.is_file(follow_symlinks=False):
+                    if not _is_ignored(matchers, rel_path, False):
+                        yield rel_path, entry
+            except OSError:
+                continue
+
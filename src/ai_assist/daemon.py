@@ -0,0 +1,306 @@
+"""Persistent ``ai-assist serve`` daemon.
+
+The daemon listens on a Unix socket (``AI/.cache/daemon.sock``) and runs CLI
+commands in-process, so imports, the parsed AI_CONTEXT, the file index and
+the compiled templates stay in memory between invocations. A watcher thread
+(inotify, or polling as a fallback) re-scans the project shortly after files
+change, so the next ``preamble`` finds the index already up to date.
+
+The client side and the wire format live in ``ai_assist.client``.
+"""
+
+import io
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from struct import error as struct_error
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from .client import (
+    EXIT_CODE,
+    FORWARDED_ENV,
+    FRAME_HEADER,
+    decode_request,
+    send_frame,
+    socket_path,
+)
+from .core import AIAssistError
+
+
+# Seconds of quiet after a change before the watcher refreshes the index
+DEBOUNCE_SECONDS = 0.2
+
+# Seconds a client may take to send its request, and to accept each output
+# frame, before the daemon drops it and serves the next connection
+REQUEST_TIMEOUT = 5.0
+SEND_TIMEOUT = 30.0
+
+
+class DaemonError(AIAssistError):
+    """Raised when the daemon cannot start."""
+    pass
+
+
+def get_socket_path(project_root: Union[str, Path]) -> Path:
+    """Get the daemon socket path for a project.
+
+    Args:
+        project_root: Path to the project root
+
+    Returns:
+        Path: AI/.cache/daemon.sock, or a temp-directory path if that is too
+        long for a Unix socket (may not exist)
+    """
+    return Path(socket_path(project_root))
+
+
+class _FrameSink(io.RawIOBase):
+    """Raw stream that sends every write as one frame of the given kind."""
+
+    def __init__(self, conn: socket.socket, kind: bytes):
+        self.conn = conn
+        self.kind = kind
+        self.broken = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if data and not self.broken:
+            try:
+                send_frame(self.conn, self.kind, bytes(data))
+            except OSError:
+                # Client went away; let the command finish and discard output
+                self.broken = True
+        return len(data)
+
+
+def _text_stream(conn: socket.socket, kind: bytes) -> io.TextIOWrapper:
+    return io.TextIOWrapper(
+        io.BufferedWriter(_FrameSink(conn, kind), 64 * 1024),
+        encoding="utf-8",
+        errors="replace",
+        line_buffering=False,
+    )
+
+
+class Daemon:
+    """Serve CLI commands for one project over a Unix socket."""
+
+    def __init__(
+        self,
+        project_root: Union[str, Path],
+        polling: bool = False,
+        poll_interval: float = 1.0,
+        idle_timeout: Optional[float] = None,
+        log: Optional[Callable[[str], None]] = None,
+    ):
+        self.root = Path(project_root)
+        self.socket_path = get_socket_path(self.root)
+        self.polling = polling
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        # Bound now: while a command runs, sys.stderr points at the client
+        self.log = log or (lambda message, stream=sys.stderr: print(message, file=stream, flush=True))
+        self.watcher = None
+        self.requests = 0
+        self.refreshes = 0
+        self._lock = threading.RLock()
+        self._stopping = threading.Event()
+        self._listener: Optional[socket.socket] = None
+        self._last_activity = time.monotonic()
+
+    # -- lifecycle -------------------------------------------------------
+
+    def bind(self) -> None:
+        """Create the listening socket, replacing a stale one."""
+        if self.socket_path.exists():
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(self.socket_path))
+            except OSError:
+                self.socket_path.unlink()  # Left behind by a daemon that died
+            else:
+                raise DaemonError(f"A daemon is already serving {self.root} on {self.socket_path}")
+            finally:
+                probe.close()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            listener.bind(str(self.socket_path))
+        except OSError as e:
+            listener.close()
+            raise DaemonError(f"Cannot listen on {self.socket_path}: {e}")
+        finally:
+            os.umask(old_umask)
+        listener.listen(16)
+        listener.settimeout(0.5)
+        self._listener = listener
+
+    def start_watcher(self) -> str:
+        """Start the change watcher thread and return its kind."""
+        from .watch import InotifyWatcher, open_watcher
+
+        self.watcher = open_watcher(self.root, polling=self.polling, interval=self.poll_interval)
+        thread = threading.Thread(target=self._watch_loop, name="ai-assist-watch", daemon=True)
+        thread.start()
+        return "inotify" if isinstance(self.watcher, InotifyWatcher) else "polling"
+
+    def serve_forever(self) -> None:
+        """Accept and run requests until stopped or idle for too long."""
+        if self._listener is None:
+            self.bind()
+        try:
+            while not self._stopping.is_set():
+                if self.idle_timeout and time.monotonic() - self._last_activity > self.idle_timeout:
+                    self.log("💤 Idle timeout reached")
+                    break
+                try:
+                    conn, _ = self._listener.accept()
+                except socket.timeout:
+                    continue
+                with conn:
+                    conn.settimeout(REQUEST_TIMEOUT)
+                    self._handle(conn)
+                self._last_activity = time.monotonic()
+        finally:
+            self.close()
+
+    def stop(self) -> None:
+        """Ask ``serve_forever`` to return."""
+        self._stopping.set()
+
+    def close(self) -> None:
+        """Close the socket (removing its file) and the watcher."""
+        self._stopping.set()
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                pass
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+
+    # -- requests --------------------------------------------------------
+
+    def _handle(self, conn: socket.socket) -> None:
+        reader = conn.makefile("rb")
+        try:
+            kind, length = FRAME_HEADER.unpack(reader.read(FRAME_HEADER.size))
+            payload = reader.read(length)
+            if len(payload) != length:
+                return
+            conn.settimeout(SEND_TIMEOUT)
+            if kind == b"s":
+                self.stop()
+                code = 0
+            elif kind == b"r":
+                argv, cwd, env = decode_request(payload)
+                code = self.run(conn, argv, cwd, env)
+            else:
+                return
+        except (OSError, ValueError, IndexError, struct_error):
+            return
+        try:
+            send_frame(conn, b"x", EXIT_CODE.pack(code))
+        except OSError:
+            pass
+
+    def run(self, conn: socket.socket, argv: List[str], cwd: str, env: Dict[str, str]) -> int:
+        """Run one CLI invocation with its output streamed to ``conn``."""
+        from .cli import main
+
+        stdout = _text_stream(conn, b"o")
+        stderr = _text_stream(conn, b"e")
+        with self._lock:
+            self.requests += 1
+            saved_cwd = os.getcwd()
+            saved_env = {name: os.environ.get(name) for name in FORWARDED_ENV}
+            try:
+                os.chdir(cwd)
+                for name in FORWARDED_ENV:
+                    if name in env:
+                        os.environ[name] = env[name]
+                    else:
+                        os.environ.pop(name, None)
+                with redirect_stdout(stdout), redirect_stderr(stderr):
+                    try:
+                        # Extraction runs inline, as in ``refresh``: no pools forked from threads
+                        main.main(args=argv, prog_name="ai-assist", standalone_mode=True, obj={"jobs": 1})
+                        code = 0
+                    except SystemExit as e:
+                        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                    except Exception:
+                        traceback.print_exc()
+                        code = 1
+            except OSError as e:
+                stderr.write(f"❌ Error: {e}\n")
+                code = 1
+            finally:
+                os.chdir(saved_cwd)
+                for name, value in saved_env.items():
+                    if value is None:
+                        os.environ.pop(name, None)
+                    else:
+                        os.environ[name] = value
+                stdout.flush()
+                stderr.flush()
+        return code
+
+    # -- warm state ------------------------------------------------------
+
+    def _watch_loop(self) -> None:
+        dirty = False
+        while not self._stopping.is_set():
+            watcher = self.watcher
+            if watcher is None:
+                break
+            try:
+                changed = watcher.poll(DEBOUNCE_SECONDS)
+            except (OSError, ValueError):
+                break  # Watcher closed during shutdown
+            if changed:
+                dirty = True
+            elif dirty:
+                self.refresh()
+                dirty = False
+
+    def refresh(self) -> None:
+        """Bring the file index, metadata and retrieval index up to date.
+
+        The scan is incremental, so which paths the watcher reported does
+        not matter; they only decide when a refresh happens. Nothing is
+        logged on success, since a log file inside the project would
+        otherwise keep triggering refreshes.
+        """
+        from .context_manager import ContextManager
+        from .pipeline import run_pipeline
+        from .retrieval import refresh_index
+        from .scanner import FileIndex, get_index_path, scan_project
+
+        with self._lock:
+            try:
+                index = FileIndex.load(get_index_path(self.root))
+                scan = scan_project(self.root, index)
+                pending = [record.path for record in scan.files if record.meta is None]
+                # Inline extraction: forking pools from a threaded daemon is unsafe
+                for path, metadata in run_pipeline(self.root, pending, jobs=1):
+                    index.set_meta(path, metadata or {})
+                manager = ContextManager(self.root)
+                context = manager.load() if manager.exists() else None
+                refresh_index(self.root, index, context)
+                index.save()
+            except Exception as e:
+                self.log(f"⚠️  Refresh failed: {e}")
+                return
+            self.refreshes += 1
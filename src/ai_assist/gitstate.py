@@ -0,0 +1,167 @@
+"""Git-based change detection between ``preamble`` runs.
+
+After ``init`` and every ``preamble`` run the current HEAD commit is recorded
+in ``AI/.cache/git_state.json``, together with the paths that had uncommitted
+changes at that moment. A later run can then ask git which files differ from
+that commit instead of trusting mtimes, which are all new in a fresh
+checkout (CI) even though the content is unchanged.
+
+If git is unavailable, nothing was recorded yet, or the recorded commit is no
+longer an ancestor of HEAD (rebase, force-push, shallow clone), callers fall
+back to a regular fingerprint scan.
+"""
+
+import json
+import os
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Union
+
+from .core import AIAssistError, atomic_write_bytes, get_ai_directory_path, get_cache_directory_path
+
+
+STATE_FILENAME = "git_state.json"
+STATE_VERSION = 1
+
+GIT_TIMEOUT = 30
+
+
+@dataclass
+class GitChanges:
+    """Files git reports as changed since the recorded commit."""
+
+    since: str
+    changed: Set[str]
+    tracked: Set[str]
+
+    def is_unchanged(self, rel_path: str) -> bool:
+        """Return True if git vouches that a file's content is unchanged."""
+        return rel_path in self.tracked and rel_path not in self.changed
+
+
+def get_state_path(project_root: Union[str, Path]) -> Path:
+    """Get the path to the recorded git state.
+
+    Args:
+        project_root: Path to the project root
+
+    Returns:
+        Path: Path to AI/.cache/git_state.json (may not exist yet)
+    """
+    return get_cache_directory_path(project_root) / STATE_FILENAME
+
+
+def run_git(project_root: Union[str, Path], *args: str) -> Optional[bytes]:
+    """Run a git command in the project root.
+
+    Args:
+        project_root: Working directory for git
+        *args: Git arguments
+
+    Returns:
+        Optional[bytes]: Standard output, or None if git is missing or fails
+    """
+    try:
+        completed = subprocess.run(
+            ["git", *args],
+            cwd=str(project_root),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=GIT_TIMEOUT,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if completed.returncode != 0:
+        return None
+    return completed.stdout
+
+
+def _paths(output: Optional[bytes]) -> Set[str]:
+    """Split NUL-separated ``-z`` output into paths."""
+    if not output:
+        return set()
+    return {path for path in output.decode("utf-8", "surrogateescape").split("\0") if path}
+
+
+def head_commit(project_root: Union[str, Path]) -> Optional[str]:
+    """Return the full hash of HEAD, or None outside a git work tree."""
+    output = run_git(project_root, "rev-parse", "--verify", "--quiet", "HEAD")
+    return output.decode("ascii").strip() if output else None
+
+
+def _changed_since(project_root: Union[str, Path], commit: str) -> Optional[Set[str]]:
+    """Paths under the project root whose working-tree content differs from a commit."""
+    output = run_git(project_root, "diff", "--name-only", "--no-renames", "--relative", "-z", commit, "--")
+    return None if output is None else _paths(output)
+
+
+def load_state(project_root: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """Load the recorded git state, or None if missing or unreadable."""
+    try:
+        with open(get_state_path(project_root), "rb") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != STATE_VERSION or not data.get("commit"):
+        return None
+    return data
+
+
+def record_state(project_root: Union[str, Path]) -> Optional[str]:
+    """Record the current HEAD and dirty paths for the next run.
+
+    Args:
+        project_root: Path to the project root
+
+    Returns:
+        Optional[str]: The recorded commit, or None outside a git work tree
+    """
+    commit = head_commit(project_root)
+    if commit is None:
+        return None
+    dirty = _changed_since(project_root, commit)
+    if dirty is None:
+        return None
+
+    data = {"version": STATE_VERSION, "commit": commit, "dirty": sorted(dirty)}
+    try:
+        atomic_write_bytes(get_state_path(project_root), json.dumps(data, separators=(",", ":")).encode("utf-8"))
+    except AIAssistError:
+        return None
+    try:
+        # Older versions kept the state in AI/ itself, where git tracked it
+        os.unlink(get_ai_directory_path(project_root) / STATE_FILENAME)
+    except OSError:
+        pass
+    return commit
+
+
+def detect_changes(project_root: Union[str, Path]) -> Optional[GitChanges]:
+    """Ask git which files changed since the recorded commit.
+
+    Files that were dirty when the state was recorded are always reported as
+    changed, since the index may hold fingerprints of since-reverted edits.
+
+    Args:
+        project_root: Path to the project root
+
+    Returns:
+        Optional[GitChanges]: Changes, or None if a full scan is required
+    """
+    state = load_state(project_root)
+    if state is None:
+        return None
+    since = state["commit"]
+
+    if run_git(project_root, "merge-base", "--is-ancestor", since, "HEAD") is None:
+        # Recorded commit is gone or history was rewritten
+        return None
+
+    changed = _changed_since(project_root, since)
+    tracked = run_git(project_root, "ls-files", "-z")
+    if changed is None or tracked is None:
+        return None
+
+    changed.update(state.get("dirty", ()))
+    return GitChanges(since, changed, _paths(tracked))
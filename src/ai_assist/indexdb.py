@@ -0,0 +1,273 @@
+"""SQLite storage for the project file index.
+
+The index lives in ``AI/.cache/file_index.sqlite``. Each file is one row of
+a ``WITHOUT ROWID`` table clustered on its relative path, so a point lookup
+is a single B-tree probe and a directory prefix is a contiguous range scan.
+Saves upsert only the rows that changed, in one transaction. A small
+``info`` table holds the file count, the time of the last save and a
+generation number bumped by every save, so ``status`` can describe the
+index without reading it and long-lived processes can tell whether their
+in-memory copy is current.
+
+This module only needs ``sqlite3`` from the standard library, so light
+commands can use it without importing the scanner.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .core import get_cache_directory_path
+
+
+INDEX_FILENAME = "file_index.sqlite"
+SCHEMA_VERSION = 1
+
+# path, mtime_ns, size, digest, meta
+Row = Tuple[str, int, int, str, Optional[Dict[str, Any]]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    meta TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS info (
+    key TEXT PRIMARY KEY,
+    value
+) WITHOUT ROWID;
+"""
+
+_COLUMNS = "path, mtime_ns, size, digest, meta"
+
+
+@dataclass
+class IndexInfo:
+    """Summary of a stored index, read without touching the file rows."""
+
+    files: int
+    generation: int
+    updated_at: float
+    size_bytes: int
+
+    @property
+    def age(self) -> float:
+        """Seconds since the index was last saved."""
+        return max(time.time() - self.updated_at, 0.0)
+
+
+def get_index_path(project_root: Union[str, Path]) -> Path:
+    """Get the path to the file-fingerprint index for a project.
+
+    Args:
+        project_root: Path to the project root
+
+    Returns:
+        Path: Path to the index database (may not exist yet)
+    """
+    return get_cache_directory_path(project_root) / INDEX_FILENAME
+
+
+def prefix_bounds(prefix: str) -> Tuple[str, str]:
+    """Return the half-open path range covering a directory.
+
+    ``src`` covers ``src/...`` but not ``src2/...``: ``0`` is the character
+    right after ``/``.
+    """
+    prefix = prefix.strip("/")
+    return prefix + "/", prefix + "0"
+
+
+def _row(values: tuple) -> Row:
+    path, mtime_ns, size, digest, meta = values
+    return path, mtime_ns, size, digest, json.loads(meta) if meta is not None else None
+
+
+class IndexStore:
+    """Connection to one index database.
+
+    The database is only created by ``write``; reading a missing or
+    corrupt file behaves like an empty index.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self, create: bool = False) -> Optional[sqlite3.Connection]:
+        if self._conn is not None:
+            return self._conn
+        if not create and not self.path.exists():
+            return None
+        try:
+            conn = self._open(create)
+        except (sqlite3.Error, OSError):
+            if not create:
+                return None
+            # Not a database, or an older schema: it is only a cache, start over
+            self._reset()
+            conn = self._open(create)
+        self._conn = conn
+        return conn
+
+    def _open(self, create: bool) -> sqlite3.Connection:
+        if create:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            version = conn.execute("SELECT value FROM info WHERE key = 'version'").fetchone()
+            if version is not None and version[0] != SCHEMA_VERSION:
+                raise sqlite3.DatabaseError(f"index schema version {version[0]} is not {SCHEMA_VERSION}")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def _reset(self) -> None:
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.unlink(f"{self.path}{suffix}")
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        """Close the connection, if open."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def generation(self) -> Optional[int]:
+        """Return the generation of the stored index, or None if there is none."""
+        conn = self._connect()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT value FROM info WHERE key = 'generation'").fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def get(self, rel_path: str) -> Optional[Row]:
+        """Look up one path."""
+        conn = self._connect()
+        if conn is None:
+            return None
+        try:
+            values = conn.execute(f"SELECT {_COLUMNS} FROM files WHERE path = ?", (rel_path,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return _row(values) if values else None
+
+    def scan(self, prefix: str = "") -> Iterator[Row]:
+        """Yield rows in path order, optionally only those under a directory."""
+        conn = self._connect()
+        if conn is None:
+            return
+        if prefix.strip("/"):
+            query = f"SELECT {_COLUMNS} FROM files WHERE path >= ? AND path < ? ORDER BY path"
+            params: tuple = prefix_bounds(prefix)
+        else:
+            query, params = f"SELECT {_COLUMNS} FROM files ORDER BY path", ()
+        try:
+            for values in conn.execute(query, params):
+                yield _row(values)
+        except sqlite3.Error:
+            return
+
+    def snapshot(self) -> Tuple[Optional[int], List[Row]]:
+        """Read the generation and every row in one consistent transaction."""
+        conn = self._connect()
+        if conn is None:
+            return None, []
+        try:
+            conn.execute("BEGIN")
+            try:
+                row = conn.execute("SELECT value FROM info WHERE key = 'generation'").fetchone()
+                rows = [_row(values) for values in conn.execute(f"SELECT {_COLUMNS} FROM files")]
+            finally:
+                conn.execute("COMMIT")
+        except sqlite3.Error:
+            return None, []
+        return (row[0] if row else None), rows
+
+    def write(self, upserts: Iterable[Row], deletes: Iterable[str]) -> int:
+        """Apply changes in a single transaction and return the new generation.
+
+        Raises:
+            sqlite3.Error: If the database cannot be written
+        """
+        conn = self._connect(create=True)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO files ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (path, mtime_ns, size, digest, json.dumps(meta, separators=(",", ":")) if meta is not None else None)
+                    for path, mtime_ns, size, digest, meta in upserts
+                ),
+            )
+            conn.executemany("DELETE FROM files WHERE path = ?", ((path,) for path in deletes))
+            row = conn.execute("SELECT value FROM info WHERE key = 'generation'").fetchone()
+            generation = (row[0] if row else 0) + 1
+            (files,) = conn.execute("SELECT count(*) FROM files").fetchone()
+            conn.executemany(
+                "INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)",
+                [
+                    ("version", SCHEMA_VERSION),
+                    ("generation", generation),
+                    ("files", files),
+                    ("updated_at", time.time()),
+                ],
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return generation
+
+
+def read_info(path: Union[str, Path]) -> Optional[IndexInfo]:
+    """Describe a stored index in constant time.
+
+    Args:
+        path: Path to the index database
+
+    Returns:
+        Optional[IndexInfo]: Counts and freshness, or None if there is no
+        usable index
+    """
+    store = IndexStore(path)
+    try:
+        conn = store._connect()
+        if conn is None:
+            return None
+        try:
+            values = dict(conn.execute("SELECT key, value FROM info"))
+        except sqlite3.Error:
+            return None
+    finally:
+        store.close()
+    if "generation" not in values:
+        return None
+
+    size = 0
+    for suffix in ("", "-wal"):
+        try:
+            size += os.stat(f"{path}{suffix}").st_size
+        except OSError:
+            pass
+    return IndexInfo(
+        files=int(values.get("files", 0)),
+        generation=int(values["generation"]),
+        updated_at=float(values.get("updated_at", 0.0)),
+        size_bytes=size,
+    )
@@ -0,0 +1,452 @@
+"""Asyncio ingestion of newline-delimited JSON log records.
+
+Producers (stdin, or connections to a Unix socket) parse one JSON record
+per line and put it on a bounded queue. A single writer task drains the
+queue in batches and appends each batch with one ``LogStore.append_many``
+call, so a batch costs one lock acquisition and one flush of the segment
+(plus any new blob files, flushed together just before it) however many
+records it holds (group commit). The append runs in a worker thread so the
+event loop keeps accepting input while the disk is busy.
+
+Backpressure: when the disk is slower than the input, the queue fills and
+producers wait in ``queue.put``. They then stop reading, so the kernel
+buffers of the pipe or socket fill and the sender blocks too. Memory use
+is bounded by the queue size.
+
+Socket clients get one JSON line back per record, in input order, once the
+record is durable: ``{"id": "3:17"}`` or ``{"error": "..."}``.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+from .core import AIAssistError
+from .instrument import count
+from .logstore import RESERVED_PREFIX
+
+
+DEFAULT_MAX_BATCH = 256
+
+# Seconds the writer waits for more records before committing a partial batch
+DEFAULT_MAX_DELAY = 0.01
+
+DEFAULT_QUEUE_SIZE = 1024
+
+# Longest accepted input line
+MAX_LINE_BYTES = 64 * 1024 * 1024
+
+REQUIRED_FIELDS = ("model", "prompt")
+
+
+class IngestError(AIAssistError):
+    """Raised when the ingest server cannot start."""
+    pass
+
+
+@dataclass
+class IngestStats:
+    """Counters for one ingest run."""
+
+    records: int = 0
+    batches: int = 0
+    rejected: int = 0
+    failed: int = 0
+
+    def summary(self) -> str:
+        """Return a one-line human readable summary."""
+        text = f"{self.records} records in {self.batches} batches"
+        if self.rejected:
+            text += f", {self.rejected} rejected"
+        if self.failed:
+            text += f", {self.failed} failed to write"
+        return text
+
+
+def parse_record(line: bytes) -> Dict[str, Any]:
+    """Parse and validate one input line.
+
+    Args:
+        line: One line of newline-delimited JSON
+
+    Returns:
+        Dict[str, Any]: The record
+
+    Raises:
+        ValueError: If the line is not a JSON object with string ``model``
+            and ``prompt`` fields, or uses a key reserved by the log store
+    """
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("record must be a JSON object")
+    reserved = sorted(key for key in record if key.startswith(RESERVED_PREFIX))
+    if reserved:
+        raise ValueError(f"keys starting with '{RESERVED_PREFIX}' are reserved: {', '.join(reserved)}")
+    for name in REQUIRED_FIELDS:
+        if not isinstance(record.get(name), str):
+            raise ValueError(f"record needs a string '{name}' field")
+    return record
+
+
+class Ingestor:
+    """Group-committing writer fed through a bounded queue."""
+
+    def __init__(
+        self,
+        store: Any,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        fsync: bool = True,
+    ):
+        self.store = store
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.fsync = fsync
+        self.stats = IngestStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        # One thread: appends are serialized anyway, and order must be kept
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-assist-ingest")
+
+    async def start(self) -> None:
+        """Start the writer task (call from inside the event loop)."""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+
+    async def submit(self, record: Dict[str, Any]) -> "asyncio.Future[str]":
+        """Queue a record, waiting while the queue is full.
+
+        Returns:
+            asyncio.Future[str]: Resolves to the record id once the record's
+            batch is committed, or to the write error
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return future
+
+    async def close(self) -> None:
+        """Commit everything queued so far and stop the writer."""
+        if self._writer is not None:
+            await self._queue.put(None)
+            await self._writer
+            self._writer = None
+        self._executor.shutdown(wait=True)
+
+    async def _write_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch: List[Tuple[Dict[str, Any], asyncio.Future]] = [item]
+            stopping = self._take_ready(batch)
+            if not stopping and len(batch) < self.max_batch and self.max_delay > 0:
+                # Give producers a moment to fill the batch (commit timer)
+                await asyncio.sleep(self.max_delay)
+                stopping = self._take_ready(batch)
+            await self._commit(batch)
+
+    def _take_ready(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> bool:
+        """Move queued records into the batch; return True if the stop marker was seen."""
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return False
+            if item is None:
+                return True
+            batch.append(item)
+        return False
+
+    async def _commit(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        records = [record for record, _ in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            ids = await loop.run_in_executor(self._executor, self.store.append_many, records, self.fsync)
+        except Exception as e:
+            self.stats.failed += len(batch)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.stats.records += len(ids)
+        self.stats.batches += 1
+        count("records_ingested", len(ids))
+        count("batches_committed")
+        for (_, future), record_id in zip(batch, ids):
+            if not future.done():
+                future.set_result(record_id)
+
+
+def _response(future: "asyncio.Future[str]") -> Dict[str, str]:
+    try:
+        return {"id": future.result()}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def _ack_loop(pending: asyncio.Queue, write: Callable[[bytes], Any], drain: Callable[[], Any]) -> None:
+    """Write one response line per record, in input order."""
+    while True:
+        item = await pending.get()
+        if item is None:
+            return
+        if isinstance(item, dict):
+            response = item
+        else:
+            await asyncio.wait([item])
+            response = _response(item)
+        write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+        await drain()
+
+
+async def ingest_lines(
+    ingestor: Ingestor,
+    lines: AsyncIterator[bytes],
+    pending: Optional[asyncio.Queue] = None,
+    on_reject: Optional[Callable[[int, str], None]] = None,
+) -> None:
+    """Feed lines to an ingestor.
+
+    Args:
+        ingestor: Started ingestor
+        lines: Input lines
+        pending: Optional queue receiving each record's future (or an error
+            dict for rejected lines), in order, for acknowledgements
+        on_reject: Called with the 1-based line number and reason for
+            invalid lines
+    """
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            record = parse_record(line)
+        except ValueError as e:
+            ingestor.stats.rejected += 1
+            if on_reject is not None:
+                on_reject(number, str(e))
+            if pending is not None:
+                await pending.put({"error": f"line {number}: {e}"})
+            continue
+        future = await ingestor.submit(record)
+        if pending is not None:
+            await pending.put(future)
+
+
+async def _stream_lines(reader: asyncio.StreamReader) -> AsyncIterator[bytes]:
+    while True:
+        try:
+            line = await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                yield e.partial
+            return
+        yield line
+
+
+async def _file_lines(handle, executor: ThreadPoolExecutor) -> AsyncIterator[bytes]:
+    """Read a blocking file (e.g. redirected stdin) from a helper thread."""
+    loop = asyncio.get_running_loop()
+    while True:
+        line = await loop.run_in_executor(executor, handle.readline, MAX_LINE_BYTES)
+        if not line:
+            return
+        yield line
+
+
+def _pollable(handle) -> bool:
+    """Return True for pipes and sockets, which the event loop can watch."""
+    try:
+        mode = os.fstat(handle.fileno()).st_mode
+    except (OSError, ValueError):
+        return False
+    return stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode)
+
+
+async def ingest_stream(
+    ingestor: Ingestor,
+    source=None,
+    acks=None,
+    on_reject: Optional[Callable[[int, str], None]] = None,
+) -> None:
+    """Ingest newline-delimited JSON from a binary file object until EOF.
+
+    Pipes and sockets are read with asyncio; anything else (regular files,
+    terminals, in-memory streams) is read from a helper thread.
+
+    Args:
+        ingestor: Started ingestor
+        source: Binary input. Defaults to ``sys.stdin.buffer``.
+        acks: Optional binary output receiving one response line per record
+        on_reject: Called with the line number and reason for invalid lines
+    """
+    source = source if source is not None else sys.stdin.buffer
+    loop = asyncio.get_running_loop()
+    reader_thread = None
+    if _pollable(source):
+        reader = asyncio.StreamReader(limit=MAX_LINE_BYTES, loop=loop)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader, loop=loop), source)
+        lines = _stream_lines(reader)
+    else:
+        reader_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-assist-stdin")
+        lines = _file_lines(source, reader_thread)
+
+    pending = None
+    ack_task = None
+    if acks is not None:
+        pending = asyncio.Queue(maxsize=ingestor.queue_size)
+
+        async def flush() -> None:
+            acks.flush()
+
+        ack_task = loop.create_task(_ack_loop(pending, acks.write, flush))
+    try:
+        await ingest_lines(ingestor, lines, pending, on_reject)
+    finally:
+        if ack_task is not None:
+            await pending.put(None)
+            await ack_task
+        if reader_thread is not None:
+            reader_thread.shutdown(wait=False)
+
+
+async def serve_socket(
+    ingestor: Ingestor,
+    path: Union[str, Path],
+    stop: Optional[asyncio.Event] = None,
+    ready: Optional[Callable[[], None]] = None,
+) -> None:
+    """Accept ingest connections on a Unix socket until ``stop`` is set.
+
+    Each connection sends newline-delimited JSON records and receives one
+    response line per record once it is committed.
+
+    Raises:
+        IngestError: If the socket cannot be created
+    """
+    path = str(path)
+    stop = stop or asyncio.Event()
+    connections = set()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        pending = asyncio.Queue(maxsize=ingestor.queue_size)
+        ack_task = asyncio.get_running_loop().create_task(_ack_loop(pending, writer.write, writer.drain))
+        try:
+            await ingest_lines(ingestor, _stream_lines(reader), pending)
+            await pending.put(None)
+            await ack_task
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            ack_task.cancel()
+        finally:
+            writer.close()
+
+    def track(reader, writer):
+        task = asyncio.get_running_loop().create_task(handle(reader, writer))
+        connections.add(task)
+        task.add_done_callback(connections.discard)
+
+    _remove_stale_socket(path)
+    old_umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(track, path, limit=MAX_LINE_BYTES)
+    except OSError as e:
+        raise IngestError(f"Cannot listen on {path}: {e}")
+    finally:
+        os.umask(old_umask)
+
+    try:
+        if ready is not None:
+            ready()
+        await stop.wait()
+    finally:
+        server.close()
+        await server.wait_closed()
+        if connections:
+            await asyncio.gather(*connections, return_exceptions=True)
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Remove a socket left behind by a server that died.
+
+    Raises:
+        IngestError: If the path is not a socket, or a server still answers on it
+    """
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    except OSError as e:
+        raise IngestError(f"Cannot listen on {path}: {e}")
+    if not stat.S_ISSOCK(st.st_mode):
+        raise IngestError(f"Cannot listen on {path}: it exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        os.unlink(path)
+        return
+    except OSError as e:
+        raise IngestError(f"Cannot listen on {path}: {e}")
+    finally:
+        probe.close()
+    raise IngestError(f"An ingest server is already listening on {path}")
+
+
+def run(
+    store: Any,
+    socket_path: Optional[Union[str, Path]] = None,
+    acks=None,
+    on_reject: Optional[Callable[[int, str], None]] = None,
+    on_ready: Optional[Callable[[], None]] = None,
+    **options: Any,
+) -> IngestStats:
+    """Run an ingest session to completion.
+
+    Reads stdin until EOF, or serves ``socket_path`` until SIGINT/SIGTERM.
+
+    Args:
+        store: ``LogStore`` to append to
+        socket_path: Unix socket to listen on instead of reading stdin
+        acks: Binary stream for per-record responses in stdin mode
+        on_reject: Called for invalid stdin lines
+        on_ready: Called once the socket is listening
+        **options: ``Ingestor`` options (``max_batch``, ``max_delay``,
+            ``queue_size``, ``fsync``)
+
+    Returns:
+        IngestStats: What was written
+    """
+    ingestor = Ingestor(store, **options)
+
+    async def main() -> None:
+        await ingestor.start()
+        try:
+            if socket_path is None:
+                await ingest_stream(ingestor, acks=acks, on_reject=on_reject)
+            else:
+                stop = asyncio.Event()
+                loop = asyncio.get_running_loop()
+                for signum in (signal.SIGINT, signal.SIGTERM):
+                    loop.add_signal_handler(signum, stop.set)
+                await serve_socket(ingestor, socket_path, stop, on_ready)
+        finally:
+            await ingestor.close()
+
+    asyncio.run(main())
+    return ingestor.stats
@@ -0,0 +1,140 @@
+"""Lightweight phase timing and counters for CLI commands.
+
+Commands wrap their stages in ``phase("scan")`` blocks and library code
+bumps counters with ``count("bytes_read", n)``. Recording is always on and
+costs two ``perf_counter`` calls per phase; the data is only reported when
+asked for:
+
+* ``ai-assist --timings <command>`` prints a breakdown to stderr;
+* ``AI_ASSIST_METRICS=<file>`` (or ``-`` for stderr) appends one JSON line
+  per invocation, for log shipping and dashboards.
+
+This module is imported by the CLI entry point, so it must stay free of
+heavy imports.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+
+METRICS_ENV = "AI_ASSIST_METRICS"
+
+
+class Recorder:
+    """Accumulates phase durations (in first-seen order) and counters."""
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block; repeated phases with the same name add up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add to a counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the recorder was created."""
+        return time.perf_counter() - self.started_at
+
+    def report(self, command: Optional[str] = None) -> str:
+        """Format a human readable breakdown."""
+        total = self.elapsed
+        lines = [f"⏱️  Timings{f' for {command}' if command else ''}"]
+        accounted = 0.0
+        for name, seconds in self.phases.items():
+            accounted += seconds
+            lines.append(f"  {name:<14}{seconds * 1000:10.1f} ms {seconds / total * 100:5.1f}%")
+        lines.append(f"  {'(other)':<14}{max(total - accounted, 0.0) * 1000:10.1f} ms")
+        lines.append(f"  {'total':<14}{total * 1000:10.1f} ms")
+        if self.counters:
+            lines.append("📈 Counters")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"  {name:<22}{value:>12,}")
+        return "\n".join(lines)
+
+    def to_record(self, command: Optional[str] = None, **extra: Any) -> Dict[str, Any]:
+        """Return the data as a JSON-serializable dict."""
+        return {
+            "ts": time.time(),
+            "command": command,
+            "total_ms": round(self.elapsed * 1000, 3),
+            "phases": {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()},
+            "counters": dict(self.counters),
+            **extra,
+        }
+
+
+_recorder = Recorder()
+
+
+def current() -> Recorder:
+    """Return the active recorder."""
+    return _recorder
+
+
+def reset() -> Recorder:
+    """Start a fresh recorder (at the beginning of each CLI invocation)."""
+    global _recorder
+    _recorder = Recorder()
+    return _recorder
+
+
+def phase(name: str):
+    """Time a block in the active recorder."""
+    return _recorder.phase(name)
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Add to a counter in the active recorder."""
+    _recorder.count(name, amount)
+
+
+def emit_metrics(command: Optional[str] = None, destination: Optional[str] = None, **extra: Any) -> bool:
+    """Append the active recorder as one JSON line, if metrics are enabled.
+
+    Args:
+        command: Command name to include
+        destination: File path, or ``-`` for stderr. Defaults to ``$AI_ASSIST_METRICS``.
+        **extra: Additional fields for the record
+
+    Returns:
+        bool: True if a line was written
+    """
+    destination = destination or os.environ.get(METRICS_ENV)
+    if not destination:
+        return False
+
+    import json
+    import sys
+
+    line = json.dumps(_recorder.to_record(command, **extra), separators=(",", ":")) + "\n"
+    if destination == "-":
+        sys.stderr.write(line)
+        return True
+    try:
+        # A single O_APPEND write keeps lines intact across concurrent processes
+        fd = os.open(destination, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+    except OSError:
+        return False
+    return True
+
+
+def write_report(out: TextIO, command: Optional[str] = None) -> None:
+    """Print the human readable breakdown to a stream."""
+    out.write(_recorder.report(command) + "\n")
@@ -0,0 +1,309 @@
+"""Per-segment search summaries and streaming search over the query log.
+
+When a log segment is sealed, a small summary is written next to it
+(``segment-NNNNNNNN.summary.json``). It holds the segment's min/max
+timestamps, bloom filters of the models and topics it contains, and an
+inverted index from text terms to record ordinals. Searches use summaries to
+skip whole segments and to jump straight to candidate records; only the
+active segment, which is bounded in size, is scanned record by record.
+"""
+
+import base64
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .core import AIAssistError, atomic_write_bytes
+
+
+SUMMARY_VERSION = 1
+
+BLOOM_BITS = 1024
+BLOOM_HASHES = 4
+
+# Fields whose text is indexed for free-text search
+TEXT_FIELDS = ("prompt", "response")
+
+_TERM_RE = re.compile(r"[a-z0-9_]{2,}")
+
+
+def tokenize(text: str) -> Set[str]:
+    """Split text into lowercase search terms.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Set[str]: Unique terms of two or more characters
+    """
+    return set(_TERM_RE.findall(text.lower())) if text else set()
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse an ISO 8601 date or datetime into a UTC epoch timestamp.
+
+    Args:
+        value: Value such as ``2024-05-01`` or ``2024-05-01T12:00:00Z``
+
+    Returns:
+        float: Seconds since the epoch
+
+    Raises:
+        AIAssistError: If the value is not a valid timestamp
+    """
+    text = value.strip()
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        raise AIAssistError(f"Invalid timestamp '{value}'. Use ISO 8601, e.g. 2024-05-01T12:00:00Z")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class BloomFilter:
+    """Fixed-size bloom filter for small sets of strings."""
+
+    def __init__(self, bits: int = BLOOM_BITS, hashes: int = BLOOM_HASHES, data: Optional[bytes] = None):
+        self.bits = bits
+        self.hashes = hashes
+        self._array = bytearray(data) if data is not None else bytearray(bits // 8)
+
+    def _positions(self, value: str) -> Iterator[int]:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=4 * self.hashes).digest()
+        for i in range(self.hashes):
+            yield int.from_bytes(digest[4 * i:4 * i + 4], "little") % self.bits
+
+    def add(self, value: str) -> None:
+        """Add a value to the filter."""
+        for position in self._positions(value):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self._array[p >> 3] & (1 << (p & 7)) for p in self._positions(value))
+
+    def to_text(self) -> str:
+        """Serialize the bit array as base64."""
+        return base64.b64encode(bytes(self._array)).decode("ascii")
+
+    @classmethod
+    def from_text(cls, text: str, bits: int = BLOOM_BITS, hashes: int = BLOOM_HASHES) -> "BloomFilter":
+        """Deserialize a filter written by ``to_text``."""
+        return cls(bits, hashes, base64.b64decode(text))
+
+
+@dataclass
+class SegmentSummary:
+    """Search summary for one sealed segment."""
+
+    count: int = 0
+    min_ts: Optional[float] = None
+    max_ts: Optional[float] = None
+    models: BloomFilter = field(default_factory=BloomFilter)
+    topics: BloomFilter = field(default_factory=BloomFilter)
+    terms: Dict[str, List[int]] = field(default_factory=dict)
+
+    def add(self, ordinal: int, record: Dict[str, Any]) -> None:
+        """Account for one record while building the summary."""
+        self.count += 1
+        ts = _record_ts(record)
+        if ts is not None:
+            self.min_ts = ts if self.min_ts is None else min(self.min_ts, ts)
+            self.max_ts = ts if self.max_ts is None else max(self.max_ts, ts)
+        if record.get("model"):
+            self.models.add(str(record["model"]))
+        if record.get("topic"):
+            self.topics.add(str(record["topic"]))
+        for term in record_terms(record):
+            self.terms.setdefault(term, []).append(ordinal)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the summary as compact JSON."""
+        data = {
+            "version": SUMMARY_VERSION,
+            "count": self.count,
+            "min_ts": self.min_ts,
+            "max_ts": self.max_ts,
+            "models": self.models.to_text(),
+            "topics": self.topics.to_text(),
+            "terms": self.terms,
+        }
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["SegmentSummary"]:
+        """Load a summary, returning None if it is missing or stale."""
+        try:
+            with open(path, "rb") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != SUMMARY_VERSION:
+            return None
+        return cls(
+            count=data["count"],
+            min_ts=data["min_ts"],
+            max_ts=data["max_ts"],
+            models=BloomFilter.from_text(data["models"]),
+            topics=BloomFilter.from_text(data["topics"]),
+            terms=data["terms"],
+        )
+
+
+@dataclass
+class LogQuery:
+    """Filters for a log search. Unset fields match everything."""
+
+    model: Optional[str] = None
+    topic: Optional[str] = None
+    since: Optional[float] = None
+    until: Optional[float] = None
+    text: Optional[str] = None
+
+    @cached_property
+    def terms(self) -> Set[str]:
+        """Terms that must all appear in a matching record."""
+        return tokenize(self.text or "")
+
+    def may_match(self, summary: SegmentSummary) -> bool:
+        """Return False if the summary proves no record in the segment matches."""
+        if summary.count == 0:
+            return False
+        if self.since is not None and summary.max_ts is not None and summary.max_ts < self.since:
+            return False
+        if self.until is not None and summary.min_ts is not None and summary.min_ts > self.until:
+            return False
+        if self.model is not None and self.model not in summary.models:
+            return False
+        if self.topic is not None and self.topic not in summary.topics:
+            return False
+        return True
+
+    def candidates(self, summary: SegmentSummary) -> Optional[Set[int]]:
+        """Intersect posting lists for the query terms.
+
+        Returns:
+            Optional[Set[int]]: Candidate ordinals, or None if there is no text filter
+        """
+        terms = self.terms
+        if not terms:
+            return None
+        result: Optional[Set[int]] = None
+        for term in sorted(terms, key=lambda t: len(summary.terms.get(t, ()))):
+            postings = summary.terms.get(term)
+            if not postings:
+                return set()
+            result = set(postings) if result is None else result.intersection(postings)
+            if not result:
+                return result
+        return result
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        """Check a record against every filter."""
+        if self.model is not None and record.get("model") != self.model:
+            return False
+        if self.topic is not None and record.get("topic") != self.topic:
+            return False
+        if self.since is not None or self.until is not None:
+            ts = _record_ts(record)
+            if ts is None:
+                return False
+            if self.since is not None and ts < self.since:
+                return False
+            if self.until is not None and ts > self.until:
+                return False
+        terms = self.terms
+        return not terms or terms <= record_terms(record)
+
+
+def record_terms(record: Dict[str, Any]) -> Set[str]:
+    """Return the searchable terms of a log record."""
+    terms: Set[str] = set()
+    for name in TEXT_FIELDS:
+        value = record.get(name)
+        if isinstance(value, str):
+            terms |= tokenize(value)
+    return terms
+
+
+def summary_path(segment_path: Path) -> Path:
+    """Return the summary file path for a segment file."""
+    stem = segment_path.name.split(".", 1)[0]
+    return segment_path.with_name(f"{stem}.summary.json")
+
+
+def write_summary(segment_path: Path, records: Iterable[Tuple[int, Dict[str, Any]]]) -> SegmentSummary:
+    """Build and persist the summary for a sealed segment.
+
+    Args:
+        segment_path: Path of the sealed segment
+        records: ``(ordinal, record)`` pairs of every record in the segment
+
+    Returns:
+        SegmentSummary: The summary that was written
+    """
+    summary = SegmentSummary()
+    for ordinal, record in records:
+        summary.add(ordinal, record)
+    atomic_write_bytes(summary_path(segment_path), summary.to_bytes())
+    return summary
+
+
+def search_logs(store: Any, query: LogQuery) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Stream records matching a query, oldest first.
+
+    Sealed segments without a summary get one built on first search.
+
+    Args:
+        store: A ``LogStore``
+        query: Search filters
+
+    Yields:
+        Tuple[str, Dict[str, Any]]: ``(record_id, record)`` for each match
+    """
+    for segment in store.segments():
+        wanted: Optional[Set[int]] = None
+        if segment.sealed:
+            summary = SegmentSummary.load(summary_path(segment.path))
+            if summary is None:
+                summary = write_summary(
+                    segment.path,
+                    ((int(rid.split(":")[1]), rec) for rid, rec in store.iter_segment(segment)),
+                )
+            if not query.may_match(summary):
+                continue
+            wanted = query.candidates(summary)
+            if wanted is not None and not wanted:
+                continue
+
+        if wanted is not None and len(wanted) <= 16 and segment.path.suffix == ".jsonl":
+            # A handful of postings in an uncompressed segment: use the offset index
+            for ordinal in sorted(wanted):
+                record_id = f"{segment.number}:{ordinal}"
+                record = store.get(record_id)
+                if record is not None and query.matches(record):
+                    yield record_id, record
+            continue
+
+        for record_id, record in store.iter_segment(segment):
+            if wanted is not None and int(record_id.split(":")[1]) not in wanted:
+                continue
+            if query.matches(record):
+                yield record_id, record
+
+
+def _record_ts(record: Dict[str, Any]) -> Optional[float]:
+    value = record.get("timestamp")
+    if not isinstance(value, str):
+        return None
+    try:
+        return parse_timestamp(value)
+    except AIAssistError:
+        return None
@@ -0,0 +1,434 @@
+"""Append-only, segment-based store for logged AI queries.
+
+Records are appended as JSON lines to the active segment under ``AI/logs/``.
+Each append also writes the record's byte offset to a fixed-width offset
+index (``.idx``), so the cost of an append never depends on how much history
+exists. When the active segment reaches ``max_segment_bytes`` it is sealed,
+optionally compressed, summarized for search (see ``logindex``) and a new
+segment becomes active.
+
+Prompt and response bodies longer than ``blob_threshold`` bytes are moved to
+the deduplicating blob store (``AI/blobs``, see ``blobstore``); the record
+keeps their ids under the reserved ``"$blobs"`` key and readers resolve them
+transparently. Keys starting with ``$`` belong to the store: a record's own
+``$`` keys are escaped to ``$$`` on write and unescaped on read, so logged
+data can never be mistaken for blob references. A reference whose blob is
+missing or corrupt is listed under ``"$missing"`` instead of failing reads.
+
+Layout::
+
+    AI/logs/HEAD                      number of the active segment
+    AI/logs/segment-00000001.jsonl.gz sealed (compressed) segment
+    AI/logs/segment-00000001.idx      8-byte little-endian offsets per record
+    AI/logs/segment-00000001.summary.json  search summary of a sealed segment
+    AI/logs/segment-00000002.jsonl    active segment
+"""
+
+import gzip
+import io
+import json
+import os
+import struct
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .blobstore import BlobStore, BlobStoreError
+from .core import AIAssistError, atomic_write_bytes, file_lock, get_ai_directory_path
+from .logindex import TEXT_FIELDS, SegmentSummary, summary_path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+DEFAULT_MAX_SEGMENT_BYTES = 16 * 1024 * 1024
+
+COMPRESSION_CHOICES = ("auto", "zstd", "gzip", "none")
+
+# Text fields at least this long (in bytes) are stored in the blob store
+DEFAULT_BLOB_THRESHOLD = 4 * 1024
+
+# Keys starting with RESERVED_PREFIX are the store's envelope
+RESERVED_PREFIX = "$"
+BLOBS_FIELD = "$blobs"
+MISSING_FIELD = "$missing"
+
+_OFFSET = struct.Struct("<Q")
+_SEGMENT_PREFIX = "segment-"
+_SUFFIXES = {"zstd": ".jsonl.zst", "gzip": ".jsonl.gz", "none": ".jsonl"}
+
+
+class LogStoreError(AIAssistError):
+    """Raised when the query log cannot be read or written."""
+    pass
+
+
+@dataclass
+class SegmentInfo:
+    """Location and state of one log segment."""
+
+    number: int
+    path: Path
+    index_path: Path
+    sealed: bool
+
+    @property
+    def record_count(self) -> int:
+        """Number of records, derived from the offset index size."""
+        try:
+            return self.index_path.stat().st_size // _OFFSET.size
+        except OSError:
+            return 0
+
+
+def get_logs_directory_path(project_root: Union[str, Path]) -> Path:
+    """Get the path to the query log directory.
+
+    Args:
+        project_root: Path to the project root
+
+    Returns:
+        Path: Path to AI/logs (may not exist yet)
+    """
+    return get_ai_directory_path(project_root) / "logs"
+
+
+def resolve_compression(compression: str) -> str:
+    """Resolve ``auto`` to the best available codec.
+
+    Args:
+        compression: One of ``COMPRESSION_CHOICES``
+
+    Returns:
+        str: ``zstd``, ``gzip`` or ``none``
+
+    Raises:
+        LogStoreError: If zstd is requested but not installed
+    """
+    if compression == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if compression == "zstd" and zstandard is None:
+        raise LogStoreError("zstd compression requires the 'zstandard' package")
+    if compression not in _SUFFIXES:
+        raise LogStoreError(f"Unknown compression '{compression}'")
+    return compression
+
+
+def utc_timestamp() -> str:
+    """Return the current UTC time as an ISO 8601 string."""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class LogStore:
+    """Append-only JSONL segment store rooted at ``AI/logs``."""
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_segment_bytes: int = DEFAULT_MAX_SEGMENT_BYTES,
+        compression: str = "auto",
+        blob_threshold: Optional[int] = DEFAULT_BLOB_THRESHOLD,
+        blobs: Optional[BlobStore] = None,
+    ):
+        self.directory = Path(directory)
+        self.max_segment_bytes = max_segment_bytes
+        self.compression = resolve_compression(compression)
+        self.blob_threshold = blob_threshold
+        # Sibling of the log directory: AI/blobs next to AI/logs
+        self.blobs = blobs if blobs is not None else BlobStore(self.directory.parent / "blobs")
+
+    @classmethod
+    def for_project(cls, project_root: Union[str, Path], **kwargs: Any) -> "LogStore":
+        """Create a store for a project's ``AI/logs`` directory."""
+        return cls(get_logs_directory_path(project_root), **kwargs)
+
+    # -- paths -----------------------------------------------------------
+
+    def _segment_stem(self, number: int) -> str:
+        return f"{_SEGMENT_PREFIX}{number:08d}"
+
+    def _active_path(self, number: int) -> Path:
+        return self.directory / f"{self._segment_stem(number)}.jsonl"
+
+    def _index_path(self, number: int) -> Path:
+        return self.directory / f"{self._segment_stem(number)}.idx"
+
+    def _read_head(self) -> int:
+        try:
+            return int((self.directory / "HEAD").read_text().strip() or 1)
+        except (OSError, ValueError):
+            return 1
+
+    def _write_head(self, number: int) -> None:
+        atomic_write_bytes(self.directory / "HEAD", f"{number}\n".encode("ascii"))
+
+    # -- writing ---------------------------------------------------------
+
+    def append(self, record: Dict[str, Any], fsync: bool = False) -> str:
+        """Append one record and return its id.
+
+        Args:
+            record: JSON-serializable record. A ``timestamp`` is added if missing.
+            fsync: Flush the segment to stable storage before returning
+
+        Returns:
+            str: Record id of the form ``<segment>:<ordinal>``
+
+        Raises:
+            LogStoreError: If the record cannot be written
+        """
+        return self.append_many([record], fsync=fsync)[0]
+
+    def append_many(self, records: List[Dict[str, Any]], fsync: bool = False) -> List[str]:
+        """Append several records under a single lock acquisition.
+
+        Large text fields are written to the blob store first, so a record
+        never references a blob that does not exist yet. With ``fsync``, the
+        new blob files are flushed together before the segment is.
+
+        Args:
+            records: JSON-serializable records
+            fsync: Flush to stable storage once after the batch
+
+        Returns:
+            List[str]: Record ids, in input order
+        """
+        lines = []
+        written: Optional[List[Path]] = [] if fsync else None
+        for record in records:
+            record.setdefault("timestamp", utc_timestamp())
+            stored = self._externalize(record, written)
+            lines.append(json.dumps(stored, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+        if written:
+            self.blobs.sync(written)
+
+        ids: List[str] = []
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with file_lock(self.directory / ".lock"):
+                number = self._read_head()
+                segment = open(self._active_path(number), "ab")
+                index = open(self._index_path(number), "ab")
+                try:
+                    for line in lines:
+                        offset = segment.tell()
+                        if offset > 0 and offset + len(line) > self.max_segment_bytes:
+                            self._close(segment, index, fsync)
+                            self._seal(number)
+                            number += 1
+                            self._write_head(number)
+                            segment = open(self._active_path(number), "ab")
+                            index = open(self._index_path(number), "ab")
+                            offset = 0
+                        ordinal = index.tell() // _OFFSET.size
+                        segment.write(line)
+                        index.write(_OFFSET.pack(offset))
+                        ids.append(f"{number}:{ordinal}")
+                finally:
+                    self._close(segment, index, fsync)
+        except OSError as e:
+            raise LogStoreError(f"Failed to append to query log '{self.directory}': {e}")
+        return ids
+
+    def _externalize(self, record: Dict[str, Any], written: Optional[List[Path]]) -> Dict[str, Any]:
+        """Return the record as stored: reserved keys escaped and large text
+        fields replaced by blob ids. New blob files are added to ``written``."""
+        if any(key.startswith(RESERVED_PREFIX) for key in record):
+            record = {RESERVED_PREFIX + key if key.startswith(RESERVED_PREFIX) else key: value
+                      for key, value in record.items()}
+        if self.blob_threshold is None:
+            return record
+        refs = {}
+        for name in TEXT_FIELDS:
+            value = record.get(name)
+            if isinstance(value, str) and len(value) >= self.blob_threshold:
+                encoded = value.encode("utf-8")
+                if len(encoded) >= self.blob_threshold:
+                    refs[name] = self.blobs.put(encoded, written=written)
+        if not refs:
+            return record
+        stored = {key: value for key, value in record.items() if key not in refs}
+        stored[BLOBS_FIELD] = refs
+        return stored
+
+    def resolve(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a stored record back into the logged one.
+
+        Blob ids are replaced with the text they reference and escaped keys
+        are restored. Fields whose blob is missing or corrupt are left out
+        and named in ``record["$missing"]``.
+        """
+        if not any(key.startswith(RESERVED_PREFIX) for key in record):
+            return record
+        refs = record.pop(BLOBS_FIELD, None)
+        for key in [key for key in record if key.startswith(RESERVED_PREFIX * 2)]:
+            record[key[1:]] = record.pop(key)
+        if isinstance(refs, dict):
+            missing = []
+            for name, blob_id in refs.items():
+                try:
+                    record[name] = self.blobs.get_text(blob_id)
+                except BlobStoreError:
+                    missing.append(name)
+            if missing:
+                record[MISSING_FIELD] = missing
+        return record
+
+    @staticmethod
+    def _close(segment: io.BufferedWriter, index: io.BufferedWriter, fsync: bool) -> None:
+        if segment.closed:
+            return
+        segment.flush()
+        index.flush()
+        if fsync:
+            os.fsync(segment.fileno())
+            os.fsync(index.fileno())
+        segment.close()
+        index.close()
+
+    def _seal(self, number: int) -> Path:
+        """Compress a full segment, write its search summary and return the sealed path."""
+        source = self._active_path(number)
+        summary = SegmentSummary()
+
+        if self.compression == "none":
+            with open(source, "rb") as src:
+                for ordinal, line in enumerate(src):
+                    self._summarize_line(summary, ordinal, line)
+            atomic_write_bytes(summary_path(source), summary.to_bytes())
+            return source
+
+        target = self.directory / f"{self._segment_stem(number)}{_SUFFIXES[self.compression]}"
+        tmp = target.with_name(target.name + ".tmp")
+        with open(source, "rb") as src, open(tmp, "wb") as raw:
+            if self.compression == "zstd":
+                dst = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+            else:
+                dst = gzip.GzipFile(fileobj=raw, mode="wb", mtime=0)
+            with dst:
+                for ordinal, line in enumerate(src):
+                    dst.write(line)
+                    self._summarize_line(summary, ordinal, line)
+        os.replace(tmp, target)
+        atomic_write_bytes(summary_path(target), summary.to_bytes())
+        source.unlink()
+        return target
+
+    def _summarize_line(self, summary: SegmentSummary, ordinal: int, line: bytes) -> None:
+        """Add one raw JSONL line to a segment summary."""
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return
+        summary.add(ordinal, self.resolve(record))
+
+    # -- reading ---------------------------------------------------------
+
+    def segments(self) -> List[SegmentInfo]:
+        """List segments in ascending order, oldest first."""
+        if not self.directory.exists():
+            return []
+
+        head = self._read_head()
+        found: Dict[int, Path] = {}
+        for entry in os.scandir(self.directory):
+            name = entry.name
+            if not name.startswith(_SEGMENT_PREFIX) or ".jsonl" not in name or name.endswith(".tmp"):
+                continue
+            try:
+                number = int(name[len(_SEGMENT_PREFIX):].split(".", 1)[0])
+            except ValueError:
+                continue
+            found[number] = Path(entry.path)
+
+        return [
+            SegmentInfo(number, path, self._index_path(number), sealed=number != head)
+            for number, path in sorted(found.items())
+        ]
+
+    def _segment_info(self, number: int) -> Optional[SegmentInfo]:
+        """Locate a segment by number without listing the directory."""
+        for suffix in (".jsonl", _SUFFIXES["zstd"], _SUFFIXES["gzip"]):
+            path = self.directory / f"{self._segment_stem(number)}{suffix}"
+            if path.exists():
+                return SegmentInfo(number, path, self._index_path(number), sealed=number != self._read_head())
+        return None
+
+    def _open_segment(self, segment: SegmentInfo) -> io.BufferedIOBase:
+        name = segment.path.name
+        if name.endswith(".gz"):
+            return gzip.open(segment.path, "rb")
+        if name.endswith(".zst"):
+            if zstandard is None:
+                raise LogStoreError(f"Reading '{name}' requires the 'zstandard' package")
+            reader = zstandard.ZstdDecompressor().stream_reader(open(segment.path, "rb"), closefd=True)
+            return io.BufferedReader(reader)
+        return open(segment.path, "rb")
+
+    def iter_segment(self, segment: SegmentInfo) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream ``(record_id, record)`` pairs from one segment."""
+        with self._open_segment(segment) as handle:
+            for ordinal, line in enumerate(handle):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                yield f"{segment.number}:{ordinal}", self.resolve(record)
+
+    def iter_records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream every record, oldest first."""
+        for segment in self.segments():
+            yield from self.iter_segment(segment)
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch one record by id using the offset index.
+
+        Args:
+            record_id: Id returned by ``append``
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if it does not exist
+        """
+        try:
+            number_text, ordinal_text = record_id.split(":", 1)
+            number, ordinal = int(number_text), int(ordinal_text)
+        except ValueError:
+            return None
+
+        segment = self._segment_info(number)
+        if segment is None:
+            return None
+
+        try:
+            with open(segment.index_path, "rb") as index:
+                index.seek(ordinal * _OFFSET.size)
+                packed = index.read(_OFFSET.size)
+        except OSError:
+            return None
+        if len(packed) != _OFFSET.size:
+            return None
+        (offset,) = _OFFSET.unpack(packed)
+
+        with self._open_segment(segment) as handle:
+            if handle.seekable():
+                handle.seek(offset)
+            else:
+                _skip(handle, offset)
+            line = handle.readline()
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        return self.resolve(record)
+
+
+def _skip(handle: io.BufferedIOBase, count: int) -> None:
+    """Advance a non-seekable stream by ``count`` bytes."""
+    while count > 0:
+        chunk = handle.read(min(count, 1024 * 1024))
+        if not chunk:
+            return
+        count -= len(chunk)
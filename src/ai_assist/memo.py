@@ -0,0 +1,310 @@
+"""Memoized rendered preambles.
+
+Each rendered preamble is stored in ``AI/.cache/preambles/`` as
+``<key>.txt``, with ``<key>.json`` recording the inputs it was built from:
+
+* files: every indexed file, since any of them can change the ranking
+  (path and headline scores, BM25 statistics), plus the ignore files that
+  decide which files exist (``.gitignore`` in every walked directory,
+  ``.git/info/exclude`` and ``AI/.aiignore``);
+* directories: the root and every directory the scan walked, whose mtime
+  changes when an entry is added, removed or renamed in it;
+* context: the names and text of the AI_CONTEXT.yaml sections;
+* templates: the user and built-in template files.
+
+A combined hash of their fingerprints (file ``mtime_ns`` and size, directory
+``mtime_ns``, section text) is stored alongside the output. A repeat request
+with the same options recomputes the hash with one ``stat`` per dependency
+and, if it matches, returns the stored output without scanning, ranking or
+rendering. ``preamble --no-memo`` always rebuilds.
+
+While a preamble renders, ``TeeWriter`` copies it to a temporary file next
+to the memo, so storing it never holds the whole output in memory.
+
+Like ``caches``, this module only needs the standard library and the context
+manager, so a hit avoids importing the scanner, pipeline and templates.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple, Union
+
+from . import __version__, caches
+from .context_manager import ContextManager, LazyContext
+from .core import (
+    AIIGNORE_FILENAME,
+    GITIGNORE_FILENAME,
+    AIAssistError,
+    atomic_write_bytes,
+    get_ai_directory_path,
+    get_cache_directory_path,
+)
+
+
+MEMO_DIRNAME = "preambles"
+
+# Bump when the stored layout or the dependency fingerprint changes
+MEMO_VERSION = 2
+
+GIT_EXCLUDE_PATH = ".git/info/exclude"
+
+# Same as ``templates.BUILTIN_TEMPLATE_DIR``, without importing jinja2
+BUILTIN_TEMPLATE_DIR = Path(__file__).parent / "builtin_templates"
+
+
+@dataclass
+class Dependencies:
+    """Inputs a rendered preamble depends on.
+
+    Attributes:
+        files: Relative paths of files (missing files are fingerprinted too)
+        dirs: Relative paths of directories ("" is the project root)
+        context: Names of the AI_CONTEXT.yaml sections it was built with
+    """
+
+    files: List[str] = field(default_factory=list)
+    dirs: List[str] = field(default_factory=list)
+    context: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.files) + len(self.dirs)
+
+
+@dataclass
+class Memo:
+    """A stored preamble; ``path`` holds the rendered output."""
+
+    path: Path
+    sections: int
+    created_at: float
+    dependencies: Dependencies
+
+
+def get_memo_directory_path(project_root: Union[str, Path]) -> Path:
+    """Get the directory holding memoized preambles."""
+    return get_cache_directory_path(project_root) / MEMO_DIRNAME
+
+
+def memo_key(topic: str, fmt: str, max_tokens: int, exact: bool, summaries: bool) -> str:
+    """Key for the options that shape a preamble."""
+    options = [MEMO_VERSION, __version__, topic, fmt, max_tokens, exact, summaries]
+    return hashlib.blake2b(json.dumps(options).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def template_paths(project_root: Union[str, Path]) -> List[Path]:
+    """Return every template file that can take part in rendering."""
+    paths = []
+    for directory in (get_ai_directory_path(project_root) / "templates", BUILTIN_TEMPLATE_DIR):
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            continue
+        paths.extend(directory / name for name in names)
+    return paths
+
+
+def fingerprint(
+    project_root: Union[str, Path],
+    deps: Dependencies,
+    context: Optional[LazyContext] = None,
+    known: Optional[Dict[str, Tuple[int, int]]] = None,
+) -> str:
+    """Hash the current state of a preamble's dependencies.
+
+    Args:
+        project_root: Path to the project root
+        deps: Dependencies recorded when the preamble was rendered
+        context: Context to hash; loaded from AI_CONTEXT.yaml when omitted
+        known: ``(mtime_ns, size)`` by relative path to use instead of
+            ``stat``. Storing a preamble passes what the scan saw, so a file
+            edited while it rendered invalidates it.
+
+    Returns:
+        str: Hex digest; it changes when any dependency does
+    """
+    root = str(project_root)
+    known = known or {}
+    digest = hashlib.blake2b(digest_size=16)
+
+    def add(kind: bytes, path: str, mtime_ns: int, size: int) -> None:
+        digest.update(b"%s\0%s\0%d\0%d\n" % (kind, os.fsencode(path), mtime_ns, size))
+
+    def stat(kind: bytes, path: str) -> None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            add(kind, path, -1, -1)
+            return
+        add(kind, path, st.st_mtime_ns, st.st_size if kind == b"f" else 0)
+
+    for rel_path in deps.files:
+        if rel_path in known:
+            add(b"f", os.path.join(root, rel_path), *known[rel_path])
+        else:
+            stat(b"f", os.path.join(root, rel_path))
+    for rel_dir in deps.dirs:
+        stat(b"d", os.path.join(root, rel_dir))
+    for path in template_paths(project_root):
+        stat(b"f", str(path))
+
+    # Every section is a candidate, so all of them (and their names) count
+    if context is None:
+        manager = ContextManager(project_root)
+        context = manager.load() if manager.exists() else None
+    for name in context or ():
+        digest.update(b"c\0%s\0%s\n" % (name.encode("utf-8"), context.section_text(name).encode("utf-8")))
+    return digest.hexdigest()
+
+
+def collect_dependencies(dirs: Iterable[str], files: Iterable[str], context: Optional[LazyContext]) -> Dependencies:
+    """Build the dependency set of a preamble.
+
+    Args:
+        dirs: Directories the scan walked (``ScanResult.dirs``)
+        files: Every indexed path (``ScanResult.files``)
+        context: Context the preamble was built with, if any
+    """
+    dirs = {""} | set(dirs)
+    ignore_files = [posixpath.join(directory, GITIGNORE_FILENAME) for directory in dirs]
+    ignore_files += [GIT_EXCLUDE_PATH, f"AI/{AIIGNORE_FILENAME}"]
+    return Dependencies(
+        files=sorted(set(files)) + sorted(ignore_files),
+        dirs=sorted(dirs),
+        context=list(context or ()),
+    )
+
+
+def _string_list(value) -> List[str]:
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError("expected a list of strings")
+    return value
+
+
+class PreambleMemo:
+    """Stored output for one combination of preamble options."""
+
+    def __init__(self, project_root: Union[str, Path], topic: str, fmt: str, max_tokens: int, exact: bool, summaries: bool):
+        self.project_root = Path(project_root)
+        key = memo_key(topic, fmt, max_tokens, exact, summaries)
+        self.path = get_memo_directory_path(project_root) / f"{key}.json"
+        self.output_path = self.path.with_suffix(".txt")
+
+    def lookup(self) -> Optional[Memo]:
+        """Return the stored preamble if none of its dependencies changed."""
+        try:
+            with open(self.path, "rb") as handle:
+                data = json.load(handle)
+            deps = Dependencies(**{name: _string_list(data["dependencies"][name]) for name in ("files", "dirs", "context")})
+            memo = Memo(self.output_path, int(data["sections"]), float(data["created_at"]), deps)
+            fresh = (
+                data["version"] == MEMO_VERSION
+                and self.output_path.is_file()
+                and fingerprint(self.project_root, deps) == data["hash"]
+            )
+        except (OSError, ValueError, TypeError, AttributeError, KeyError):
+            fresh = False
+        if not fresh:
+            caches.record(self.project_root, "preambles", misses=1)
+            return None
+        caches.record(self.project_root, "preambles", hits=1)
+        caches.touch(self.path)
+        caches.touch(self.output_path)
+        return memo
+
+    def tee(self, out: TextIO) -> "TeeWriter":
+        """Return a writer that renders to ``out`` and to a file for ``store``."""
+        return TeeWriter(out, self.output_path.with_name(f".{self.output_path.name}.{os.getpid()}.tmp"))
+
+    def store(
+        self,
+        tee: "TeeWriter",
+        sections: int,
+        deps: Dependencies,
+        context: Optional[LazyContext] = None,
+        known: Optional[Dict[str, Tuple[int, int]]] = None,
+    ) -> None:
+        """Store a completely rendered preamble; failures are ignored.
+
+        Args:
+            tee: Writer from ``tee`` that the preamble was rendered through
+            sections: Number of rendered sections (for status messages)
+            deps: Dependencies from ``collect_dependencies``
+            context: Context the preamble was built with
+            known: Fingerprints of source files as scanned (see ``fingerprint``)
+        """
+        copy = tee.close()
+        if copy is None:
+            return
+        data = {
+            "version": MEMO_VERSION,
+            "hash": fingerprint(self.project_root, deps, context, known),
+            "sections": sections,
+            "created_at": time.time(),
+            "dependencies": asdict(deps),
+        }
+        try:
+            # Drop the old record first so it never describes the new output
+            self.path.unlink(missing_ok=True)
+            os.replace(copy, self.output_path)
+            atomic_write_bytes(self.path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        except (OSError, AIAssistError):
+            # Rebuilt next time; a read-only AI directory still works
+            tee.discard()
+
+
+class TeeWriter:
+    """Text stream that writes through to ``out`` and copies to a file.
+
+    If the copy cannot be written (e.g. a read-only AI directory), output
+    still reaches ``out`` and nothing is stored.
+    """
+
+    def __init__(self, out: TextIO, path: Path):
+        self.out = out
+        self.path = path
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._copy: Optional[TextIO] = open(path, "w", encoding="utf-8", newline="")
+        except OSError:
+            self._copy = None
+
+    def write(self, text: str) -> int:
+        if self._copy is not None:
+            try:
+                self._copy.write(text)
+            except OSError:
+                self.discard()
+        return self.out.write(text)
+
+    def flush(self) -> None:
+        self.out.flush()
+
+    def close(self) -> Optional[Path]:
+        """Finish the copy and return its path, or None if it was lost."""
+        if self._copy is None:
+            return None
+        try:
+            self._copy.close()
+        except OSError:
+            self.discard()
+            return None
+        self._copy = None
+        return self.path
+
+    def discard(self) -> None:
+        """Drop the copy, e.g. after an incomplete render."""
+        if self._copy is not None:
+            try:
+                self._copy.close()
+            except OSError:
+                pass
+            self._copy = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
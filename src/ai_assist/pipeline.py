@@ -0,0 +1,309 @@
+"""Streaming ingestion pipeline used to build preamble context.
+
+Files flow through four stages: discover, read, classify and extract. Reading
+is I/O-bound and runs in a thread pool; extraction is CPU-bound and runs in a
+process pool. Each pool is fed through a bounded in-flight window, so at most
+``queue_size`` items are buffered between any two stages and memory stays
+flat regardless of how many files are processed.
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Union
+
+from .instrument import count
+from .reader import read_source
+from .tokens import ESTIMATE_META_KEY, estimate_tokens
+
+
+# Extension to language mapping used by the classify stage
+LANGUAGES = {
+    ".py": "python",
+    ".pyi": "python",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".mjs": "javascript",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".go": "go",
+    ".rs": "rust",
+    ".java": "java",
+    ".rb": "ruby",
+    ".c": "c",
+    ".h": "c",
+    ".cpp": "cpp",
+    ".hpp": "cpp",
+    ".cs": "csharp",
+    ".sh": "shell",
+    ".md": "markdown",
+    ".rst": "rst",
+    ".txt": "text",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".json": "json",
+    ".toml": "toml",
+    ".ini": "ini",
+    ".cfg": "ini",
+    ".html": "html",
+    ".css": "css",
+    ".sql": "sql",
+}
+
+SPECIAL_FILENAMES = {
+    "Makefile": "make",
+    "Dockerfile": "docker",
+    "LICENSE": "text",
+}
+
+# Files larger than this are truncated (at a line break) before extraction
+MAX_EXTRACT_BYTES = 2 * 1024 * 1024
+
+
+@dataclass
+class FileItem:
+    """A file moving through the pipeline."""
+
+    path: str
+    abs_path: str
+    language: Optional[str] = None
+    text: Optional[str] = None
+    size: int = 0
+    truncated: bool = False
+    skipped: Optional[str] = None
+
+
+@dataclass
+class PipelineStats:
+    """Throughput counters collected while the pipeline runs."""
+
+    files_discovered: int = 0
+    files_read: int = 0
+    files_extracted: int = 0
+    files_skipped: int = 0
+    bytes_read: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds between pipeline start and finish (or now)."""
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return max(end - self.started_at, 1e-9)
+
+    @property
+    def files_per_second(self) -> float:
+        """Files that made it through the read stage per second."""
+        return self.files_read / self.elapsed
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """Bytes read per second, in MiB."""
+        return self.bytes_read / self.elapsed / (1024 * 1024)
+
+    def summary(self) -> str:
+        """Return a one-line human readable summary."""
+        return (
+            f"{self.files_extracted} extracted, {self.files_skipped} skipped of "
+            f"{self.files_discovered} files in {self.elapsed:.2f}s "
+            f"({self.files_per_second:.0f} files/s, {self.megabytes_per_second:.1f} MiB/s)"
+        )
+
+
+def default_jobs() -> int:
+    """Return the default worker count for the pipeline pools."""
+    return os.cpu_count() or 1
+
+
+def classify_language(path: str) -> Optional[str]:
+    """Guess the language of a file from its name.
+
+    Args:
+        path: Relative or absolute file path
+
+    Returns:
+        Optional[str]: Language name, or None if unknown
+    """
+    name = os.path.basename(path)
+    if name in SPECIAL_FILENAMES:
+        return SPECIAL_FILENAMES[name]
+    return LANGUAGES.get(os.path.splitext(name)[1].lower())
+
+
+def read_item(item: FileItem) -> FileItem:
+    """Read and decode a file (read stage).
+
+    Binary files, lockfiles and minified bundles are skipped after sniffing
+    their first bytes; large files are memory-mapped and only their first
+    ``MAX_EXTRACT_BYTES`` are decoded (see ``reader``).
+
+    Args:
+        item: Item to read
+
+    Returns:
+        FileItem: The same item with ``text`` populated or ``skipped`` set
+    """
+    source = read_source(item.abs_path, MAX_EXTRACT_BYTES)
+    item.size = source.size
+    item.text = source.text
+    item.truncated = source.truncated
+    item.skipped = source.skipped
+    return item
+
+
+def extract_item(path: str, language: Optional[str], text: str) -> Dict[str, Any]:
+    """Extract lightweight metadata from decoded file text (extract stage).
+
+    Runs in a worker process, so it only takes and returns picklable values.
+
+    Args:
+        path: Relative file path
+        language: Language from the classify stage
+        text: Decoded file contents
+
+    Returns:
+        Dict[str, Any]: Metadata with ``language``, ``lines``, ``headline`` and
+        an estimated token count
+    """
+    lines = text.splitlines()
+    return {
+        "language": language,
+        "lines": len(lines),
+        "headline": _find_headline(lines, language),
+        ESTIMATE_META_KEY: estimate_tokens(text),
+    }
+
+
+def _find_headline(lines: List[str], language: Optional[str]) -> str:
+    """Return the first descriptive line of a file, if any."""
+    for line in lines[:50]:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#!"):
+            continue
+        if language == "markdown":
+            if stripped.startswith("#"):
+                return stripped.lstrip("#").strip()
+            continue
+        for marker in ('"""', "'''", "//", "/*", "#", "*", "--"):
+            if stripped.startswith(marker):
+                text = stripped[len(marker):].strip().rstrip("*/").strip('"\'').strip()
+                if text:
+                    return text
+                break
+        else:
+            return ""
+    return ""
+
+
+def _bounded_map(
+    executor: Optional[Executor],
+    fn: Callable[..., Any],
+    items: Iterable[Any],
+    limit: int,
+    args: Callable[[Any], tuple] = lambda item: (item,),
+) -> Iterator[tuple]:
+    """Map ``fn`` over ``items`` keeping at most ``limit`` calls in flight.
+
+    Results are yielded in submission order as ``(item, result)`` pairs. With
+    no executor the calls run inline.
+    """
+    if executor is None:
+        for item in items:
+            yield item, fn(*args(item))
+        return
+
+    pending: Deque[tuple] = deque()
+    for item in items:
+        pending.append((item, executor.submit(fn, *args(item))))
+        if len(pending) >= limit:
+            done_item, future = pending.popleft()
+            yield done_item, future.result()
+    while pending:
+        done_item, future = pending.popleft()
+        yield done_item, future.result()
+
+
+def run_pipeline(
+    project_root: Union[str, Path],
+    paths: Iterable[str],
+    jobs: Optional[int] = None,
+    queue_size: Optional[int] = None,
+    stats: Optional[PipelineStats] = None,
+    extract: Optional[Callable[[str, Optional[str], str], Any]] = None,
+) -> Iterator[tuple]:
+    """Stream files through the discover/read/classify/extract stages.
+
+    Args:
+        project_root: Path to the project root
+        paths: Relative paths to process (the discover stage input)
+        jobs: Worker count for each pool. ``1`` runs every stage inline.
+        queue_size: Maximum items buffered between stages. Defaults to ``4 * jobs``.
+        stats: Optional counters object to update
+        extract: Extract-stage function taking ``(path, language, text)``.
+            Defaults to ``extract_item``; must be a picklable module-level
+            function since it runs in the process pool.
+
+    Yields:
+        tuple: ``(path, metadata)`` for each extracted file; metadata is None for
+        files skipped as binary, lockfiles, minified or unreadable
+    """
+    extract = extract or extract_item
+    jobs = jobs or default_jobs()
+    queue_size = queue_size or max(4 * jobs, 1)
+    stats = stats if stats is not None else PipelineStats()
+    root = str(project_root)
+
+    def discover() -> Iterator[FileItem]:
+        for rel_path in paths:
+            stats.files_discovered += 1
+            yield FileItem(rel_path, os.path.join(root, rel_path))
+
+    def classify(read_results: Iterator[tuple]) -> Iterator[FileItem]:
+        for _, item in read_results:
+            stats.files_read += 1
+            stats.bytes_read += item.size
+            if item.skipped:
+                stats.files_skipped += 1
+            else:
+                item.language = classify_language(item.path)
+            yield item
+
+    thread_pool = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    process_pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        read_stage = _bounded_map(thread_pool, read_item, discover(), queue_size)
+        classified = classify(read_stage)
+
+        extract_stage = _bounded_map(
+            process_pool,
+            _extract_or_skip,
+            classified,
+            queue_size,
+            args=lambda item: (extract, item.path, item.language, item.text),
+        )
+        for item, metadata in extract_stage:
+            if metadata is not None:
+                stats.files_extracted += 1
+            yield item.path, metadata
+    finally:
+        stats.finished_at = time.perf_counter()
+        count("files_read", stats.files_read)
+        count("bytes_read", stats.bytes_read)
+        for pool in (thread_pool, process_pool):
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _extract_or_skip(
+    extract: Callable[[str, Optional[str], str], Any],
+    path: str,
+    language: Optional[str],
+    text: Optional[str],
+) -> Any:
+    """Run the extract function, or return None for items skipped by earlier stages."""
+    if text is None:
+        return None
+    return extract(path, language, text)
@@ -0,0 +1,340 @@
+"""Token-budgeted preamble assembly.
+
+Candidate sections are scored for relevance to the requested topic and
+their token cost is known up front (from memoized per-file counts), so the
+budget is filled by a greedy-by-density knapsack selection before anything
+is rendered. Rendering itself goes through the Jinja2 templates in
+``ai_assist.templates``; ``render_section`` and ``render_header`` mirror the
+built-in layout and are used to account for per-section overhead.
+"""
+
+import io
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from .context_manager import LazyContext
+from .pipeline import MAX_EXTRACT_BYTES
+from .reader import read_text
+from .scanner import FileIndex, FileRecord
+from .templates import render_preamble
+from .tokens import cached_file_tokens, count_tokens
+
+
+# Maximum number of entries in the "Relevant Files" overview section
+MAX_LISTED_FILES = 50
+
+# Relevance weights used by score_file
+PATH_MATCH_WEIGHT = 3.0
+HEADLINE_MATCH_WEIGHT = 2.0
+README_WEIGHT = 1.0
+# Weight of the normalized retrieval-index score (see ``ai_assist.retrieval``)
+RETRIEVAL_WEIGHT = 5.0
+
+CONTEXT_VALUE = 1000.0
+LISTING_VALUE = 100.0
+
+_TERM_SPLIT_RE = re.compile(r"[^a-z0-9]+")
+
+
+@dataclass
+class Section:
+    """A candidate preamble section with a known token cost."""
+
+    key: str
+    title: str
+    tokens: int
+    value: float
+    load_body: Callable[[], str]
+    language: Optional[str] = None
+    required: bool = False
+
+    @property
+    def body(self) -> str:
+        """Load the section body (used by templates at render time)."""
+        return self.load_body()
+
+    @property
+    def density(self) -> float:
+        """Value per token, used to order greedy selection."""
+        return self.value / max(self.tokens, 1)
+
+
+def topic_terms(topic: str) -> List[str]:
+    """Split a topic into lowercase search terms.
+
+    Args:
+        topic: Topic string such as ``"api"`` or ``"data-pipeline"``
+
+    Returns:
+        List[str]: Non-empty terms
+    """
+    return [term for term in _TERM_SPLIT_RE.split(topic.lower()) if term]
+
+
+def score_file(record: FileRecord, terms: Iterable[str]) -> float:
+    """Score how relevant a file is to the topic terms.
+
+    Args:
+        record: Indexed file record with extraction metadata
+        terms: Topic terms from ``topic_terms``
+
+    Returns:
+        float: Relevance score, 0 when unrelated
+    """
+    path = record.path.lower()
+    path_parts = set(_TERM_SPLIT_RE.split(path))
+    headline = ((record.meta or {}).get("headline") or "").lower()
+
+    score = 0.0
+    for term in terms:
+        if term in path_parts:
+            score += PATH_MATCH_WEIGHT
+        elif term in path:
+            score += PATH_MATCH_WEIGHT / 2
+        if term in headline:
+            score += HEADLINE_MATCH_WEIGHT
+    if "/" not in path and path.startswith("readme"):
+        score += README_WEIGHT
+    return score
+
+
+def render_section(title: str, body: str, fmt: str, language: Optional[str] = None) -> str:
+    """Render one section the way the built-in templates lay it out.
+
+    Args:
+        title: Section title
+        body: Section body
+        fmt: ``markdown`` or ``txt``
+        language: Language hint for fenced code blocks
+
+    Returns:
+        str: Rendered section text
+    """
+    if fmt == "markdown":
+        if language is not None:
+            return f"## {title}\n\n```{language}\n{body.rstrip()}\n```\n\n"
+        return f"## {title}\n\n{body.rstrip()}\n\n"
+    underline = "=" * len(title)
+    return f"{title}\n{underline}\n\n{body.rstrip()}\n\n"
+
+
+def render_header(topic: str, fmt: str) -> str:
+    """Render the document header."""
+    if fmt == "markdown":
+        return f"# Project Preamble: {topic}\n\n"
+    return f"PROJECT PREAMBLE: {topic}\n\n"
+
+
+def build_sections(
+    project_root: Union[str, Path],
+    index: FileIndex,
+    topic: str,
+    fmt: str = "markdown",
+    context: Optional[LazyContext] = None,
+    exact: bool = False,
+    ranking: Optional[Dict[str, float]] = None,
+    summaries: Optional[Dict[str, str]] = None,
+) -> List[Section]:
+    """Build candidate sections for a topic, in rendering order.
+
+    Token costs for file contents come from the index metadata and are
+    memoized there when missing, so file bodies are only read for files that
+    end up selected (or have never been counted).
+
+    Args:
+        project_root: Path to the project root
+        index: File index with extraction metadata
+        topic: Preamble topic
+        fmt: Output format, used to account for section overhead
+        context: Parsed AI_CONTEXT.yaml; each top-level section is a candidate
+        exact: Use exact token counts
+        ranking: Retrieval scores (0..1) by file path or ``context:<name>``,
+            added to the path/headline heuristics
+        summaries: Structural summaries by file path; files that have one
+            are represented by their outline instead of their full contents
+
+    Returns:
+        List[Section]: Candidate sections
+    """
+    root = Path(project_root)
+    terms = topic_terms(topic)
+    ranking = ranking or {}
+    summaries = summaries or {}
+    sections: List[Section] = []
+
+    def overhead(title: str, language: Optional[str] = None) -> int:
+        return count_tokens(render_section(title, "", fmt, language), exact=exact)
+
+    for name in context or ():
+        text = context.section_text(name)
+        title = f"Context: {name}"
+        sections.append(Section(
+            key=f"context:{name}",
+            title=title,
+            tokens=overhead(title, "yaml") + count_tokens(text, exact=exact),
+            value=CONTEXT_VALUE * (1.0 + ranking.get(f"context:{name}", 0.0)),
+            load_body=lambda text=text: text,
+            language="yaml",
+            required=name == "project",
+        ))
+
+    scored = [
+        (score_file(record, terms) + RETRIEVAL_WEIGHT * ranking.get(record.path, 0.0), record)
+        for record in index if record.meta
+    ]
+    scored.sort(key=lambda pair: (-pair[0], pair[1].path))
+
+    listing = "\n".join(_listing_line(record, fmt) for _, record in scored[:MAX_LISTED_FILES])
+    if listing:
+        sections.append(Section(
+            key="files",
+            title="Relevant Files",
+            tokens=overhead("Relevant Files") + count_tokens(listing, exact=exact),
+            value=LISTING_VALUE,
+            load_body=lambda: listing,
+        ))
+
+    for score, record in scored:
+        if score <= 0:
+            break
+        if not record.meta:
+            continue  # Skipped by the pipeline: binary, lockfile, minified or unreadable
+        file_path = root / record.path
+        language = record.meta.get("language") or ""
+        summary = summaries.get(record.path)
+        if summary:
+            title = f"Outline: {record.path}"
+            sections.append(Section(
+                key=f"file:{record.path}",
+                title=title,
+                tokens=overhead(title, language) + count_tokens(summary, exact=exact),
+                value=score * 10.0,
+                load_body=lambda summary=summary: summary,
+                language=language,
+            ))
+            continue
+
+        title = f"File: {record.path}"
+        body_tokens, updated_meta = cached_file_tokens(record.meta, lambda p=file_path: _read_text(p), exact=exact)
+        if updated_meta is not None:
+            index.set_meta(record.path, updated_meta)
+        sections.append(Section(
+            key=f"file:{record.path}",
+            title=title,
+            tokens=overhead(title, language) + body_tokens,
+            value=score * 10.0,
+            load_body=lambda p=file_path: _read_text(p),
+            language=language,
+        ))
+
+    return sections
+
+
+def select_sections(sections: List[Section], budget: int) -> List[Section]:
+    """Choose sections that fit the token budget, maximizing total value.
+
+    Required sections are taken first. The rest are added greedily by value
+    density; the result is then compared with the single most valuable
+    section that fits on its own, which bounds the greedy answer to at least
+    half of the optimal knapsack value.
+
+    Args:
+        sections: Candidate sections in rendering order
+        budget: Maximum total tokens
+
+    Returns:
+        List[Section]: Selected sections in their original order
+    """
+    order = {id(section): position for position, section in enumerate(sections)}
+    remaining = budget
+    required: List[Section] = []
+    for section in sections:
+        if section.required and section.tokens <= remaining:
+            required.append(section)
+            remaining -= section.tokens
+
+    optional = [section for section in sections if not section.required]
+    greedy: List[Section] = []
+    greedy_remaining = remaining
+    for section in sorted(optional, key=lambda s: (-s.density, order[id(s)])):
+        if section.tokens <= greedy_remaining:
+            greedy.append(section)
+            greedy_remaining -= section.tokens
+
+    fitting = [section for section in optional if section.tokens <= remaining]
+    if fitting:
+        best = max(fitting, key=lambda s: s.value)
+        if best.value > sum(section.value for section in greedy):
+            greedy = [best]
+
+    return sorted(required + greedy, key=lambda s: order[id(s)])
+
+
+def select_for_budget(
+    topic: str,
+    sections: List[Section],
+    max_tokens: int,
+    fmt: str = "markdown",
+    exact: bool = False,
+) -> List[Section]:
+    """Select sections for a whole-document token budget.
+
+    The header's cost is subtracted from the budget before selection.
+
+    Args:
+        topic: Preamble topic
+        sections: Candidate sections from ``build_sections``
+        max_tokens: Token budget for the whole document
+        fmt: ``markdown`` or ``txt``
+        exact: Use exact token counts for the header
+
+    Returns:
+        List[Section]: Selected sections in rendering order
+    """
+    header = render_header(topic, fmt)
+    budget = max(max_tokens - count_tokens(header, exact=exact), 0)
+    return select_sections(sections, budget)
+
+
+def assemble_preamble(
+    topic: str,
+    sections: List[Section],
+    max_tokens: int,
+    fmt: str = "markdown",
+    exact: bool = False,
+    project_root: Optional[Union[str, Path]] = None,
+) -> str:
+    """Select sections within the budget and render the preamble to a string.
+
+    Args:
+        topic: Preamble topic
+        sections: Candidate sections from ``build_sections``
+        max_tokens: Token budget for the whole document
+        fmt: ``markdown`` or ``txt``
+        exact: Use exact token counts for the header
+        project_root: Project whose template overrides apply
+
+    Returns:
+        str: Rendered preamble
+    """
+    out = io.StringIO()
+    selected = select_for_budget(topic, sections, max_tokens, fmt, exact)
+    render_preamble(out, topic, selected, fmt, project_root)
+    return out.getvalue()
+
+
+def _listing_line(record: FileRecord, fmt: str) -> str:
+    """Render one entry of the file overview."""
+    headline = (record.meta or {}).get("headline")
+    if fmt == "markdown":
+        line = f"- `{record.path}`"
+    else:
+        line = f"- {record.path}"
+    return f"{line} - {headline}" if headline else line
+
+
+def _read_text(path: Path) -> str:
+    """Read a file for inclusion in the preamble, bounded like extraction."""
+    return read_text(path, MAX_EXTRACT_BYTES)
@@ -0,0 +1,624 @@
+"""Local retrieval index over chunked project files and context sections.
+
+Files are split into chunks at top-level definitions (or headings for
+documentation) and indexed for BM25 over identifier terms: ``getUserName``
+and ``get_user_name`` both yield ``get``, ``user`` and ``name`` in addition
+to the whole identifier. AI_CONTEXT.yaml sections are indexed as chunks of
+their own under the source name ``context:<section>``.
+
+The index lives in ``AI/index/``::
+
+    AI/index/manifest.dat     sources, chunk table and corpus statistics
+    AI/index/terms.dat        distinct terms of every source (only read on update)
+    AI/index/postings-NN.dat  term -> packed (chunk id, term frequency) pairs, sharded
+    AI/index/vectors.npy      hashed n-gram vectors (only with numpy)
+
+Each ``.dat`` file is a JSON header line followed by the raw bytes of the
+unsigned integer arrays it describes, so loading never runs code from the
+index directory the way unpickling would.
+
+A query loads the manifest and only the posting shards of its terms.
+Updates are incremental: a source is re-chunked only when its content hash
+changes, and only the shards holding its terms are rewritten. Removed chunks
+leave tombstones; once they outnumber live chunks the index is rebuilt.
+
+When numpy is installed, every chunk also gets a hashed character-trigram
+vector, and cosine similarity to the query is blended into the BM25 score.
+This catches near-miss terms (``auth`` vs ``authentication``) without any
+model download or network access.
+"""
+
+import hashlib
+import math
+import json
+import os
+import re
+import sys
+import zlib
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from . import caches
+from .context_manager import LazyContext
+from .core import atomic_write_bytes, file_lock, get_ai_directory_path
+from .reader import read_text
+from .scanner import FileIndex
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+INDEX_VERSION = 2
+
+# Arrays are stored in native layout; an index from another platform is rebuilt
+ARRAY_LAYOUT = f"{sys.byteorder}-{array('I').itemsize}"
+
+SHARD_COUNT = 16
+
+# Maximum lines per chunk when no definition boundary comes earlier
+MAX_CHUNK_LINES = 80
+
+# Files larger than this are indexed by their first MAX_INDEX_BYTES only
+MAX_INDEX_BYTES = 512 * 1024
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+VECTOR_DIMENSIONS = 256
+VECTOR_WEIGHT = 0.5
+VECTOR_MIN_SIMILARITY = 0.2
+
+# Rebuild once tombstones outnumber live chunks (and there are enough to matter)
+REBUILD_MIN_DEAD = 1024
+
+CONTEXT_SOURCE_PREFIX = "context:"
+
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_WORD_PART_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+_CODE_BOUNDARY_RE = re.compile(
+    r"(?:(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:def|class|function|func|fn|interface|impl|struct|enum|type)\s"
+    r"|(?:pub|public|private|protected)\s)"
+)
+_DOC_BOUNDARY_RE = re.compile(r"#{1,6}\s|\.\. ")
+_DOC_LANGUAGES = {"markdown", "rst", "text"}
+
+
+@dataclass
+class Chunk:
+    """A contiguous range of lines from one source."""
+
+    source: str
+    title: str
+    start_line: int
+    end_line: int
+
+
+@dataclass
+class SearchHit:
+    """A chunk and its relevance score for a query."""
+
+    chunk: Chunk
+    score: float
+
+
+def get_retrieval_index_path(project_root: Union[str, Path]) -> Path:
+    """Get the directory holding a project's retrieval index.
+
+    Args:
+        project_root: Path to the project root
+
+    Returns:
+        Path: Path to AI/index (may not exist yet)
+    """
+    return get_ai_directory_path(project_root) / "index"
+
+
+@lru_cache(maxsize=65536)
+def identifier_terms(identifier: str) -> Tuple[str, ...]:
+    """Return the lowercase terms for one identifier: itself plus its word parts.
+
+    Args:
+        identifier: Identifier such as ``getUserName`` or ``MAX_RETRIES``
+
+    Returns:
+        Tuple[str, ...]: Distinct terms of two or more characters
+    """
+    lowered = identifier.lower()
+    terms = [lowered] if len(lowered) >= 2 else []
+    for piece in identifier.split("_"):
+        for part in _WORD_PART_RE.findall(piece):
+            part = part.lower()
+            if len(part) >= 2 and part not in terms:
+                terms.append(part)
+    return tuple(terms)
+
+
+def count_terms(text: str) -> Counter:
+    """Count identifier terms and their word parts in text.
+
+    Args:
+        text: Source code, prose or a query
+
+    Returns:
+        Counter: Term frequencies
+    """
+    counts: Counter = Counter()
+    for identifier, count in Counter(_IDENTIFIER_RE.findall(text)).items():
+        for term in identifier_terms(identifier):
+            counts[term] += count
+    return counts
+
+
+def split_chunks(text: str, language: Optional[str]) -> List[Tuple[int, int, str]]:
+    """Split text into chunks at top-level definitions or headings.
+
+    Args:
+        text: File contents
+        language: Language from the pipeline, used to pick boundaries
+
+    Returns:
+        List[Tuple[int, int, str]]: ``(start_line, end_line, title)``, 1-based and inclusive
+    """
+    boundary = _DOC_BOUNDARY_RE if language in _DOC_LANGUAGES else _CODE_BOUNDARY_RE
+    lines = text.splitlines()
+    chunks: List[Tuple[int, int, str]] = []
+    start, title = 0, ""
+    for number, line in enumerate(lines):
+        at_boundary = number > start and line[:1].strip() and boundary.match(line)
+        if at_boundary or number - start >= MAX_CHUNK_LINES:
+            chunks.append((start + 1, number, title))
+            start, title = number, ""
+        if not title and line.strip():
+            title = line.strip()[:80]
+    if start < len(lines):
+        chunks.append((start + 1, len(lines), title))
+    return chunks
+
+
+@lru_cache(maxsize=65536)
+def _shard_of(term: str) -> int:
+    return zlib.crc32(term.encode("utf-8")) % SHARD_COUNT
+
+
+@lru_cache(maxsize=65536)
+def _trigram_slots(term: str) -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+    """Hash the character trigrams of a term to vector slots and signs."""
+    padded = f"<{term}>"
+    hashes = [zlib.crc32(padded[i:i + 3].encode("utf-8")) for i in range(len(padded) - 2)]
+    slots = numpy.array([h % VECTOR_DIMENSIONS for h in hashes], dtype=numpy.intp)
+    signs = numpy.array([1.0 if h & 0x80000000 else -1.0 for h in hashes], dtype=numpy.float32)
+    return slots, signs
+
+
+def _term_vector(counts: Dict[str, int]) -> "numpy.ndarray":
+    """Hash character trigrams of the terms into a unit vector."""
+    if not counts:
+        return numpy.zeros(VECTOR_DIMENSIONS, dtype=numpy.float32)
+    pairs = [_trigram_slots(term) for term in counts]
+    slots = numpy.concatenate([pair[0] for pair in pairs])
+    weights = 1.0 + numpy.log(numpy.fromiter(counts.values(), dtype=numpy.float32, count=len(counts)))
+    weights = numpy.repeat(weights, [len(pair[0]) for pair in pairs]) * numpy.concatenate([pair[1] for pair in pairs])
+    vector = numpy.bincount(slots, weights=weights, minlength=VECTOR_DIMENSIONS).astype(numpy.float32)
+    norm = float(numpy.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def _pack(header: dict, arrays: List[array]) -> bytes:
+    """Serialize a JSON header and unsigned integer arrays into one blob."""
+    header = dict(header, layout=ARRAY_LAYOUT, arrays=[len(values) for values in arrays])
+    parts = [json.dumps(header, separators=(",", ":")).encode("utf-8"), b"\n"]
+    parts.extend(values.tobytes() for values in arrays)
+    return b"".join(parts)
+
+
+def _unpack(blob: bytes) -> Tuple[dict, List[array]]:
+    """Inverse of ``_pack``; raises ValueError on a damaged or foreign blob."""
+    line, _, body = blob.partition(b"\n")
+    header = json.loads(line)
+    if not isinstance(header, dict) or header.get("layout") != ARRAY_LAYOUT:
+        raise ValueError("incompatible index file")
+    values = array("I")
+    values.frombytes(body)
+    arrays, offset = [], 0
+    for length in header["arrays"]:
+        arrays.append(values[offset:offset + length])
+        offset += length
+    if offset != len(values):
+        raise ValueError("truncated index file")
+    return header, arrays
+
+
+def _bisect_pairs(postings: array, chunk_id: int) -> int:
+    """Index of the first (id, tf) pair whose id is >= chunk_id."""
+    lo, hi = 0, len(postings) // 2
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if postings[2 * mid] < chunk_id:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class ChunkIndex:
+    """BM25 (plus optional vector) index over chunks of project sources."""
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        # source -> (content digest, chunk ids)
+        self.sources: Dict[str, Tuple[str, List[int]]] = {}
+        # Per-chunk columns, indexed by chunk id; removed chunks have length 0
+        self.chunk_sources: List[str] = []
+        self.titles: List[str] = []
+        self.spans = array("I")
+        self.lengths = array("I")
+        self.total_length = 0
+        self.live_count = 0
+
+        # Postings are flat arrays of (chunk id, term frequency) pairs: cheap to
+        # write and read as raw bytes compared to nested lists
+        self._shards: Dict[int, Dict[str, array]] = {}
+        self._dirty_shards: set = set()
+        self._source_terms: Optional[Dict[str, str]] = None
+        self._vectors = None
+        self._new_vectors: Dict[int, "numpy.ndarray"] = {}
+        self._purge_legacy = False
+        self._dirty = False
+
+    # -- persistence -----------------------------------------------------
+
+    @classmethod
+    def load(cls, directory: Union[str, Path]) -> "ChunkIndex":
+        """Load the index manifest, returning an empty index if unusable."""
+        index = cls(directory)
+        try:
+            header, (spans, lengths) = _unpack((index.directory / "manifest.dat").read_bytes())
+            if header.get("version") != INDEX_VERSION:
+                raise ValueError("outdated index")
+            sources = {source: (digest, ids) for source, (digest, ids) in header["sources"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            # Start clean so leftover shards from an older index are overwritten
+            index._reset()
+            return index
+
+        index.sources = sources
+        index.chunk_sources = header["chunk_sources"]
+        index.titles = header["titles"]
+        index.spans = spans
+        index.lengths = lengths
+        index.total_length = header["total_length"]
+        index.live_count = header["live_count"]
+        return index
+
+    def _read(self, name: str) -> Optional[Tuple[dict, List[array]]]:
+        try:
+            return _unpack((self.directory / name).read_bytes())
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _shard(self, number: int) -> Dict[str, array]:
+        shard = self._shards.get(number)
+        if shard is None:
+            data = self._read(f"postings-{number:02d}.dat")
+            shard = self._shards[number] = dict(zip(data[0]["terms"], data[1])) if data else {}
+        return shard
+
+    def _terms(self) -> Dict[str, str]:
+        """Newline-joined distinct terms per source, used to remove its postings."""
+        if self._source_terms is None:
+            data = self._read("terms.dat")
+            terms = data[0].get("terms") if data else None
+            self._source_terms = terms if isinstance(terms, dict) else {}
+        return self._source_terms
+
+    def _vector_matrix(self):
+        """Vectors for all chunk ids (memory-mapped), or None without numpy."""
+        if numpy is None:
+            return None
+        if self._vectors is None:
+            try:
+                self._vectors = numpy.load(self.directory / "vectors.npy", mmap_mode="r", allow_pickle=False)
+            except (OSError, ValueError):
+                self._vectors = numpy.zeros((0, VECTOR_DIMENSIONS), dtype=numpy.float32)
+        return self._vectors
+
+    def save(self) -> None:
+        """Persist the manifest and every modified shard atomically."""
+        if not self._dirty:
+            return
+
+        for number in sorted(self._dirty_shards):
+            shard = self._shards[number]
+            atomic_write_bytes(self.directory / f"postings-{number:02d}.dat", _pack({"terms": list(shard)}, list(shard.values())))
+        if self._source_terms is not None:
+            atomic_write_bytes(self.directory / "terms.dat", _pack({"terms": self._source_terms}, []))
+        if numpy is not None and (self._new_vectors or self._vectors is not None):
+            self._save_vectors()
+        atomic_write_bytes(self.directory / "manifest.dat", _pack({
+            "version": INDEX_VERSION,
+            "sources": self.sources,
+            "chunk_sources": self.chunk_sources,
+            "titles": self.titles,
+            "total_length": self.total_length,
+            "live_count": self.live_count,
+        }, [self.spans, self.lengths]))
+        if self._purge_legacy:
+            # Pickled files from index version 1
+            for path in self.directory.glob("*.pickle"):
+                path.unlink(missing_ok=True)
+            self._purge_legacy = False
+        self._dirty_shards.clear()
+        self._dirty = False
+
+    def _save_vectors(self) -> None:
+        existing = self._vector_matrix()
+        matrix = numpy.zeros((len(self.lengths), VECTOR_DIMENSIONS), dtype=numpy.float32)
+        rows = min(len(existing), len(matrix))
+        matrix[:rows] = existing[:rows]
+        for chunk_id, vector in self._new_vectors.items():
+            matrix[chunk_id] = vector
+        for chunk_id, length in enumerate(self.lengths):
+            if not length:
+                matrix[chunk_id] = 0
+        self._vectors = None
+        self._new_vectors.clear()
+
+        path = self.directory / "vectors.npy"
+        tmp = path.with_name(f".vectors.{os.getpid()}.npy")
+        numpy.save(tmp, matrix, allow_pickle=False)
+        os.replace(tmp, path)
+
+    # -- updating --------------------------------------------------------
+
+    def update(
+        self,
+        project_root: Union[str, Path],
+        file_index: FileIndex,
+        context: Optional[LazyContext] = None,
+    ) -> int:
+        """Bring the index in line with the file index and context.
+
+        Args:
+            project_root: Path to the project root
+            file_index: Scanned files; only files with extraction metadata are indexed
+            context: Parsed AI_CONTEXT.yaml, if any
+
+        Returns:
+            int: Number of sources that were (re-)indexed or removed
+        """
+        root = Path(project_root)
+        wanted: Dict[str, Tuple[str, Optional[str], Callable[[], str]]] = {}
+        for record in file_index:
+            if record.meta:
+                wanted[record.path] = (
+                    record.digest,
+                    record.meta.get("language"),
+                    lambda p=root / record.path: _read_prefix(p),
+                )
+        for name in context or ():
+            text = context.section_text(name)
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+            wanted[CONTEXT_SOURCE_PREFIX + name] = (digest, "yaml", lambda text=text: text)
+
+        dead = len(self.lengths) - self.live_count
+        if dead >= REBUILD_MIN_DEAD and dead > self.live_count:
+            self._reset()
+
+        changes = 0
+        for source in [s for s in self.sources if s not in wanted]:
+            self._remove(source)
+            changes += 1
+        for source, (digest, language, load_text) in wanted.items():
+            current = self.sources.get(source)
+            if current is not None and current[0] == digest:
+                continue
+            if current is not None:
+                self._remove(source)
+            self._add(source, digest, language, load_text())
+            changes += 1
+        return changes
+
+    def _reset(self) -> None:
+        """Drop every chunk so the update rebuilds the index from scratch."""
+        self.sources = {}
+        self.chunk_sources = []
+        self.titles = []
+        self.spans = array("I")
+        self.lengths = array("I")
+        self.total_length = 0
+        self.live_count = 0
+        self._source_terms = {}
+        self._new_vectors = {}
+        self._vectors = numpy.zeros((0, VECTOR_DIMENSIONS), dtype=numpy.float32) if numpy is not None else None
+        self._shards = {number: {} for number in range(SHARD_COUNT)}
+        self._dirty_shards = set(range(SHARD_COUNT))
+        self._purge_legacy = True
+        self._dirty = True
+
+    def _add(self, source: str, digest: str, language: Optional[str], text: str) -> None:
+        path_terms = count_terms(source.replace("/", " ").replace(".", " "))
+        lines = text.splitlines()
+        ids: List[int] = []
+        distinct: set = set()
+        # Shards are loaded (and rewritten on save) only when a term lands in them
+        shards: Dict[int, Dict[str, array]] = {}
+
+        for start, end, title in split_chunks(text, language):
+            counts = count_terms("\n".join(lines[start - 1:end]))
+            counts.update(path_terms)
+            chunk_id = len(self.lengths)
+            length = sum(counts.values())
+            ids.append(chunk_id)
+
+            self.chunk_sources.append(source)
+            self.titles.append(title)
+            self.spans.extend((start, end))
+            self.lengths.append(max(length, 1))
+            self.total_length += max(length, 1)
+            self.live_count += 1
+            distinct.update(counts)
+
+            for term, count in counts.items():
+                number = _shard_of(term)
+                shard = shards.get(number)
+                if shard is None:
+                    shard = shards[number] = self._shard(number)
+                    self._dirty_shards.add(number)
+                postings = shard.get(term)
+                if postings is None:
+                    postings = shard[term] = array("I")
+                postings.append(chunk_id)
+                postings.append(count)
+            if numpy is not None:
+                self._new_vectors[chunk_id] = _term_vector(counts)
+
+        self.sources[source] = (digest, ids)
+        self._terms()[source] = "\n".join(sorted(distinct))
+        self._dirty = True
+
+    def _remove(self, source: str) -> None:
+        _, ids = self.sources.pop(source)
+        terms = self._terms().pop(source, None)
+        if ids:
+            if terms is None:
+                # Term list unavailable (damaged terms file): check every term
+                candidates = [term for number in range(SHARD_COUNT) for term in self._shard(number)]
+            else:
+                candidates = terms.split("\n") if terms else []
+            first, last = ids[0], ids[-1]
+            for term in candidates:
+                number = _shard_of(term)
+                shard = self._shard(number)
+                postings = shard.get(term)
+                if postings is None:
+                    continue
+                # Chunk ids only grow, so each postings array is sorted by id
+                # and a source's chunks form one contiguous run of pairs
+                lo = _bisect_pairs(postings, first)
+                hi = _bisect_pairs(postings, last + 1)
+                if lo == hi:
+                    continue
+                del postings[2 * lo:2 * hi]
+                self._dirty_shards.add(number)
+                if not postings:
+                    del shard[term]
+
+        for chunk_id in ids:
+            self.total_length -= self.lengths[chunk_id]
+            self.lengths[chunk_id] = 0
+            self.live_count -= 1
+            self._new_vectors.pop(chunk_id, None)
+        self._dirty = True
+
+    # -- querying --------------------------------------------------------
+
+    def chunk(self, chunk_id: int) -> Chunk:
+        """Return the chunk with the given id."""
+        return Chunk(
+            self.chunk_sources[chunk_id],
+            self.titles[chunk_id],
+            self.spans[2 * chunk_id],
+            self.spans[2 * chunk_id + 1],
+        )
+
+    def _scores(self, query: str) -> Dict[int, float]:
+        counts = count_terms(query)
+        if not counts or not self.live_count:
+            return {}
+
+        average = self.total_length / self.live_count
+        lengths = self.lengths
+        scores: Dict[int, float] = {}
+        for term in counts:
+            postings = self._shard(_shard_of(term)).get(term)
+            if not postings:
+                continue
+            frequency = len(postings) // 2
+            idf = math.log(1.0 + (self.live_count - frequency + 0.5) / (frequency + 0.5))
+            norm = BM25_K1 * (1.0 - BM25_B)
+            scale = BM25_K1 * BM25_B / average
+            for chunk_id, tf in zip(postings[0::2], postings[1::2]):
+                if chunk_id >= len(lengths) or not lengths[chunk_id]:
+                    continue  # orphaned by an interrupted save
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (BM25_K1 + 1.0) / (
+                    tf + norm + scale * lengths[chunk_id]
+                )
+
+        matrix = self._vector_matrix()
+        if matrix is not None and len(matrix):
+            similarities = matrix @ _term_vector(counts)
+            weight = VECTOR_WEIGHT * max(scores.values(), default=1.0)
+            for chunk_id in numpy.flatnonzero(similarities >= VECTOR_MIN_SIMILARITY).tolist():
+                if chunk_id < len(lengths) and lengths[chunk_id]:
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + weight * float(similarities[chunk_id])
+        return scores
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """Return the chunks most relevant to a query, best first.
+
+        Args:
+            query: Free text such as a preamble topic
+            limit: Maximum number of hits
+
+        Returns:
+            List[SearchHit]: Ranked hits
+        """
+        scores = self._scores(query)
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [SearchHit(self.chunk(chunk_id), score) for chunk_id, score in best]
+
+    def source_scores(self, query: str) -> Dict[str, float]:
+        """Score every matching source by its best chunk, normalized to 0..1.
+
+        Args:
+            query: Free text such as a preamble topic
+
+        Returns:
+            Dict[str, float]: Source (file path or ``context:<name>``) to score
+        """
+        totals: Dict[str, float] = {}
+        for chunk_id, score in self._scores(query).items():
+            source = self.chunk_sources[chunk_id]
+            if score > totals.get(source, 0.0):
+                totals[source] = score
+        top = max(totals.values(), default=0.0)
+        return {source: score / top for source, score in totals.items()} if top else {}
+
+
+def refresh_index(
+    project_root: Union[str, Path],
+    file_index: FileIndex,
+    context: Optional[LazyContext] = None,
+) -> Tuple[ChunkIndex, int]:
+    """Load, incrementally update and save a project's retrieval index.
+
+    The update runs under ``AI/index/.lock`` so concurrent commands do not
+    interleave shard writes.
+
+    Args:
+        project_root: Path to the project root
+        file_index: Scanned files with extraction metadata
+        context: Parsed AI_CONTEXT.yaml, if any
+
+    Returns:
+        Tuple[ChunkIndex, int]: The index and the number of sources updated
+    """
+    directory = get_retrieval_index_path(project_root)
+    with file_lock(directory / ".lock"):
+        index = ChunkIndex.load(directory)
+        changes = index.update(project_root, file_index, context)
+        index.save()
+    caches.record(project_root, "retrieval", hits=max(len(index.sources) - changes, 0), misses=changes)
+    return index, changes
+
+
+def _read_prefix(path: Path) -> str:
+    """Read up to MAX_INDEX_BYTES of a file as text."""
+    return read_text(path, MAX_INDEX_BYTES)
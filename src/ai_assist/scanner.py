@@ -0,0 +1,342 @@
+"""Incremental project scanner backed by a persistent file-fingerprint index.
+
+The index lives in ``AI/.cache/file_index.sqlite`` (see ``indexdb``) and
+records the mtime, size and content hash of every scanned file. A repeat
+scan only stats files and re-hashes the ones whose mtime or size changed,
+so a no-change run never reads file contents.
+"""
+
+import hashlib
+import os
+import sqlite3
+import stat
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from . import caches
+from .core import AIDirectoryError, walk_project
+from .indexdb import INDEX_FILENAME, IndexStore, get_index_path, prefix_bounds
+from .instrument import count
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# JSON index written by earlier versions; removed on the first save
+LEGACY_INDEX_FILENAME = "file_index.json"
+
+# Index path -> (generation, records) for long-lived processes such as ``serve``
+_memory_cache: Dict[str, Tuple[int, Dict[str, "FileRecord"]]] = {}
+
+
+@dataclass
+class FileRecord:
+    """Fingerprint of a single project file."""
+
+    path: str
+    mtime_ns: int
+    size: int
+    digest: str
+    meta: Optional[Dict[str, Any]] = None
+
+    def matches_stat(self, st: os.stat_result) -> bool:
+        """Return True if the stat result matches this fingerprint."""
+        return self.mtime_ns == st.st_mtime_ns and self.size == st.st_size
+
+
+class FileIndex:
+    """Persistent mapping of relative file paths to fingerprints.
+
+    Records are keyed by POSIX-style relative path. ``meta`` holds data
+    derived from the file contents (such as extraction results) and is
+    dropped whenever the content hash changes.
+
+    A loaded index starts out lazy: ``get`` and ``under`` query the
+    database directly, and all records are read (in one pass) only when
+    the index is iterated or ``preload`` is called. Changes are buffered
+    and written by ``save`` as one batched transaction.
+    """
+
+    def __init__(self, path: Path, records: Optional[Dict[str, FileRecord]] = None):
+        self.path = Path(path)
+        self._store = IndexStore(self.path)
+        self._records: Optional[Dict[str, FileRecord]] = records if records is not None else {}
+        self._changes: Dict[str, Optional[FileRecord]] = {}
+        self._generation: Optional[int] = None
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "FileIndex":
+        """Open an index, returning an empty index if it is missing or unusable.
+
+        Only the generation number is read. Fully read records are kept in
+        memory per generation, so repeated loads in one process (e.g. the
+        ``serve`` daemon) skip reading while the index is unchanged.
+        Records are never mutated in place, so the cached ones are shared
+        safely.
+
+        Args:
+            path: Path to the index database
+
+        Returns:
+            FileIndex: Loaded (or empty) index
+        """
+        index = cls(path)
+        generation = index._store.generation()
+        if generation is None:
+            return index
+        index._generation = generation
+        cached = _memory_cache.get(str(index.path))
+        if cached is not None and cached[0] == generation:
+            index._records = dict(cached[1])
+        else:
+            index._records = None
+        return index
+
+    def preload(self) -> None:
+        """Read every record into memory, for callers about to visit them all."""
+        if self._records is not None:
+            return
+        generation, rows = self._store.snapshot()
+        records = {row[0]: FileRecord(*row) for row in rows}
+        if generation is not None:
+            self._generation = generation
+            _memory_cache[str(self.path)] = (generation, records)
+        records = dict(records)
+        for rel_path, record in self._changes.items():
+            if record is None:
+                records.pop(rel_path, None)
+            else:
+                records[rel_path] = record
+        self._records = records
+
+    def get(self, rel_path: str) -> Optional[FileRecord]:
+        """Return the record for a path, if indexed."""
+        if self._records is not None:
+            return self._records.get(rel_path)
+        if rel_path in self._changes:
+            return self._changes[rel_path]
+        row = self._store.get(rel_path)
+        return FileRecord(*row) if row is not None else None
+
+    def under(self, directory: str) -> List[FileRecord]:
+        """Return records below a directory, sorted by path.
+
+        Args:
+            directory: Relative directory such as ``src/api``
+
+        Returns:
+            List[FileRecord]: Records whose path starts with ``directory/``
+        """
+        low, high = prefix_bounds(directory)
+        if self._records is not None:
+            found = {path: record for path, record in self._records.items() if low <= path < high}
+        else:
+            found = {row[0]: FileRecord(*row) for row in self._store.scan(directory)}
+            for rel_path, record in self._changes.items():
+                if low <= rel_path < high:
+                    if record is None:
+                        found.pop(rel_path, None)
+                    else:
+                        found[rel_path] = record
+        return [found[path] for path in sorted(found)]
+
+    def put(self, record: FileRecord) -> None:
+        """Insert or replace a record."""
+        if self._records is not None:
+            self._records[record.path] = record
+        self._changes[record.path] = record
+
+    def set_meta(self, rel_path: str, meta: Optional[Dict[str, Any]]) -> None:
+        """Attach derived metadata to an indexed file."""
+        record = self.get(rel_path)
+        if record is not None:
+            self.put(replace(record, meta=meta))
+
+    def remove(self, rel_path: str) -> None:
+        """Remove a record if present."""
+        if self.get(rel_path) is None:
+            return
+        if self._records is not None:
+            del self._records[rel_path]
+        self._changes[rel_path] = None
+
+    def paths(self) -> List[str]:
+        """Return all indexed paths."""
+        self.preload()
+        return list(self._records)
+
+    def __len__(self) -> int:
+        self.preload()
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[FileRecord]:
+        self.preload()
+        return iter(self._records.values())
+
+    @property
+    def dirty(self) -> bool:
+        """Whether the index has unsaved changes."""
+        return bool(self._changes)
+
+    def save(self) -> None:
+        """Write buffered changes in one transaction, if there are any.
+
+        Raises:
+            AIDirectoryError: If the index cannot be written
+        """
+        if not self._changes:
+            return
+
+        upserts = [
+            (record.path, record.mtime_ns, record.size, record.digest, record.meta)
+            for record in self._changes.values()
+            if record is not None
+        ]
+        deletes = [rel_path for rel_path, record in self._changes.items() if record is None]
+        try:
+            generation = self._store.write(upserts, deletes)
+        except (sqlite3.Error, OSError) as e:
+            _memory_cache.pop(str(self.path), None)
+            raise AIDirectoryError(f"Failed to write file index {self.path}: {e}")
+        finally:
+            self._store.close()
+        self._changes = {}
+        if self.path.name == INDEX_FILENAME:
+            try:
+                os.unlink(self.path.with_name(LEGACY_INDEX_FILENAME))
+            except OSError:
+                pass
+
+        previous = self._generation
+        self._generation = generation
+        if self._records is not None and (previous or 0) == generation - 1:
+            # Nobody else wrote in between, so memory matches the database
+            _memory_cache[str(self.path)] = (generation, dict(self._records))
+        else:
+            _memory_cache.pop(str(self.path), None)
+
+
+def clear_memory_cache() -> None:
+    """Drop all in-process loaded indexes."""
+    _memory_cache.clear()
+
+
+@dataclass
+class ScanResult:
+    """Outcome of an incremental scan."""
+
+    files: List[FileRecord] = field(default_factory=list)
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # Directories the walk visited, the root as ""
+    dirs: List[str] = field(default_factory=list)
+    bytes_hashed: int = 0
+
+    @property
+    def changed(self) -> List[str]:
+        """Paths that were added or modified since the previous scan."""
+        return self.added + self.modified
+
+    @property
+    def unchanged_count(self) -> int:
+        """Number of files whose fingerprint was reused from the index."""
+        return len(self.files) - len(self.added) - len(self.modified)
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    """Compute the content hash of a file.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as handle:
+        while True:
+            chunk = handle.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def scan_project(
+    project_root: Union[str, Path],
+    index: Optional[FileIndex] = None,
+    unchanged: Optional[Callable[[str], bool]] = None,
+) -> ScanResult:
+    """Scan the project, re-hashing only files whose fingerprint changed.
+
+    Files are discovered with ``walk_project``, so ignored paths (per
+    ``.gitignore``, ``.git/info/exclude`` and ``AI/.aiignore``) are never
+    indexed and drop out of the index when they become ignored.
+
+    Args:
+        project_root: Path to the project root
+        index: Index to update in place. Loaded from the AI directory if omitted.
+        unchanged: Optional predicate for paths whose content is known to be
+            unchanged (e.g. from git). Indexed files it accepts are restamped
+            with their new mtime and size instead of being re-hashed.
+
+    Returns:
+        ScanResult: Files found and what changed since the previous scan
+    """
+    root = Path(project_root)
+    if index is None:
+        index = FileIndex.load(get_index_path(root))
+    index.preload()
+
+    result = ScanResult(dirs=[""])
+    seen = set()
+
+    for rel_path, entry in walk_project(root, dirs=True):
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        if stat.S_ISDIR(st.st_mode):
+            result.dirs.append(rel_path)
+            continue
+
+        seen.add(rel_path)
+        record = index.get(rel_path)
+        if record is not None and record.matches_stat(st):
+            result.files.append(record)
+            continue
+        if record is not None and unchanged is not None and unchanged(rel_path):
+            record = FileRecord(rel_path, st.st_mtime_ns, st.st_size, record.digest, record.meta)
+            index.put(record)
+            result.files.append(record)
+            continue
+
+        try:
+            digest = hash_file(entry.path)
+        except OSError:
+            continue
+        result.bytes_hashed += st.st_size
+
+        meta = None
+        if record is None:
+            result.added.append(rel_path)
+        elif record.digest != digest:
+            result.modified.append(rel_path)
+        else:
+            meta = record.meta
+
+        record = FileRecord(rel_path, st.st_mtime_ns, st.st_size, digest, meta)
+        index.put(record)
+        result.files.append(record)
+
+    for rel_path in index.paths():
+        if rel_path not in seen:
+            index.remove(rel_path)
+            result.removed.append(rel_path)
+
+    count("files_scanned", len(result.files))
+    count("index_hits", result.unchanged_count)
+    count("bytes_hashed", result.bytes_hashed)
+    caches.record(project_root, "file-index", hits=result.unchanged_count, misses=len(result.changed))
+    return result
@@ -0,0 +1,408 @@
+"""Structural file summaries for preambles.
+
+Instead of pasting whole files into a preamble, files in supported languages
+are reduced to their outline: classes, function signatures and the first
+line of each docstring. Python is summarized with ``ast``; other languages
+use light line-based parsers registered with ``register_summarizer``.
+
+Summaries run as the extract stage of the ingestion pipeline (so parsing
+happens in the process pool) and are cached in ``AI/.cache/summaries.json``
+keyed by content hash and language. After a small edit only the edited files
+are parsed again. Each entry remembers the day it was last used, so the
+cache can be pruned least-recently-used first to its quota (see
+``ai_assist.caches``).
+"""
+
+import ast
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Sequence, Tuple, Union
+
+from . import caches
+from .core import AIAssistError, atomic_write_bytes, get_cache_directory_path
+from .instrument import count
+from .pipeline import PipelineStats, classify_language, run_pipeline
+from .scanner import FileRecord
+
+
+CACHE_FILENAME = "summaries.json"
+
+# Written by older versions; removed once the JSON cache is saved
+LEGACY_CACHE_FILENAME = "summaries.pickle"
+
+# Bump when summarizer output changes so cached summaries are regenerated
+SUMMARY_VERSION = 2
+
+# Longest value shown for module-level constants
+MAX_VALUE_CHARS = 60
+
+# language -> summarizer taking file text and returning the outline ("" if none)
+SUMMARIZERS: Dict[str, Callable[[str], str]] = {}
+
+
+def register_summarizer(language: str) -> Callable[[Callable[[str], str]], Callable[[str], str]]:
+    """Register a summarizer for a language (as named by ``classify_language``).
+
+    Args:
+        language: Language name, e.g. ``"go"``
+
+    Returns:
+        Callable: Decorator that registers and returns the function
+    """
+    def decorator(fn: Callable[[str], str]) -> Callable[[str], str]:
+        SUMMARIZERS[language] = fn
+        return fn
+    return decorator
+
+
+def summarize_text(path: str, language: Optional[str], text: str) -> str:
+    """Summarize one file (pipeline extract stage).
+
+    Args:
+        path: Relative file path
+        language: Language from the classify stage
+        text: Decoded file contents
+
+    Returns:
+        str: Outline of the file, or ``""`` if the language is unsupported
+    """
+    summarizer = SUMMARIZERS.get(language or "")
+    return summarizer(text) if summarizer is not None else ""
+
+
+# -- Python ------------------------------------------------------------------
+
+
+def _first_line(docstring: Optional[str]) -> Optional[str]:
+    if not docstring:
+        return None
+    line = docstring.strip().splitlines()[0].strip()
+    return line.replace('"""', "'''") or None
+
+
+def _is_private(name: str) -> bool:
+    return name.startswith("_") and not (name.startswith("__") and name.endswith("__"))
+
+
+def _python_node(node: ast.AST, indent: str, lines: List[str]) -> None:
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        if _is_private(node.name):
+            return
+        for decorator in node.decorator_list:
+            lines.append(f"{indent}@{ast.unparse(decorator)}")
+        prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        returns = f" -> {ast.unparse(node.returns)}" if node.returns is not None else ""
+        signature = f"{indent}{prefix} {node.name}({ast.unparse(node.args)}){returns}:"
+        doc = _first_line(ast.get_docstring(node))
+        if doc:
+            lines.append(signature)
+            lines.append(f'{indent}    """{doc}"""')
+        else:
+            lines.append(f"{signature} ...")
+
+    elif isinstance(node, ast.ClassDef):
+        if _is_private(node.name):
+            return
+        for decorator in node.decorator_list:
+            lines.append(f"{indent}@{ast.unparse(decorator)}")
+        bases = [ast.unparse(base) for base in node.bases]
+        bases += [ast.unparse(keyword) for keyword in node.keywords]
+        lines.append(f"{indent}class {node.name}({', '.join(bases)}):" if bases else f"{indent}class {node.name}:")
+        start = len(lines)
+        doc = _first_line(ast.get_docstring(node))
+        if doc:
+            lines.append(f'{indent}    """{doc}"""')
+        for child in node.body:
+            if isinstance(child, ast.AnnAssign) and isinstance(child.target, ast.Name):
+                if not _is_private(child.target.id):
+                    lines.append(f"{indent}    {child.target.id}: {ast.unparse(child.annotation)}")
+            else:
+                _python_node(child, indent + "    ", lines)
+        if len(lines) == start:
+            lines.append(f"{indent}    ...")
+
+    elif isinstance(node, (ast.Assign, ast.AnnAssign)) and not indent:
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        names = [target.id for target in targets if isinstance(target, ast.Name)]
+        if not names or not all(name.isupper() or name == "__all__" for name in names):
+            return
+        value = ast.unparse(node.value) if node.value is not None else "..."
+        if len(value) > MAX_VALUE_CHARS:
+            value = "..."
+        lines.append(f"{' = '.join(names)} = {value}")
+
+
+@register_summarizer("python")
+def summarize_python(text: str) -> str:
+    """Outline a Python module: docstring, constants, classes and signatures."""
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return _summarize_lines(text, _PYTHON_FALLBACK)
+
+    lines: List[str] = []
+    doc = _first_line(ast.get_docstring(tree))
+    if doc:
+        lines.append(f'"""{doc}"""')
+    for node in tree.body:
+        _python_node(node, "", lines)
+    return "\n".join(lines)
+
+
+# -- line-based parsers ------------------------------------------------------
+
+
+def _summarize_lines(text: str, patterns: Sequence[Pattern[str]]) -> str:
+    """Keep declaration lines matching any pattern, without their bodies."""
+    lines: List[str] = []
+    for line in text.splitlines():
+        for pattern in patterns:
+            match = pattern.match(line)
+            if match:
+                lines.append(match.group(0).rstrip().rstrip("{").rstrip())
+                break
+    return "\n".join(lines)
+
+
+def line_summarizer(*patterns: str) -> Callable[[str], str]:
+    """Build a summarizer that keeps lines matching the given regexes.
+
+    Each match (``group(0)``) is kept with any trailing ``{`` removed, so
+    patterns should stop before the declaration body.
+
+    Args:
+        *patterns: Regular expressions matched at the start of each line
+
+    Returns:
+        Callable[[str], str]: Summarizer suitable for ``register_summarizer``
+    """
+    compiled = [re.compile(pattern) for pattern in patterns]
+    return lambda text: _summarize_lines(text, compiled)
+
+
+_PYTHON_FALLBACK = [re.compile(r"\s*(?:async\s+)?(?:def|class)\s+[A-Za-z]\w*[^:]*:")]
+
+_JS_PATTERNS = (
+    r"\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\*?\s+\w+\s*(?:<[^>]*>)?\([^)]*\)[^{;]*",
+    r"\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+\w+[^{]*",
+    r"(?:export\s+)?(?:const|let|var)\s+\w+\s*(?::[^=]+)?=\s*(?:async\s+)?(?:\([^)]*\)|\w+)\s*(?::[^=]+)?=>",
+    r" {2,4}(?:(?:public|private|protected|static|readonly|async|get|set)\s+)*"
+    r"(?!(?:if|for|while|switch|catch|return|function)\b)[A-Za-z_$][\w$]*\s*\([^)]*\)\s*(?::\s*[^{;]+)?(?=\s*\{)",
+)
+_TS_PATTERNS = _JS_PATTERNS + (
+    r"(?:export\s+)?(?:declare\s+)?(?:interface|enum)\s+\w+[^{]*",
+    r"(?:export\s+)?type\s+\w+(?:<[^>]*>)?\s*=",
+)
+
+register_summarizer("javascript")(line_summarizer(*_JS_PATTERNS))
+register_summarizer("typescript")(line_summarizer(*_TS_PATTERNS))
+register_summarizer("go")(line_summarizer(
+    r"package\s+\w+",
+    r"func\s+(?:\([^)]*\)\s*)?\w+\s*(?:\[[^\]]*\])?\([^)]*\)[^{]*",
+    r"type\s+\w+(?:\[[^\]]*\])?\s+(?:struct|interface)",
+    r"type\s+\w+\s+[^{=\s][^{]*$",
+))
+register_summarizer("rust")(line_summarizer(
+    r"\s*(?:pub(?:\([^)]*\))?\s+)?(?:const\s+)?(?:async\s+)?(?:unsafe\s+)?fn\s+\w+[^{;]*",
+    r"\s*(?:pub(?:\([^)]*\))?\s+)?(?:struct|enum|trait|mod|union)\s+\w+[^{;]*",
+    r"\s*impl(?:<[^>]*>)?\s+[^{]*",
+))
+
+
+# -- caching -----------------------------------------------------------------
+
+
+def get_summary_cache_path(project_root: Union[str, Path]) -> Path:
+    """Get the path to the summary cache.
+
+    Args:
+        project_root: Path to the project root
+
+    Returns:
+        Path: Path to AI/.cache/summaries.json (may not exist yet)
+    """
+    return get_cache_directory_path(project_root) / CACHE_FILENAME
+
+
+class SummaryCache:
+    """Summaries keyed by ``<content digest>:<language>``.
+
+    Last use is tracked per entry at day granularity, so a warm run that
+    only reads the cache rewrites it at most once a day.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        entries: Optional[Dict[str, str]] = None,
+        used: Optional[Dict[str, int]] = None,
+    ):
+        self.path = Path(path)
+        self._entries: Dict[str, str] = entries or {}
+        self._used: Dict[str, int] = used or {}
+        self._today = _day()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SummaryCache":
+        """Load the cache, returning an empty one if missing or outdated."""
+        try:
+            with open(path, "rb") as handle:
+                data = json.load(handle)
+            if data.get("version") != SUMMARY_VERSION:
+                return cls(path)
+            entries = {key: summary for key, summary in data["entries"].items() if isinstance(summary, str)}
+            used = {key: day for key, day in data["used"].items() if isinstance(day, int)}
+        except (OSError, ValueError, TypeError, AttributeError, KeyError):
+            return cls(path)
+        return cls(path, entries, used)
+
+    @staticmethod
+    def key(record: FileRecord, language: str) -> str:
+        """Cache key for a file's content in a language."""
+        return f"{record.digest}:{language}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached summary, if present, and mark it as used."""
+        summary = self._entries.get(key)
+        if summary is not None and self._used.get(key) != self._today:
+            self._used[key] = self._today
+            self._dirty = True
+        return summary
+
+    def put(self, key: str, summary: str) -> None:
+        """Store a summary."""
+        self._entries[key] = summary
+        self._used[key] = self._today
+        self._dirty = True
+
+    def retain(self, keys: Iterable[str]) -> None:
+        """Drop entries for content that no longer exists."""
+        keep = set(keys)
+        stale = [key for key in self._entries if key not in keep]
+        for key in stale:
+            del self._entries[key]
+            self._used.pop(key, None)
+        if stale:
+            self._dirty = True
+
+    def prune(self, quota: caches.Quota, now: Optional[float] = None) -> Tuple[int, int]:
+        """Evict entries to fit a quota.
+
+        Entries unused for longer than the quota's age go first, then the
+        least recently used until the rest fit in its size.
+
+        Returns:
+            Tuple[int, int]: Entries removed and bytes of summary text freed
+        """
+        today = _day(now)
+        victims = []
+        if quota.max_age is not None:
+            oldest = today - int(quota.max_age // 86400)
+            victims = [key for key in self._entries if self._used.get(key, 0) < oldest]
+        if quota.max_bytes is not None:
+            expired = set(victims)
+            total = sum(_entry_size(key, summary) for key, summary in self._entries.items() if key not in expired)
+            for key in sorted((key for key in self._entries if key not in expired), key=lambda k: self._used.get(k, 0)):
+                if total <= quota.max_bytes:
+                    break
+                total -= _entry_size(key, self._entries[key])
+                victims.append(key)
+
+        freed = 0
+        for key in victims:
+            freed += _entry_size(key, self._entries.pop(key))
+            self._used.pop(key, None)
+        if victims:
+            self._dirty = True
+        return len(victims), freed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self) -> None:
+        """Persist the cache atomically if it changed."""
+        if not self._dirty:
+            return
+        data = {"version": SUMMARY_VERSION, "entries": self._entries, "used": self._used}
+        try:
+            atomic_write_bytes(self.path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        except AIAssistError:
+            # Summaries are recomputed next time; a read-only AI directory still works
+            return
+        self._dirty = False
+        try:
+            os.unlink(self.path.with_name(LEGACY_CACHE_FILENAME))
+        except OSError:
+            pass
+
+
+def _day(now: Optional[float] = None) -> int:
+    return int((time.time() if now is None else now) // 86400)
+
+
+def _entry_size(key: str, summary: str) -> int:
+    return len(key) + len(summary.encode("utf-8"))
+
+
+def prune_summary_cache(path: Union[str, Path], quota: caches.Quota, now: Optional[float] = None) -> Tuple[int, int]:
+    """Prune a stored summary cache to a quota (the ``summaries`` pruner)."""
+    cache = SummaryCache.load(path)
+    removed, freed = cache.prune(quota, now)
+    cache.save()
+    return removed, freed
+
+
+def summarize_records(
+    project_root: Union[str, Path],
+    records: Iterable[FileRecord],
+    cache: SummaryCache,
+    jobs: Optional[int] = None,
+    stats: Optional[PipelineStats] = None,
+) -> Dict[str, str]:
+    """Return structural summaries for files, parsing only cache misses.
+
+    Misses are read and summarized through ``run_pipeline`` with
+    ``summarize_text`` as the extract stage, so parsing runs in the process
+    pool. Cache entries for content no longer present are dropped.
+
+    Args:
+        project_root: Path to the project root
+        records: Indexed files to summarize
+        cache: Summary cache to consult and update
+        jobs: Worker count for the pipeline pools
+        stats: Optional counters for the pipeline run
+
+    Returns:
+        Dict[str, str]: Non-empty summaries by relative path
+    """
+    summaries: Dict[str, str] = {}
+    keys: Dict[str, str] = {}
+    for record in records:
+        language = classify_language(record.path)
+        if language not in SUMMARIZERS:
+            continue
+        key = cache.key(record, language)
+        keys[record.path] = key
+        cached = cache.get(key)
+        if cached is not None:
+            if cached:
+                summaries[record.path] = cached
+    pending = [path for path, key in keys.items() if cache.get(key) is None]
+    count("summary_cache_hits", len(keys) - len(pending))
+    count("summary_cache_misses", len(pending))
+    caches.record(project_root, "summaries", hits=len(keys) - len(pending), misses=len(pending))
+
+    if pending:
+        for path, summary in run_pipeline(project_root, pending, jobs=jobs, stats=stats, extract=summarize_text):
+            if summary is None:
+                continue
+            cache.put(keys[path], summary)
+            if summary:
+                summaries[path] = summary
+
+    cache.retain(keys.values())
+    return summaries
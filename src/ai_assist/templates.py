@@ -0,0 +1,195 @@
+"""Compiled, cached Jinja2 templates for preamble rendering.
+
+Templates are looked up in ``AI/templates/`` first, then in the templates
+shipped with the package, so users can override the layout per project or
+per topic (``preamble-<topic>.md.j2``). Compiled template bytecode is cached
+in ``AI/.cache/jinja2/`` and environments are reused within a process, so a
+template is only parsed and compiled when it changes. Bytecode files are
+touched when loaded, so the cache is pruned least-recently-used first.
+
+Rendering streams ``Template.generate()`` chunks to the output instead of
+building the whole document as one string.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+import jinja2
+
+from . import caches
+from .core import AIAssistError, get_ai_directory_path, get_cache_directory_path
+
+
+BUILTIN_TEMPLATE_DIR = Path(__file__).parent / "builtin_templates"
+
+FORMAT_EXTENSIONS = {
+    "markdown": "md",
+    "txt": "txt",
+}
+
+# Environments for this process, keyed by project root ("" for built-ins only)
+_environments: Dict[str, jinja2.Environment] = {}
+
+
+class TemplateError(AIAssistError):
+    """Raised when a preamble template cannot be loaded or rendered."""
+    pass
+
+
+class BytecodeCache(jinja2.FileSystemBytecodeCache):
+    """Bytecode cache that records hits and marks loaded entries as used."""
+
+    def __init__(self, project_root: Union[str, Path], directory: str):
+        super().__init__(directory)
+        self.project_root = project_root
+
+    def load_bytecode(self, bucket: jinja2.bccache.Bucket) -> None:
+        super().load_bytecode(bucket)
+        if bucket.code is None:
+            caches.record(self.project_root, "templates", misses=1)
+        else:
+            caches.record(self.project_root, "templates", hits=1)
+            caches.touch(self._get_cache_filename(bucket))
+
+
+def get_user_template_dir(project_root: Union[str, Path]) -> Path:
+    """Get the directory for project-specific template overrides.
+
+    Args:
+        project_root: Path to the project root
+
+    Returns:
+        Path: Path to AI/templates (may not exist yet)
+    """
+    return get_ai_directory_path(project_root) / "templates"
+
+
+def get_environment(project_root: Optional[Union[str, Path]] = None) -> jinja2.Environment:
+    """Return the cached template environment for a project.
+
+    Args:
+        project_root: Project whose ``AI/templates`` overrides and bytecode
+            cache are used. Without one only the built-in templates load.
+
+    Returns:
+        jinja2.Environment: Shared environment
+    """
+    key = str(project_root) if project_root is not None else ""
+    env = _environments.get(key)
+    if env is not None:
+        return env
+
+    search_path: List[str] = [str(BUILTIN_TEMPLATE_DIR)]
+    bytecode_cache = None
+    if project_root is not None:
+        search_path.insert(0, str(get_user_template_dir(project_root)))
+        cache_dir = get_cache_directory_path(project_root) / "jinja2"
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            bytecode_cache = BytecodeCache(project_root, str(cache_dir))
+        except OSError:
+            # Rendering still works without a persistent cache
+            bytecode_cache = None
+
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(search_path),
+        bytecode_cache=bytecode_cache,
+        autoescape=False,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+        undefined=jinja2.StrictUndefined,
+    )
+    _environments[key] = env
+    return env
+
+
+def template_names(topic: str, fmt: str) -> List[str]:
+    """Return candidate template names, most specific first.
+
+    Args:
+        topic: Preamble topic
+        fmt: Output format
+
+    Returns:
+        List[str]: Names tried in order by ``select_template``
+    """
+    ext = FORMAT_EXTENSIONS[fmt]
+    return [f"preamble-{topic}.{ext}.j2", f"preamble.{ext}.j2"]
+
+
+def get_template(topic: str, fmt: str, project_root: Optional[Union[str, Path]] = None) -> jinja2.Template:
+    """Load the most specific preamble template for a topic and format.
+
+    Raises:
+        TemplateError: If no template can be loaded or it has syntax errors
+    """
+    try:
+        return get_environment(project_root).select_template(template_names(topic, fmt))
+    except jinja2.TemplateSyntaxError as e:
+        raise TemplateError(f"Template syntax error in {e.filename or e.name}:{e.lineno}: {e.message}")
+    except jinja2.TemplateNotFound as e:
+        raise TemplateError(f"No preamble template found for format '{fmt}': {e}")
+
+
+def render_preamble(
+    out: TextIO,
+    topic: str,
+    sections: Iterable[Any],
+    fmt: str = "markdown",
+    project_root: Optional[Union[str, Path]] = None,
+    **extra: Any,
+) -> None:
+    """Stream a rendered preamble to a text stream.
+
+    The stream is flushed as each section is reached, so consumers of a pipe
+    see the header and every finished section immediately. Section bodies are
+    loaded one at a time, so memory stays bounded by the largest section.
+
+    Args:
+        out: Writable text stream
+        topic: Preamble topic
+        sections: Sections exposing ``title``, ``body`` and ``language``
+        fmt: ``markdown`` or ``txt``
+        project_root: Project for template overrides and bytecode cache
+        **extra: Additional template variables
+
+    Raises:
+        TemplateError: If the template fails to render
+    """
+    template = get_template(topic, fmt, project_root)
+    try:
+        for chunk in template.generate(topic=topic, sections=_FlushingSections(sections, out), format=fmt, **extra):
+            out.write(chunk)
+    except jinja2.TemplateError as e:
+        raise TemplateError(f"Failed to render preamble template '{template.name}': {e}")
+    out.flush()
+
+
+class _FlushingSections:
+    """Sections that flush ``out`` whenever the template moves to the next one.
+
+    The template only asks for the next section after everything rendered so
+    far has been yielded and written, so each flush pushes out complete
+    sections. Length and indexing still work for templates that use them.
+    """
+
+    def __init__(self, sections: Iterable[Any], out: TextIO):
+        self._sections = list(sections)
+        self._out = out
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    def __getitem__(self, index: Any) -> Any:
+        return self._sections[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        for section in self._sections:
+            self._out.flush()
+            yield section
+
+
+def clear_environments() -> None:
+    """Drop cached environments (for tests and long-lived processes)."""
+    _environments.clear()
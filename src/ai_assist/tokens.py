@@ -0,0 +1,110 @@
+"""Token counting for preamble budgets.
+
+The default estimator is a constant-time character heuristic that is close
+enough for budgeting. Exact counts use ``tiktoken`` when it is installed.
+"""
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .core import AIAssistError
+
+
+# Default token budget for generated preambles
+DEFAULT_MAX_TOKENS = 8000
+
+# Average characters per token for English prose and source code
+CHARS_PER_TOKEN = 4.0
+
+EXACT_ENCODING = "cl100k_base"
+
+# Keys used to memoize counts in file index metadata
+ESTIMATE_META_KEY = "tokens"
+EXACT_META_KEY = "tokens_exact"
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a string in constant time.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    if not text:
+        return 0
+    return max(1, int(len(text) / CHARS_PER_TOKEN + 0.5))
+
+
+@lru_cache(maxsize=1)
+def _load_encoder() -> Callable[[str], Any]:
+    """Load the exact tokenizer, raising if it is unavailable."""
+    try:
+        import tiktoken
+    except ImportError:
+        raise AIAssistError(
+            "Exact token counting requires the 'tiktoken' package. "
+            "Install it with 'pip install tiktoken' or drop --exact-tokens."
+        )
+    return tiktoken.get_encoding(EXACT_ENCODING).encode
+
+
+def exact_tokens(text: str) -> int:
+    """Count tokens exactly with tiktoken.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        int: Exact token count
+
+    Raises:
+        AIAssistError: If tiktoken is not installed
+    """
+    if not text:
+        return 0
+    return len(_load_encoder()(text, disallowed_special=()))
+
+
+def count_tokens(text: str, exact: bool = False) -> int:
+    """Count tokens with the estimator or, if requested, exactly.
+
+    Args:
+        text: Text to measure
+        exact: Use the exact tokenizer instead of the estimate
+
+    Returns:
+        int: Token count
+    """
+    return exact_tokens(text) if exact else estimate_tokens(text)
+
+
+def cached_file_tokens(
+    meta: Optional[Dict[str, Any]],
+    load_text: Callable[[], str],
+    exact: bool = False,
+) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """Return a file's token count, memoized in its index metadata.
+
+    ``meta`` is never modified: records may be shared with the index's
+    cache, so a new count comes back in a copy to store with ``set_meta``.
+
+    Args:
+        meta: The file's index metadata
+        load_text: Callable returning the file text if a count must be computed
+        exact: Use the exact tokenizer
+
+    Returns:
+        Tuple[int, Optional[Dict[str, Any]]]: Token count for the file
+        contents, and a copy of ``meta`` with the count added if it was
+        computed (None if ``meta`` already had it or is None)
+    """
+    key = EXACT_META_KEY if exact else ESTIMATE_META_KEY
+    if meta is not None and key in meta:
+        return meta[key], None
+
+    tokens = count_tokens(load_text(), exact=exact)
+    if meta is None:
+        return tokens, None
+    return tokens, {**meta, key: tokens}
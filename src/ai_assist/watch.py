@@ -0,0 +1,195 @@
+"""File change watchers for long-lived processes.
+
+``InotifyWatcher`` uses Linux inotify through ``ctypes`` and watches every
+non-ignored directory of the project. ``PollingWatcher`` works everywhere by
+comparing ``walk_project`` stat snapshots. Both report changed paths relative
+to the project root; ``open_watcher`` picks inotify when available.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Set, Tuple, Union
+
+from .core import AIAssistError, walk_project
+
+
+# inotify event masks (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Reported instead of a path when changes were lost (queue overflow)
+OVERFLOW = "*"
+
+
+class WatchError(AIAssistError):
+    """Raised when a watcher cannot be set up."""
+    pass
+
+
+class PollingWatcher:
+    """Detect changes by diffing stat snapshots of the project."""
+
+    def __init__(self, project_root: Union[str, Path], interval: float = 1.0):
+        self.root = Path(project_root)
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+        self._next_poll = time.monotonic() + interval
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for rel_path, entry in walk_project(self.root):
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            snapshot[rel_path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def poll(self, timeout: float) -> Set[str]:
+        """Wait up to ``timeout`` seconds and return paths changed since the last poll."""
+        delay = self._next_poll - time.monotonic()
+        if delay > timeout:
+            time.sleep(max(timeout, 0))
+            return set()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_poll = time.monotonic() + self.interval
+
+        snapshot = self._take_snapshot()
+        previous = self._snapshot
+        self._snapshot = snapshot
+        changed = {path for path, value in snapshot.items() if previous.get(path) != value}
+        changed.update(path for path in previous if path not in snapshot)
+        return changed
+
+    def close(self) -> None:
+        """Release resources (nothing to do for polling)."""
+
+
+class InotifyWatcher:
+    """Watch every non-ignored project directory with inotify."""
+
+    def __init__(self, project_root: Union[str, Path]):
+        self.root = Path(project_root)
+        libc_name = ctypes.util.find_library("c")
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            self._add_watch = libc.inotify_add_watch
+            init = libc.inotify_init1
+        except (OSError, AttributeError) as e:
+            raise WatchError(f"inotify is not available: {e}")
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise WatchError(f"inotify_init1 failed: {os.strerror(ctypes.get_errno())}")
+        self._dirs: Dict[int, str] = {}
+        self._watch("")
+        for rel_path, entry in walk_project(self.root, dirs=True):
+            if entry.is_dir(follow_symlinks=False):
+                self._watch(rel_path)
+
+    def _watch(self, rel_dir: str) -> None:
+        path = os.path.join(str(self.root), rel_dir) if rel_dir else str(self.root)
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            if not rel_dir:
+                raise WatchError(f"Cannot watch {path}: {os.strerror(errno)}")
+            return  # Removed in the meantime, or out of watches; polling covers the rest
+        self._dirs[wd] = rel_dir
+
+    def poll(self, timeout: float) -> Set[str]:
+        """Wait up to ``timeout`` seconds and return paths changed since the last poll."""
+        changed: Set[str] = set()
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return changed
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            self._parse(data, changed)
+        return changed
+
+    def _parse(self, data: bytes, changed: Set[str]) -> None:
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.add(OVERFLOW)
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            rel_dir = self._dirs.get(wd)
+            if rel_dir is None:
+                continue
+            rel_path = f"{rel_dir}/{name}" if rel_dir and name else (name or rel_dir)
+            changed.add(rel_path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_new_dirs()
+
+    def _watch_new_dirs(self) -> None:
+        """Add watches for directories created since the last walk.
+
+        Re-walking from the root keeps ignore rules exact (a new
+        ``node_modules`` stays unwatched) at the cost of a listing, which
+        is fine for an event as rare as directory creation.
+        """
+        watched = set(self._dirs.values())
+        for rel_path, entry in walk_project(self.root, dirs=True):
+            if rel_path not in watched and entry.is_dir(follow_symlinks=False):
+                self._watch(rel_path)
+
+    def close(self) -> None:
+        """Close the inotify descriptor."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_watcher(project_root: Union[str, Path], polling: bool = False, interval: float = 1.0):
+    """Return an inotify watcher, falling back to polling where unsupported.
+
+    Args:
+        project_root: Path to the project root
+        polling: Force the polling watcher
+        interval: Seconds between polling snapshots
+
+    Returns:
+        InotifyWatcher or PollingWatcher
+    """
+    if not polling:
+        try:
+            return InotifyWatcher(project_root)
+        except WatchError:
+            pass
+    return PollingWatcher(project_root, interval)
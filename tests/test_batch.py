@@ -0,0 +1,84 @@
+"""Tests for running commands across many projects."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from ai_assist.batch import STATUS_INVALID, STATUS_OK, STATUS_TIMEOUT, expand_roots, run_batch, run_project
+from ai_assist.cli import main
+
+
+def _make_projects(base: Path, count: int):
+    roots = []
+    for i in range(count):
+        root = base / f"service-{i}"
+        (root / ".git").mkdir(parents=True)
+        (root / "README.md").write_text(f"# Service {i}")
+        roots.append(root)
+    return roots
+
+
+class TestBatch:
+    """Test cases for root expansion, concurrency and reporting."""
+
+    def test_expand_roots(self):
+        """Test that globs expand to directories and duplicates are dropped."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            roots = _make_projects(Path(temp_dir), 3)
+            (Path(temp_dir) / "service-notes.txt").write_text("not a project")
+
+            expanded = expand_roots([str(roots[0])], [os.path.join(temp_dir, "service-*")])
+            assert [Path(path).name for path in expanded] == ["service-0", "service-1", "service-2"]
+
+    def test_run_batch_reports_each_project(self):
+        """Test that every root gets a result and invalid roots do not stop the batch."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            roots = _make_projects(Path(temp_dir), 2)
+            missing = str(Path(temp_dir) / "missing")
+            seen = []
+
+            report = run_batch([str(roots[0]), missing, str(roots[1])], "init", workers=2, on_result=seen.append)
+
+            assert [result.status for result in report.projects] == [STATUS_OK, STATUS_INVALID, STATUS_OK]
+            assert len(seen) == 3
+            assert not report.ok
+            assert report.counts["ok"] == 2
+            assert all((root / "AI" / "AI_CONTEXT.yaml").exists() for root in roots)
+            assert "Project root detected" in report.projects[0].stdout
+
+    def test_run_project_timeout(self):
+        """Test that a project exceeding its timeout is killed and reported."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = _make_projects(Path(temp_dir), 1)[0]
+            result = run_project(root, ["status"], timeout=0.001)
+
+            assert result.status == STATUS_TIMEOUT
+            assert "Timed out" in result.error
+
+    def test_batch_command_json_report(self):
+        """Test the batch CLI writes a JSON report and fails if a project fails."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            roots = _make_projects(Path(temp_dir), 2)
+            report_path = Path(temp_dir) / "report.json"
+            runner = CliRunner()
+
+            result = runner.invoke(
+                main,
+                ['batch', 'preamble', '--glob', os.path.join(temp_dir, 'service-*'),
+                 '--args', '--topic api', '--report', str(report_path)],
+            )
+            assert result.exit_code == 1  # Not initialized yet
+            report = json.loads(report_path.read_text())
+            assert report["summary"]["failed"] == 2
+            assert "AI directory not found" in report["projects"][0]["stderr"]
+
+            runner.invoke(main, ['batch', 'init', str(roots[0]), str(roots[1])])
+            result = runner.invoke(main, ['batch', '-w', '2', 'preamble', str(roots[0]), str(roots[1]),
+                                          '--args', '--topic api'])
+            assert result.exit_code == 0
+            report = json.loads(result.stdout)
+            assert report["summary"]["ok"] == 2
+            assert "Service 1" in report["projects"][1]["stdout"]
@@ -0,0 +1,73 @@
+"""Tests for the deduplicating blob store."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from ai_assist.blobstore import MAX_CHUNK_BYTES, BlobStore, BlobStoreError, split_chunks
+
+
+def _document(lines: int, seed: str = "") -> bytes:
+    return "".join(f"{seed}line {i}: some preamble text about module_{i % 97}\n" for i in range(lines)).encode()
+
+
+class TestBlobStore:
+    """Test cases for chunking, storage and deduplication."""
+
+    def test_split_chunks_is_lossless_and_bounded(self):
+        """Test that chunks concatenate back to the input and respect the size limit."""
+        data = _document(3000) + b"x" * (3 * MAX_CHUNK_BYTES)
+        chunks = list(split_chunks(data))
+
+        assert b"".join(chunks) == data
+        assert len(chunks) > 1
+        assert all(len(chunk) <= MAX_CHUNK_BYTES for chunk in chunks)
+        assert list(split_chunks(b"")) == []
+
+    def test_chunk_boundaries_survive_insertions(self):
+        """Test that an insertion near the start only changes nearby chunks."""
+        data = _document(3000)
+        edited = b"an extra question at the top\n" + data
+
+        original = set(split_chunks(data))
+        changed = [chunk for chunk in split_chunks(edited) if chunk not in original]
+        assert len(changed) <= 2
+
+    def test_round_trip(self):
+        """Test that stored blobs read back unchanged."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = BlobStore(Path(temp_dir) / "blobs", compression="zlib")
+            data = _document(2000)
+            blob_id = store.put(data)
+
+            assert store.exists(blob_id)
+            assert store.get(blob_id) == data
+            assert store.put(data) == blob_id
+            assert store.get_text(store.put("héllo")) == "héllo"
+
+    def test_near_duplicates_share_chunks(self):
+        """Test that a near-identical body writes only a few new chunks."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = BlobStore(Path(temp_dir) / "blobs", compression="none")
+            preamble = _document(3000)
+            store.put(preamble + b"Question: what does scanner.py do?\n")
+            written = store.chunks_written
+
+            store.put(preamble + b"Question: where is the CLI defined?\n")
+            assert store.chunks_written - written == 1
+            assert written > 10
+
+    def test_missing_blob_raises(self):
+        """Test that unknown ids and lost chunks raise BlobStoreError."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = BlobStore(Path(temp_dir) / "blobs")
+            with pytest.raises(BlobStoreError):
+                store.get("0" * 32)
+
+            blob_id = store.put(b"data")
+            for path in (Path(temp_dir) / "blobs" / "chunks").rglob("*"):
+                if path.is_file():
+                    path.unlink()
+            with pytest.raises(BlobStoreError):
+                BlobStore(Path(temp_dir) / "blobs").get(blob_id)
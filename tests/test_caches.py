@@ -0,0 +1,182 @@
+"""Tests for the cache registry, quotas, eviction and statistics."""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from ai_assist import caches
+from ai_assist.caches import CacheError, Quota
+from ai_assist.cli import main
+from ai_assist.summarize import SummaryCache
+
+
+def _project(temp_dir):
+    root = Path(temp_dir)
+    (root / "AI" / ".cache").mkdir(parents=True)
+    return root
+
+
+def _entry(path, size, age):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+
+
+class TestQuotas:
+    """Test cases for size and age parsing and per-project overrides."""
+
+    def test_parse_size_and_age(self):
+        """Test that sizes and ages accept the documented units."""
+        assert caches.parse_size("512") == 512
+        assert caches.parse_size("64M") == 64 * 1024 ** 2
+        assert caches.parse_size("1.5GiB") == int(1.5 * 1024 ** 3)
+        assert caches.parse_age("90s") == 90
+        assert caches.parse_age("30d") == 30 * 86400
+        with pytest.raises(CacheError):
+            caches.parse_size("lots")
+        with pytest.raises(CacheError):
+            caches.parse_age("3y")
+
+    def test_overrides_are_stored_in_cache_json(self):
+        """Test that set_quota overrides defaults and 'none' lifts a limit."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = _project(temp_dir)
+            assert caches.load_quotas(root)["summaries"] == caches.CACHES["summaries"].quota
+
+            quota = caches.set_quota(root, "summaries", "1M", None)
+            assert quota == Quota(1024 ** 2, caches.CACHES["summaries"].quota.max_age)
+            quota = caches.set_quota(root, "summaries", None, "none")
+            assert quota == Quota(1024 ** 2, None)
+            assert (root / "AI" / "cache.json").exists()
+
+            with pytest.raises(CacheError):
+                caches.set_quota(root, "nope", "1M", None)
+
+
+class TestEviction:
+    """Test cases for pruning and clearing caches."""
+
+    def test_entry_cache_evicts_least_recently_used(self):
+        """Test that expired and then oldest entry files are removed first."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = _project(temp_dir)
+            bytecode = root / "AI" / ".cache" / "jinja2"
+            _entry(bytecode / "expired", 100, 40 * 86400)
+            _entry(bytecode / "old", 100, 3600)
+            _entry(bytecode / "new", 100, 60)
+
+            removed, freed = caches.prune(root, "templates", Quota(max_bytes=150, max_age=30 * 86400))
+            assert (removed, freed) == (2, 200)
+            assert sorted(os.listdir(bytecode)) == ["new"]
+            assert caches.prune(root, "templates", Quota()) == (0, 0)
+
+    def test_whole_cache_is_removed_over_quota(self):
+        """Test that single-file caches are evicted as a whole and clear removes directories."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = _project(temp_dir)
+            _entry(root / "AI" / ".cache" / "context.json", 500, 0)
+            assert caches.prune(root, "context", Quota(max_bytes=1000)) == (0, 0)
+            assert caches.prune(root, "context", Quota(max_bytes=100)) == (1, 500)
+
+            _entry(root / "AI" / "index" / "shard-0", 10, 0)
+            assert caches.clear(root, "retrieval") == (1, 10)
+            assert not (root / "AI" / "index").exists()
+
+    def test_summary_cache_prunes_by_last_use(self):
+        """Test that summaries unused the longest are evicted to fit the quota."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = _project(temp_dir)
+            path = root / "AI" / ".cache" / "summaries.json"
+            cache = SummaryCache(path)
+            for key in ("a", "b", "c"):
+                cache.put(key, "x" * 99)
+            today = cache._today
+            cache._used.update({"a": today - 100, "b": today - 2})
+            cache.save()
+
+            removed, _ = caches.prune(root, "summaries", Quota(max_bytes=150, max_age=90 * 86400))
+            assert removed == 2  # "a" expired, then "b" is the least recently used
+            reloaded = SummaryCache.load(path)
+            assert reloaded.get("c") is not None and reloaded.get("b") is None
+
+
+class TestStats:
+    """Test cases for hit statistics."""
+
+    def test_record_and_flush_accumulate(self):
+        """Test that counts from several flushes add up."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = _project(temp_dir)
+            caches.record(root, "summaries", hits=3, misses=1)
+            caches.flush_stats()
+            caches.record(root, "summaries", hits=1)
+            caches.flush_stats()
+
+            usage = caches.usage(root, "summaries")
+            assert (usage.hits, usage.misses) == (4, 1)
+            assert usage.hit_rate == 0.8
+            caches.reset_stats(root)
+            assert caches.usage(root, "summaries").hit_rate is None
+
+    def test_flush_skips_unchanged_counters(self):
+        """Test that a flush with nothing new leaves the statistics file alone."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = _project(temp_dir)
+            caches.record(root, "context", hits=0)
+            caches.flush_stats()
+            assert not caches.get_stats_path(root).exists()
+
+            caches.record(root, "context", hits=1)
+            caches.flush_stats()
+            mtime = caches.get_stats_path(root).stat().st_mtime_ns
+            caches.record(root, "context")
+            caches.flush_stats()
+            assert caches.get_stats_path(root).stat().st_mtime_ns == mtime
+
+    def test_flush_does_not_create_ai_directory(self):
+        """Test that statistics for an uninitialized project are dropped."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            caches.record(temp_dir, "context", misses=1)
+            caches.flush_stats()
+            assert not (Path(temp_dir) / "AI").exists()
+
+
+class TestCacheCommand:
+    """Test cases for ``ai-assist cache``."""
+
+    def test_stats_prune_clear_and_quota(self):
+        """Test the cache subcommands end to end on a small project."""
+        runner = CliRunner()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                Path("README.md").touch()
+                Path("app.py").write_text("def run():\n    return 1\n")
+                runner.invoke(main, ["init"])
+                runner.invoke(main, ["preamble", "--topic", "api"])
+                runner.invoke(main, ["preamble", "--topic", "api"])
+
+                result = runner.invoke(main, ["cache", "stats"])
+                assert result.exit_code == 0
+                assert "summaries" in result.output and "hit rate: 50%" in result.output
+
+                result = runner.invoke(main, ["cache", "quota", "summaries", "--max-size", "1"])
+                assert result.exit_code == 0 and "max size 1 B" in result.output
+                result = runner.invoke(main, ["cache", "prune", "summaries"])
+                assert result.exit_code == 0 and "evicted 1 entries" in result.output
+
+                result = runner.invoke(main, ["cache", "clear"])
+                assert result.exit_code == 0
+                assert not Path("AI/.cache/summaries.json").exists()
+                assert not Path("AI/index").exists()
+
+                result = runner.invoke(main, ["cache", "prune", "bogus"])
+                assert result.exit_code == 1 and "Unknown cache" in result.output
+            finally:
+                os.chdir(original_cwd)
@@ -67,6 +67,7 @@ class TestCLI:
                 ai_dir = temp_path / "AI"
                 assert ai_dir.exists()
                 assert (ai_dir / "AI_CONTEXT.yaml").exists()
+                assert ".cache/" in (ai_dir / ".gitignore").read_text()
             finally:
                 os.chdir(original_cwd)
     
@@ -122,6 +123,20 @@ class TestCLI:
                 assert result.exit_code == 0
                 assert 'AI Directory Exists: Yes' in result.output
                 assert 'AI_CONTEXT.yaml: Yes' in result.output
+                assert 'Context sections: project' in result.output
+                assert 'File index: not built yet' in result.output
+                
+                self.runner.invoke(main, ['preamble', '--topic', 'api'])
+                result = self.runner.invoke(main, ['status'])
+                assert 'File index: 1 files' in result.output
+                assert 'Caches:' in result.output
+                assert 'file-index:' in result.output and 'hit rate' in result.output
+                
+                (temp_path / "AI" / "AI_CONTEXT.yaml").write_text("key: [unclosed\n")
+                result = self.runner.invoke(main, ['status'])
+                assert result.exit_code == 0
+                assert 'AI_CONTEXT.yaml is invalid' in result.output
+                assert 'File index: 1 files' in result.output
             finally:
                 os.chdir(original_cwd)
     
@@ -158,3 +173,217 @@ class TestCLI:
                 assert 'AI directory not found' in result.output
             finally:
                 os.chdir(original_cwd)
+    
+    def test_preamble_scans_project(self):
+        """Test preamble command refreshes the file index."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "README.md").write_text("# Demo")
+            
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                self.runner.invoke(main, ['init'])
+                result = self.runner.invoke(main, ['preamble', '--topic', 'api'])
+                assert result.exit_code == 0
+                assert 'Scanned 1 files (1 added' in result.output
+                assert (temp_path / "AI" / ".cache" / "file_index.sqlite").exists()
+                assert 'Processed files: 1 extracted' in result.output
+                
+                result = self.runner.invoke(main, ['preamble', '--topic', 'api', '--no-memo'])
+                assert 'Scanned 1 files (0 added, 0 modified, 0 removed)' in result.output
+                assert 'Processed files' not in result.output
+                assert '# Project Preamble: api' in result.output
+                assert '# Demo' in result.output
+            finally:
+                os.chdir(original_cwd)
+    
+    def test_preamble_output_file(self):
+        """Test --output writes the preamble to a file instead of stdout."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "README.md").write_text("# Demo")
+            
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                self.runner.invoke(main, ['init'])
+                result = self.runner.invoke(main, ['preamble', '--topic', 'api', '-o', 'out/api.md'])
+                assert result.exit_code == 0
+                assert 'Wrote' in result.output
+                assert '# Project Preamble' not in result.output
+                assert (temp_path / "out" / "api.md").read_text().startswith('# Project Preamble: api')
+            finally:
+                os.chdir(original_cwd)
+    
+    def test_jobs_option(self):
+        """Test the global --jobs option is accepted."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "README.md").write_text("# Demo")
+            
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                self.runner.invoke(main, ['init'])
+                result = self.runner.invoke(main, ['--jobs', '2', 'preamble', '--topic', 'api'])
+                assert result.exit_code == 0
+                assert 'Processed files: 1 extracted' in result.output
+                
+                result = self.runner.invoke(main, ['--jobs', '0', 'status'])
+                assert result.exit_code != 0
+            finally:
+                os.chdir(original_cwd)
+    
+    def test_log_query_appends_record(self):
+        """Test log-query appends to the segment store."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "README.md").touch()
+            
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                self.runner.invoke(main, ['init'])
+                result = self.runner.invoke(main, [
+                    'log-query',
+                    '--model', 'gpt-4',
+                    '--prompt', 'test prompt',
+                    '--topic', 'api',
+                ])
+                assert result.exit_code == 0
+                assert 'Record: 1:0' in result.output
+                
+                result = self.runner.invoke(main, [
+                    'log-query',
+                    '--model', 'gpt-4',
+                    '--prompt', 'second',
+                    '--format', 'json',
+                ])
+                assert result.exit_code == 0
+                assert '"id": "1:1"' in result.output
+                assert (temp_path / "AI" / "logs" / "segment-00000001.jsonl").exists()
+            finally:
+                os.chdir(original_cwd)
+    
+    def test_logs_search(self):
+        """Test logs search streams matching records."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "README.md").touch()
+            
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                self.runner.invoke(main, ['init'])
+                self.runner.invoke(main, ['log-query', '--model', 'gpt-4', '--prompt', 'refactor the api'])
+                self.runner.invoke(main, ['log-query', '--model', 'claude-3', '--prompt', 'write tests'])
+                
+                result = self.runner.invoke(main, ['logs', 'search', 'api'])
+                assert result.exit_code == 0
+                assert 'refactor the api' in result.output
+                assert 'write tests' not in result.output
+                assert '1 matching queries' in result.output
+                
+                result = self.runner.invoke(main, ['logs', 'search', '--model', 'claude-3', '--format', 'json'])
+                assert result.exit_code == 0
+                assert '"id": "1:1"' in result.output
+                
+                result = self.runner.invoke(main, ['logs', 'search', '--since', 'not-a-date'])
+                assert result.exit_code == 1
+                assert 'Invalid timestamp' in result.output
+            finally:
+                os.chdir(original_cwd)
+    
+    def test_update_sets_key(self):
+        """Test update writes a parsed value into AI_CONTEXT.yaml."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "README.md").touch()
+            
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                self.runner.invoke(main, ['init'])
+                result = self.runner.invoke(main, ['update', '--key', 'owners', '--value', '[alice, bob]'])
+                assert result.exit_code == 0
+                
+                content = (temp_path / "AI" / "AI_CONTEXT.yaml").read_text()
+                assert 'owners:\n- alice\n- bob' in content
+                assert content.startswith('project:')
+            finally:
+                os.chdir(original_cwd)
+    
+    def test_update_batch(self):
+        """Test update applies --set pairs and --from-file in one call."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "README.md").touch()
+            batch_file = temp_path / "batch.yaml"
+            batch_file.write_text("tech_stack.languages: [python]\narchitecture.overview: CLI tool\n")
+            
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                self.runner.invoke(main, ['init'])
+                result = self.runner.invoke(main, [
+                    'update',
+                    '--set', 'project.name=demo',
+                    '--set', 'project.version=2',
+                    '--from-file', str(batch_file),
+                ])
+                assert result.exit_code == 0
+                assert 'Updating 4 keys' in result.output
+                
+                content = (temp_path / "AI" / "AI_CONTEXT.yaml").read_text()
+                assert 'name: demo' in content
+                assert 'version: 2' in content
+                assert 'overview: CLI tool' in content
+                assert '- python' in content
+                
+                result = self.runner.invoke(main, ['update'])
+                assert result.exit_code == 1
+                assert 'Nothing to update' in result.output
+                
+                result = self.runner.invoke(main, ['update', '--key', 'a'])
+                assert result.exit_code == 1
+                
+                result = self.runner.invoke(main, ['update', '--set', 'project.name.first=x'])
+                assert result.exit_code == 1
+                assert 'is not a mapping' in result.output
+            finally:
+                os.chdir(original_cwd)
+    
+    def test_timings_and_profile(self):
+        """Test --timings, --profile and AI_ASSIST_METRICS report the run."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "README.md").write_text("# Demo")
+            metrics = temp_path / "metrics.jsonl"
+            profile = temp_path / "out.prof"
+            
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                self.runner.invoke(main, ['init'])
+                result = self.runner.invoke(
+                    main,
+                    ['--timings', '--profile', str(profile), 'preamble', '--topic', 'api'],
+                    env={'AI_ASSIST_METRICS': str(metrics)},
+                )
+                assert result.exit_code == 0
+                assert 'Timings for preamble' in result.output
+                for name in ('validate', 'scan', 'extract', 'rank', 'render', 'write', 'files_scanned'):
+                    assert name in result.output
+                assert profile.stat().st_size > 0
+                
+                import json
+                record = json.loads(metrics.read_text().splitlines()[-1])
+                assert record['command'] == 'preamble'
+                assert record['counters']['files_scanned'] == 1
+                assert set(record['phases']) >= {'validate', 'scan', 'render'}
+                
+                result = self.runner.invoke(main, ['status'])
+                assert 'Timings' not in result.output
+            finally:
+                os.chdir(original_cwd)
@@ -0,0 +1,230 @@
+"""Tests for AI_CONTEXT.yaml loading and caching."""
+
+import datetime
+import json
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from ai_assist import context_manager
+from ai_assist.context_manager import (
+    ContextError,
+    ContextManager,
+    LazyContext,
+    clear_memory_cache,
+    default_context,
+    parse_assignment,
+    set_path,
+)
+
+
+def _update_key(project_root, index):
+    """Set one key from a worker process."""
+    ContextManager(project_root).update([(f"workers.w{index}", index)])
+
+
+class TestContextManager:
+    """Test cases for parsing and cache behaviour."""
+
+    def setup_method(self):
+        """Start every test with an empty in-process cache."""
+        clear_memory_cache()
+
+    def _manager(self, temp_dir):
+        (Path(temp_dir) / "AI").mkdir()
+        return ContextManager(temp_dir)
+
+    def test_write_and_load_roundtrip(self):
+        """Test a written context loads back with the same sections."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = self._manager(temp_dir)
+            manager.write(default_context("demo"))
+
+            clear_memory_cache()
+            context = manager.load()
+            assert list(context)[0] == "project"
+            assert context["project"]["name"] == "demo"
+            assert context.get_path("project.name") == "demo"
+            assert context.get_path("project.missing", "x") == "x"
+            assert "name: demo" in context.section_text("project")
+
+    def test_missing_file(self):
+        """Test loading a missing context raises ContextError."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with pytest.raises(ContextError):
+                self._manager(temp_dir).load()
+
+    def test_invalid_documents(self):
+        """Test that non-mapping and malformed YAML are rejected."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = self._manager(temp_dir)
+            manager.path.write_text("- a\n- b\n")
+            with pytest.raises(ContextError):
+                manager.load()
+
+            manager.path.write_text("key: [unclosed\n")
+            with pytest.raises(ContextError):
+                manager.load()
+
+    def test_empty_file_is_empty_context(self):
+        """Test an empty or comment-only file loads as no sections."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = self._manager(temp_dir)
+            manager.path.write_text("# nothing yet\n")
+            assert len(manager.load()) == 0
+
+    def test_disk_cache_hit_skips_parsing(self, monkeypatch):
+        """Test a fresh process-level load is served from the disk cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = self._manager(temp_dir)
+            manager.path.write_text("project:\n  name: cached\n")
+            manager.load()
+            assert manager.cache_path.exists()
+
+            clear_memory_cache()
+
+            def fail(text):
+                raise AssertionError("context was re-parsed")
+
+            monkeypatch.setattr(context_manager, "parse_yaml", fail)
+            assert manager.load()["project"]["name"] == "cached"
+
+    def test_disk_cache_is_plain_json(self):
+        """Test the disk cache is data-only and keeps values JSON cannot represent."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = self._manager(temp_dir)
+            manager.path.write_text("project:\n  name: demo\nrelease:\n  date: 2024-01-02\n  1: one\n")
+            manager.load()
+            data = json.loads(manager.cache_path.read_text())
+            assert data["sections"]["release"][0] is None
+
+            clear_memory_cache()
+            context = manager.load()
+            assert context["project"] == {"name": "demo"}
+            assert context["release"] == {"date": datetime.date(2024, 1, 2), 1: "one"}
+
+    def test_cache_invalidated_by_change(self):
+        """Test edits to the file are picked up."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = self._manager(temp_dir)
+            manager.path.write_text("a: 1\n")
+            assert manager.load()["a"] == 1
+
+            manager.path.write_text("a: 22\nb: 2\n")
+            assert manager.load()["a"] == 22
+
+
+class TestLazyContext:
+    """Test cases for lazily materialized sections."""
+
+    def test_sections_unpickled_on_access(self):
+        """Test only accessed sections are materialized."""
+        source = LazyContext.from_document({"a": [1, 2], "b": {"c": 3}})
+        context = LazyContext(source._sections)
+
+        assert context._values == {}
+        assert context["b"] == {"c": 3}
+        assert list(context._values) == ["b"]
+        assert context.to_dict() == {"a": [1, 2], "b": {"c": 3}}
+
+
+class TestUpdates:
+    """Test cases for batched, atomic updates."""
+
+    def setup_method(self):
+        """Start every test with an empty in-process cache."""
+        clear_memory_cache()
+
+    def test_parse_assignment(self):
+        """Test values are parsed as YAML."""
+        assert parse_assignment("a.b=3") == ("a.b", 3)
+        assert parse_assignment("tags=[x, y]") == ("tags", ["x", "y"])
+        assert parse_assignment("name=") == ("name", None)
+        with pytest.raises(ContextError):
+            parse_assignment("novalue")
+
+    def test_set_path(self):
+        """Test dotted keys create intermediate mappings."""
+        document = {"a": {"b": 1}, "s": "text"}
+        set_path(document, "a.c.d", 2)
+        assert document == {"a": {"b": 1, "c": {"d": 2}}, "s": "text"}
+        with pytest.raises(ContextError):
+            set_path(document, "s.x", 1)
+
+    def test_batched_update(self):
+        """Test several dotted assignments land in one write."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "AI").mkdir()
+            manager = ContextManager(temp_dir)
+            manager.write(default_context("demo"))
+            untouched = manager.load().section_text("conventions")
+
+            context = manager.update([
+                ("project.name", "renamed"),
+                ("project.owners", ["alice"]),
+                ("new_section.enabled", True),
+            ])
+            assert context["project"]["name"] == "renamed"
+            assert context["project"]["owners"] == ["alice"]
+            assert context["new_section"] == {"enabled": True}
+
+            clear_memory_cache()
+            reloaded = manager.load()
+            assert reloaded.get_path("project.name") == "renamed"
+            assert reloaded.section_text("conventions") == untouched
+
+    def test_update_keeps_untouched_sections_verbatim(self):
+        """Test comments, key order and quoting survive in sections an update never touched."""
+        source = (
+            "# Project context, maintained by hand\n"
+            "project:\n"
+            "  name: demo\n"
+            "\n"
+            "# Style notes\n"
+            "conventions:\n"
+            "  testing: 'pytest -q'  # run before pushing\n"
+            "  zebra: 1\n"
+            "  alpha: 2\n"
+            "topics: {api: \"REST\"}\n"
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "AI").mkdir()
+            manager = ContextManager(temp_dir)
+            manager.path.write_text(source)
+
+            manager.update([("project.name", "renamed")])
+            text = manager.path.read_text()
+            assert "  name: renamed\n" in text
+            assert text.endswith(source[source.index("\n# Style notes"):])
+
+            clear_memory_cache()
+            reloaded = manager.load()
+            assert reloaded["conventions"] == {"testing": "pytest -q", "zebra": 1, "alpha": 2}
+            assert reloaded["topics"] == {"api": "REST"}
+
+    def test_update_does_not_mutate_cached_values(self):
+        """Test failed or applied updates never alter previously loaded sections."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "AI").mkdir()
+            manager = ContextManager(temp_dir)
+            manager.write({"project": {"name": "demo"}})
+            before = manager.load()
+            assert before["project"]["name"] == "demo"
+
+            manager.update([("project.name", "changed")])
+            assert before["project"]["name"] == "demo"
+
+    def test_concurrent_updates_are_not_lost(self):
+        """Test updates from several processes all survive."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "AI").mkdir()
+            ContextManager(temp_dir).write({"workers": {}})
+
+            with ProcessPoolExecutor(max_workers=4) as pool:
+                list(pool.map(_update_key, [temp_dir] * 8, range(8)))
+
+            clear_memory_cache()
+            workers = ContextManager(temp_dir).load()["workers"]
+            assert workers == {f"w{i}": i for i in range(8)}
@@ -12,7 +12,12 @@ from ai_assist.core import (
     is_ai_directory_initialized,
     get_project_name,
     ProjectRootError,
-    AIDirectoryError
+    AIDirectoryError,
+    IgnoreMatcher,
+    clear_project_root_cache,
+    find_project_root,
+    walk_project,
+    atomic_writer,
 )
 
 
@@ -74,6 +79,75 @@ class TestProjectRootValidation:
             os.chdir(original_cwd)
 
 
+class TestFindProjectRoot:
+    """Test cases for upward, cached project root discovery."""
+
+    def setup_method(self):
+        """Start every test with an empty cache."""
+        clear_project_root_cache()
+
+    def teardown_method(self):
+        """Do not leak discovered roots into other tests."""
+        clear_project_root_cache()
+
+    def test_reports_matched_indicators(self):
+        """Test the indicators found in the root are returned."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "README.md").touch()
+            (temp_path / "src").mkdir()
+
+            root = find_project_root(temp_dir)
+            assert root.path == temp_path.resolve()
+            assert root.indicators == ("README.md", "src")
+
+    def test_walks_up_from_subdirectory(self):
+        """Test a git checkout above the start directory is found."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / ".git").mkdir()
+            nested = temp_path / "src" / "pkg"
+            nested.mkdir(parents=True)
+            # A nearer directory with weak indicators does not win over .git
+            (temp_path / "src" / "README.md").touch()
+
+            assert validate_project_root(nested) == temp_path.resolve()
+
+    def test_nearest_indicator_without_definite_root(self):
+        """Test the nearest directory with indicators is used otherwise."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "Makefile").touch()
+            nested = temp_path / "docs"
+            nested.mkdir()
+
+            assert validate_project_root(nested) == temp_path.resolve()
+
+    def test_results_are_cached_per_directory(self):
+        """Test discovery runs once per directory without touching the environment."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "setup.py").touch()
+            environ = dict(os.environ)
+
+            first = find_project_root(temp_dir)
+            (temp_path / "setup.py").unlink()
+            assert find_project_root(temp_dir) is first
+            assert dict(os.environ) == environ
+
+    def test_nested_project_after_parent(self):
+        """Test a sub-project is not folded into a parent found earlier."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir).resolve()
+            (temp_path / ".git").mkdir()
+            nested = temp_path / "packages" / "web"
+            (nested / ".git").mkdir(parents=True)
+
+            assert find_project_root(temp_path).path == temp_path
+            assert find_project_root(nested / ".git").path == nested
+            assert validate_project_root(nested) == nested
+
+
 class TestAIDirectory:
     """Test cases for AI directory operations."""
     
@@ -130,4 +204,104 @@ class TestAIDirectory:
             temp_path = Path(temp_dir)
             project_name = get_project_name(temp_path)
             
-            assert project_name == temp_path.name
\ No newline at end of file
+            assert project_name == temp_path.name
+
+    def test_atomic_writer_streams_and_replaces(self):
+        """Test atomic_writer replaces the file only when the block succeeds."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target = Path(temp_dir) / "out" / "preamble.md"
+            with atomic_writer(target) as handle:
+                handle.write("first\n")
+                assert not target.exists()
+            assert target.read_text() == "first\n"
+
+            with pytest.raises(RuntimeError):
+                with atomic_writer(target) as handle:
+                    handle.write("partial")
+                    raise RuntimeError("render failed")
+            assert target.read_text() == "first\n"
+            assert os.listdir(target.parent) == ["preamble.md"]
+
+
+def _walk(root):
+    return sorted(rel_path for rel_path, _ in walk_project(root))
+
+
+class TestIgnoreMatcher:
+    """Test cases for gitignore pattern semantics."""
+
+    def test_basename_and_anchored_patterns(self):
+        """Test unanchored patterns match at any depth, anchored only at the base."""
+        matcher = IgnoreMatcher(["*.log", "/top.txt", "docs/*.tmp"])
+        assert matcher.match("a.log", False)
+        assert matcher.match("x/y/a.log", False)
+        assert matcher.match("top.txt", False)
+        assert matcher.match("x/top.txt", False) is None
+        assert matcher.match("docs/a.tmp", False)
+        assert matcher.match("x/docs/a.tmp", False) is None
+
+    def test_directory_only_and_negation(self):
+        """Test trailing-slash rules and last-match-wins negation."""
+        matcher = IgnoreMatcher(["out/", "*.txt", "!keep.txt", "# comment", ""])
+        assert matcher.match("out", True)
+        assert matcher.match("out", False) is None
+        assert matcher.match("a.txt", False)
+        assert matcher.match("keep.txt", False) is False
+
+    def test_double_star(self):
+        """Test ** spans directories."""
+        matcher = IgnoreMatcher(["**/gen/**", "a/**/b"])
+        assert matcher.match("x/gen/y/z.py", False)
+        assert matcher.match("a/b", False)
+        assert matcher.match("a/x/y/b", False)
+
+    def test_base_directory(self):
+        """Test nested ignore files only apply below their directory."""
+        matcher = IgnoreMatcher(["/local.py"], base="pkg")
+        assert matcher.match("pkg/local.py", False)
+        assert matcher.match("local.py", False) is None
+
+
+class TestWalkProject:
+    """Test cases for the ignore-aware project walker."""
+
+    def test_default_pruning(self):
+        """Test VCS, AI, virtualenv and dependency directories are pruned."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            for name in [".git/HEAD", "AI/AI_CONTEXT.yaml", "node_modules/x/index.js",
+                         ".venv/lib/site.py", "pkg/__pycache__/m.pyc", "main.py", "lib/ai/keep.py"]:
+                (temp_path / name).parent.mkdir(parents=True, exist_ok=True)
+                (temp_path / name).write_text("x")
+
+            assert _walk(temp_path) == ["lib/ai/keep.py", "main.py"]
+
+    def test_gitignore_exclude_and_aiignore(self):
+        """Test .gitignore (nested), .git/info/exclude and AI/.aiignore are honored."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            for name in ["a.py", "b.log", "secret.env", "notes.md", "vendor/lib.py",
+                         "pkg/gen.py", "pkg/keep.log", "pkg/sub/gen.py"]:
+                (temp_path / name).parent.mkdir(parents=True, exist_ok=True)
+                (temp_path / name).write_text("x")
+            (temp_path / ".gitignore").write_text("*.log\nvendor/\n")
+            (temp_path / "pkg" / ".gitignore").write_text("/gen.py\n!keep.log\n")
+            (temp_path / ".git" / "info").mkdir(parents=True)
+            (temp_path / ".git" / "info" / "exclude").write_text("secret.env\n")
+            (temp_path / "AI").mkdir()
+            (temp_path / "AI" / ".aiignore").write_text("notes.md\n")
+
+            assert _walk(temp_path) == [
+                ".gitignore", "a.py", "pkg/.gitignore", "pkg/keep.log", "pkg/sub/gen.py",
+            ]
+
+    def test_gitignore_can_reinclude_defaults(self):
+        """Test project rules take precedence over built-in defaults."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "build").mkdir()
+            (temp_path / "build" / "rules.py").write_text("x")
+            (temp_path / ".gitignore").write_text("!/build/\n")
+
+            assert _walk(temp_path) == [".gitignore", "build/rules.py"]
+
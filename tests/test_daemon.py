@@ -0,0 +1,156 @@
+"""Tests for the serve daemon and its client."""
+
+import io
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from ai_assist import client, daemon as daemon_module, pipeline
+from ai_assist.cli import main
+from ai_assist.daemon import Daemon, DaemonError, get_socket_path
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """An initialized project; the cwd stays outside it."""
+    (tmp_path / "README.md").write_text("# Demo project\n")
+    (tmp_path / "app.py").write_text('def handler():\n    """Handle requests."""\n')
+    monkeypatch.chdir(tmp_path)
+    assert main(["init"], standalone_mode=False) is None
+    monkeypatch.chdir(os.path.dirname(tmp_path))
+    monkeypatch.delenv(client.NO_DAEMON_ENV, raising=False)
+    return tmp_path
+
+
+@pytest.fixture
+def daemon(project):
+    server = Daemon(project, polling=True, poll_interval=0.1, log=lambda message: None)
+    server.bind()
+    server.start_watcher()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.stop()
+    thread.join(timeout=5)
+
+
+def _forward(argv, start):
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+    code = client.forward(argv, start=str(start), stdout=stdout, stderr=stderr)
+    return code, stdout.getvalue().decode(), stderr.getvalue().decode()
+
+
+class TestClient:
+    """Test cases for the client helpers."""
+
+    def test_forwardable_command(self, monkeypatch):
+        monkeypatch.delenv(client.NO_DAEMON_ENV, raising=False)
+        assert client.forwardable_command(["preamble", "--topic", "api"]) == "preamble"
+        assert client.forwardable_command(["-j", "2", "--timings", "status"]) == "status"
+        assert client.forwardable_command(["--profile", "status", "init"]) is None
+        assert client.forwardable_command(["update", "--set", "a=1"]) is None
+        assert client.forwardable_command(["--version"]) is None
+        monkeypatch.setenv(client.NO_DAEMON_ENV, "1")
+        assert client.forwardable_command(["status"]) is None
+
+    def test_request_round_trip(self):
+        payload = client.encode_request(["logs", "search", "a b"], "/tmp/x", {"K": "v=1"})
+        assert client.decode_request(payload) == (["logs", "search", "a b"], "/tmp/x", {"K": "v=1"})
+
+    def test_socket_path_falls_back_for_long_roots(self, tmp_path):
+        short = client.socket_path(tmp_path)
+        assert short.endswith(os.path.join("AI", ".cache", "daemon.sock"))
+        deep = tmp_path / ("d" * 120)
+        assert len(client.socket_path(deep)) <= client.MAX_SOCKET_PATH + 40
+        assert client.socket_path(deep) == client.socket_path(deep)
+        assert str(get_socket_path(tmp_path)) == short
+
+    def test_forward_without_daemon(self, project):
+        assert client.forward(["status"], start=str(project)) is None
+
+    def test_only_private_sockets_are_used(self, project):
+        path = get_socket_path(project)
+        path.write_text("not a socket")
+        assert client.find_socket(str(project)) is None
+        path.unlink()
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(str(path))
+            os.chmod(path, 0o666)
+            assert client.find_socket(str(project)) is None
+            os.chmod(path, 0o600)
+            assert client.find_socket(str(project)) == str(path)
+        finally:
+            listener.close()
+            path.unlink()
+
+
+class TestDaemon:
+    """Test cases for serving commands."""
+
+    def test_forwards_commands(self, daemon, project):
+        code, out, err = _forward(["status"], project)
+        assert code == 0
+        assert "AI Project Assistant Status" in out
+
+        code, out, err = _forward(["preamble", "--topic", "api"], project / "AI")
+        assert code == 0
+        assert "# Project Preamble: api" in out
+        assert "Generating preamble" in err
+
+        code, out, err = _forward(["preamble"], project)
+        assert code == 2
+        assert "Missing option" in err
+        assert daemon.requests == 3
+
+    def test_forwarded_runs_extract_inline(self, daemon, project, monkeypatch):
+        def no_pools(*args, **kwargs):
+            raise AssertionError("worker pool created inside the daemon")
+
+        monkeypatch.setattr(pipeline, "ProcessPoolExecutor", no_pools)
+        code, out, err = _forward(["--jobs", "4", "preamble", "--topic", "api", "--no-memo"], project)
+        assert code == 0, err
+        assert "# Project Preamble: api" in out
+
+    def test_silent_client_does_not_block_others(self, daemon, project, monkeypatch):
+        monkeypatch.setattr(daemon_module, "REQUEST_TIMEOUT", 0.2)
+        silent = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        with silent:
+            silent.connect(str(daemon.socket_path))
+            code, out, err = _forward(["status"], project)
+        assert code == 0
+        assert "AI Project Assistant Status" in out
+
+    def test_refreshes_after_changes(self, daemon, project):
+        (project / "new_module.py").write_text("def fresh():\n    pass\n")
+        deadline = time.monotonic() + 5
+        while daemon.refreshes == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert daemon.refreshes >= 1
+
+        code, out, err = _forward(["preamble", "--topic", "api"], project)
+        assert code == 0
+        assert "(0 added, 0 modified, 0 removed)" in err
+
+    def test_stop_and_stale_socket(self, daemon, project):
+        with pytest.raises(DaemonError):
+            Daemon(project).bind()
+        assert client.stop_daemon(project)
+        deadline = time.monotonic() + 5
+        while daemon.socket_path.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not daemon.socket_path.exists()
+        assert client.forward(["status"], start=str(project)) is None
+
+        # A socket file without a listener is replaced
+        stale = Daemon(project)
+        stale.bind()
+        stale._listener.close()
+        stale._listener = None
+        replacement = Daemon(project)
+        replacement.bind()
+        replacement.close()
@@ -0,0 +1,117 @@
+"""Tests for git-based change detection."""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from ai_assist.core import ensure_ai_directory
+from ai_assist.gitstate import detect_changes, head_commit, load_state, record_state
+from ai_assist.scanner import FileIndex, get_index_path, scan_project
+
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def _git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def _make_repo(path):
+    _git(path, "init", "-q")
+    (path / "a.py").write_text("a = 1\n")
+    (path / "b.py").write_text("b = 1\n")
+    _git(path, "add", "a.py", "b.py")
+    _git(path, "commit", "-q", "-m", "initial")
+
+
+class TestGitState:
+    """Test cases for recording and comparing against git commits."""
+
+    def test_no_state_outside_git(self):
+        """Test nothing is recorded or detected without a repository."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            assert head_commit(temp_dir) is None
+            assert record_state(temp_dir) is None
+            assert detect_changes(temp_dir) is None
+
+    def test_detects_committed_and_uncommitted_changes(self):
+        """Test files changed since the recorded commit are reported."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            _make_repo(temp_path)
+            commit = record_state(temp_path)
+            assert load_state(temp_path)["commit"] == commit
+
+            (temp_path / "a.py").write_text("a = 2\n")
+            _git(temp_path, "commit", "-q", "-am", "change a")
+            (temp_path / "b.py").write_text("b = 2\n")
+
+            changes = detect_changes(temp_path)
+            assert changes.since == commit
+            assert changes.changed == {"a.py", "b.py"}
+            assert changes.tracked == {"a.py", "b.py"}
+
+    def test_state_is_not_tracked_by_git(self):
+        """Test that recording the state leaves the user's work tree clean."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            _make_repo(temp_path)
+            ensure_ai_directory(temp_path)
+            (temp_path / "AI" / "git_state.json").write_text("{}")
+            _git(temp_path, "add", "AI")
+            _git(temp_path, "commit", "-q", "-m", "add AI")
+
+            record_state(temp_path)
+            assert (temp_path / "AI" / ".cache" / "git_state.json").exists()
+            status = subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=all", "AI"],
+                cwd=temp_path, check=True, capture_output=True, text=True,
+            )
+            assert status.stdout == " D AI/git_state.json\n"
+
+    def test_dirty_paths_stay_changed(self):
+        """Test files dirty at record time are rechecked even if reverted."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            _make_repo(temp_path)
+            (temp_path / "a.py").write_text("a = 2\n")
+            record_state(temp_path)
+            _git(temp_path, "checkout", "-q", "--", "a.py")
+
+            assert detect_changes(temp_path).changed == {"a.py"}
+
+    def test_rewritten_history_falls_back(self):
+        """Test a recorded commit that is no longer an ancestor forces a full scan."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            _make_repo(temp_path)
+            record_state(temp_path)
+            _git(temp_path, "commit", "-q", "--amend", "-m", "rewritten")
+
+            assert detect_changes(temp_path) is None
+
+    def test_scan_skips_hashing_unchanged_tracked_files(self):
+        """Test new mtimes on git-unchanged files do not trigger re-hashing."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            _make_repo(temp_path)
+            index = FileIndex.load(get_index_path(temp_path))
+            scan_project(temp_path, index)
+            record_state(temp_path)
+
+            for name in ("a.py", "b.py"):
+                os.utime(temp_path / name, ns=(1, 1))
+            (temp_path / "b.py").write_text("b = 3\n")
+
+            changes = detect_changes(temp_path)
+            result = scan_project(temp_path, index, unchanged=changes.is_unchanged)
+            assert result.modified == ["b.py"]
+            assert result.bytes_hashed == len("b = 3\n")
+            assert index.get("a.py").mtime_ns == 1
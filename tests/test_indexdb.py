@@ -0,0 +1,59 @@
+"""Tests for the SQLite file index storage."""
+
+import tempfile
+from pathlib import Path
+
+from ai_assist.indexdb import IndexStore, prefix_bounds, read_info
+
+
+def _row(path, meta=None):
+    return (path, 1, 2, "digest", meta)
+
+
+class TestIndexStore:
+    """Test cases for lookups, range scans and batched writes."""
+
+    def test_point_lookup_and_prefix_scan(self):
+        """Test that lookups and directory scans return the stored rows."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = IndexStore(Path(temp_dir) / "index.sqlite")
+            store.write([_row("src/a.py", {"lines": 3}), _row("src/b/c.py"), _row("src2/d.py"), _row("README.md")], [])
+
+            assert store.get("src/a.py") == ("src/a.py", 1, 2, "digest", {"lines": 3})
+            assert store.get("missing.py") is None
+            assert [row[0] for row in store.scan("src")] == ["src/a.py", "src/b/c.py"]
+            assert [row[0] for row in store.scan("src/b/")] == ["src/b/c.py"]
+            assert len(list(store.scan())) == 4
+            assert prefix_bounds("/src/") == ("src/", "src0")
+
+    def test_write_is_batched_and_bumps_generation(self):
+        """Test that upserts and deletes apply together and update the info table."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "index.sqlite"
+            store = IndexStore(path)
+            assert store.generation() is None
+            assert read_info(path) is None
+
+            assert store.write([_row("a.py"), _row("b.py")], []) == 1
+            assert store.write([_row("c.py")], ["a.py"]) == 2
+            store.close()
+
+            info = read_info(path)
+            assert info.files == 2
+            assert info.generation == 2
+            assert info.size_bytes > 0
+            assert info.age < 60
+            generation, rows = IndexStore(path).snapshot()
+            assert generation == 2
+            assert sorted(row[0] for row in rows) == ["b.py", "c.py"]
+
+    def test_corrupt_database_is_replaced(self):
+        """Test that an unreadable file reads as empty and is rebuilt on write."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "index.sqlite"
+            path.write_text("not a database")
+            store = IndexStore(path)
+
+            assert store.get("a.py") is None
+            assert store.write([_row("a.py")], []) == 1
+            assert store.get("a.py") is not None
@@ -0,0 +1,186 @@
+"""Tests for asyncio log ingestion."""
+
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from ai_assist.cli import main
+from ai_assist.ingest import IngestError, Ingestor, ingest_stream, parse_record, serve_socket
+from ai_assist.logstore import LogStore
+
+
+def _lines(count: int) -> bytes:
+    return b"".join(
+        json.dumps({"model": "bot", "prompt": f"question {i}"}).encode() + b"\n" for i in range(count)
+    )
+
+
+class _CountingStore(LogStore):
+    """LogStore that records batch sizes and can be paused."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def append_many(self, records, fsync=False):
+        self.gate.wait()
+        self.batches.append(len(records))
+        return super().append_many(records, fsync=fsync)
+
+
+class TestIngest:
+    """Test cases for parsing, group commit, backpressure and the socket server."""
+
+    def test_parse_record(self):
+        """Test validation of input lines."""
+        assert parse_record(b'{"model": "m", "prompt": "p"}')["model"] == "m"
+        for line in (b"[1]", b'{"model": "m"}', b"nope", b'{"model": "m", "prompt": "p", "$blobs": {}}'):
+            with pytest.raises(ValueError):
+                parse_record(line)
+
+    def test_stream_is_group_committed(self):
+        """Test that records from a stream are appended in a few large batches."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = _CountingStore(Path(temp_dir) / "logs")
+            source = Path(temp_dir) / "input.ndjson"
+            source.write_bytes(_lines(500) + b"not json\n")
+            rejected = []
+
+            async def run():
+                ingestor = Ingestor(store, max_batch=100)
+                await ingestor.start()
+                with open(source, "rb") as handle:
+                    await ingest_stream(ingestor, handle, on_reject=lambda n, reason: rejected.append(n))
+                await ingestor.close()
+                return ingestor.stats
+
+            stats = asyncio.run(run())
+            assert stats.records == 500
+            assert stats.rejected == 1
+            assert rejected == [501]
+            assert max(store.batches) <= 100
+            assert len(store.batches) == stats.batches < 50
+            assert [record["prompt"] for _, record in store.iter_records()][-1] == "question 499"
+
+    def test_backpressure_when_writer_is_slow(self):
+        """Test that submitting blocks once the queue is full while the disk is stalled."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = _CountingStore(Path(temp_dir) / "logs")
+            store.gate.clear()
+
+            async def run():
+                ingestor = Ingestor(store, max_batch=2, queue_size=4, max_delay=0)
+                await ingestor.start()
+                futures = []
+                blocked = False
+                for i in range(20):
+                    try:
+                        futures.append(await asyncio.wait_for(ingestor.submit({"model": "m", "prompt": str(i)}), 0.2))
+                    except asyncio.TimeoutError:
+                        blocked = True
+                        break
+                store.gate.set()
+                ids = await asyncio.gather(*futures)
+                await ingestor.close()
+                return blocked, len(futures), ids
+
+            blocked, submitted, ids = asyncio.run(run())
+            assert blocked
+            assert submitted < 20
+            assert len(ids) == submitted
+
+    def test_socket_acknowledges_each_record(self):
+        """Test that socket clients get one response line per record, in order."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LogStore(Path(temp_dir) / "logs")
+            path = os.path.join(temp_dir, "ingest.sock")
+
+            async def run():
+                ingestor = Ingestor(store)
+                await ingestor.start()
+                stop = asyncio.Event()
+                ready = asyncio.Event()
+                server = asyncio.get_running_loop().create_task(serve_socket(ingestor, path, stop, ready.set))
+                await ready.wait()
+
+                reader, writer = await asyncio.open_unix_connection(path)
+                writer.write(_lines(3) + b"{}\n")
+                writer.write_eof()
+                responses = [json.loads(line) async for line in reader]
+                writer.close()
+
+                stop.set()
+                await server
+                await ingestor.close()
+                return responses
+
+            responses = asyncio.run(run())
+            assert [response.get("id") for response in responses[:3]] == ["1:0", "1:1", "1:2"]
+            assert "error" in responses[3]
+            assert not os.path.exists(path)
+
+    def test_socket_path_is_only_replaced_when_stale(self):
+        """Test that a regular file or a live server at the socket path is left alone."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LogStore(Path(temp_dir) / "logs")
+            path = os.path.join(temp_dir, "ingest.sock")
+
+            async def start(ready=None):
+                ingestor = Ingestor(store)
+                await ingestor.start()
+                try:
+                    await serve_socket(ingestor, path, asyncio.Event(), ready)
+                finally:
+                    await ingestor.close()
+
+            Path(path).write_text("keep me")
+            with pytest.raises(IngestError):
+                asyncio.run(start())
+            assert Path(path).read_text() == "keep me"
+            os.unlink(path)
+
+            stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            stale.bind(path)
+            stale.close()  # Nobody listens: connecting is refused
+
+            async def live_then_second():
+                stop = asyncio.Event()
+                ready = asyncio.Event()
+                ingestor = Ingestor(store)
+                await ingestor.start()
+                server = asyncio.get_running_loop().create_task(serve_socket(ingestor, path, stop, ready.set))
+                await ready.wait()
+                try:
+                    await start()
+                finally:
+                    stop.set()
+                    await server
+                    await ingestor.close()
+
+            with pytest.raises(IngestError):
+                asyncio.run(live_then_second())
+
+    def test_log_ingest_command(self):
+        """Test the CLI reads stdin and prints acknowledgements."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "README.md").write_text("# Demo")
+            runner = CliRunner()
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                runner.invoke(main, ['init'])
+                result = runner.invoke(main, ['log-ingest', '--acks'], input=_lines(5).decode())
+                assert result.exit_code == 0, result.output
+                assert [json.loads(line)["id"] for line in result.stdout.splitlines()] == [f"1:{i}" for i in range(5)]
+                assert "Logged 5 records" in result.stderr
+            finally:
+                os.chdir(original_cwd)
@@ -0,0 +1,77 @@
+"""Tests for phase timing and counters."""
+
+import json
+
+from ai_assist import instrument
+
+
+class TestRecorder:
+    """Test cases for Recorder."""
+
+    def test_phases_accumulate_in_order(self):
+        recorder = instrument.Recorder()
+        with recorder.phase("scan"):
+            pass
+        with recorder.phase("render"):
+            pass
+        with recorder.phase("scan"):
+            pass
+        assert list(recorder.phases) == ["scan", "render"]
+        assert all(seconds >= 0 for seconds in recorder.phases.values())
+
+    def test_phase_recorded_on_exception(self):
+        recorder = instrument.Recorder()
+        try:
+            with recorder.phase("scan"):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+        assert "scan" in recorder.phases
+
+    def test_counters_and_report(self):
+        recorder = instrument.Recorder()
+        recorder.count("files_scanned", 3)
+        recorder.count("files_scanned")
+        with recorder.phase("scan"):
+            pass
+        assert recorder.counters == {"files_scanned": 4}
+        report = recorder.report("preamble")
+        assert "Timings for preamble" in report
+        assert "scan" in report and "total" in report
+        assert "files_scanned" in report
+
+    def test_to_record(self):
+        recorder = instrument.Recorder()
+        recorder.count("bytes_read", 10)
+        record = recorder.to_record("status", exit_code=0)
+        assert record["command"] == "status"
+        assert record["counters"] == {"bytes_read": 10}
+        assert record["exit_code"] == 0
+        json.dumps(record)
+
+
+class TestModuleHelpers:
+    """Test cases for the module-level recorder."""
+
+    def test_reset_and_count(self):
+        instrument.reset()
+        instrument.count("hits", 2)
+        with instrument.phase("load"):
+            pass
+        assert instrument.current().counters == {"hits": 2}
+        assert "load" in instrument.current().phases
+        assert instrument.reset().counters == {}
+
+    def test_emit_metrics(self, tmp_path, monkeypatch):
+        monkeypatch.delenv(instrument.METRICS_ENV, raising=False)
+        instrument.reset()
+        assert instrument.emit_metrics("status") is False
+
+        destination = tmp_path / "metrics.jsonl"
+        monkeypatch.setenv(instrument.METRICS_ENV, str(destination))
+        instrument.count("files_scanned", 5)
+        assert instrument.emit_metrics("status") is True
+        assert instrument.emit_metrics("status") is True
+        lines = destination.read_text().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0])["counters"] == {"files_scanned": 5}
@@ -0,0 +1,94 @@
+"""Tests for query log search."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from ai_assist.core import AIAssistError
+from ai_assist.logindex import (
+    BloomFilter,
+    LogQuery,
+    SegmentSummary,
+    parse_timestamp,
+    search_logs,
+    summary_path,
+    tokenize,
+)
+from ai_assist.logstore import LogStore
+
+
+def _populate(store):
+    records = [
+        {"model": "gpt-4", "topic": "api", "prompt": "Design the REST api", "timestamp": "2024-01-01T00:00:00Z"},
+        {"model": "claude-3", "topic": "db", "prompt": "Optimize database indexes", "timestamp": "2024-02-01T00:00:00Z"},
+        {"model": "gpt-4", "topic": "db", "prompt": "Write database migration", "timestamp": "2024-03-01T00:00:00Z"},
+        {"model": "claude-3", "topic": "api", "prompt": "Document the api errors", "timestamp": "2024-04-01T00:00:00Z"},
+    ]
+    return store.append_many(records)
+
+
+class TestHelpers:
+    """Test cases for tokenizing, timestamps and bloom filters."""
+
+    def test_tokenize(self):
+        """Test terms are lowercased and short tokens dropped."""
+        assert tokenize("Fix the API, a b cd") == {"fix", "the", "api", "cd"}
+
+    def test_parse_timestamp(self):
+        """Test dates and datetimes parse as UTC."""
+        assert parse_timestamp("1970-01-02") == 86400
+        assert parse_timestamp("1970-01-01T00:01:00Z") == 60
+        with pytest.raises(AIAssistError):
+            parse_timestamp("yesterday")
+
+    def test_bloom_filter_roundtrip(self):
+        """Test membership survives serialization."""
+        bloom = BloomFilter()
+        bloom.add("gpt-4")
+        restored = BloomFilter.from_text(bloom.to_text())
+        assert "gpt-4" in restored
+        assert "claude-3" not in restored
+
+
+class TestSearch:
+    """Test cases for segment skipping and matching."""
+
+    def test_search_filters(self):
+        """Test each filter against the active segment."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LogStore(Path(temp_dir) / "logs")
+            ids = _populate(store)
+
+            assert [rid for rid, _ in search_logs(store, LogQuery(model="gpt-4"))] == [ids[0], ids[2]]
+            assert [rid for rid, _ in search_logs(store, LogQuery(topic="api"))] == [ids[0], ids[3]]
+            assert [rid for rid, _ in search_logs(store, LogQuery(text="database"))] == [ids[1], ids[2]]
+            since = parse_timestamp("2024-02-15")
+            assert [rid for rid, _ in search_logs(store, LogQuery(since=since))] == [ids[2], ids[3]]
+
+    def test_sealed_segments_write_summaries(self):
+        """Test sealed segments are summarized and skipped when they cannot match."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LogStore(Path(temp_dir) / "logs", max_segment_bytes=150, compression="gzip")
+            ids = _populate(store)
+
+            sealed = [s for s in store.segments() if s.sealed]
+            assert sealed
+            summary = SegmentSummary.load(summary_path(sealed[0].path))
+            assert summary is not None
+            assert "gpt-4" in summary.models
+
+            query = LogQuery(model="claude-3", text="api errors")
+            assert [rid for rid, _ in search_logs(store, query)] == [ids[3]]
+            assert not query.may_match(summary)
+
+    def test_missing_summary_is_rebuilt(self):
+        """Test search rebuilds a deleted summary for a sealed segment."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LogStore(Path(temp_dir) / "logs", max_segment_bytes=150, compression="none")
+            ids = _populate(store)
+            first = store.segments()[0]
+            summary_path(first.path).unlink()
+
+            assert [rid for rid, _ in search_logs(store, LogQuery(text="rest"))] == [ids[0]]
+            assert summary_path(first.path).exists()
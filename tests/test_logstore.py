@@ -0,0 +1,139 @@
+"""Tests for the append-only query log store."""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from ai_assist.blobstore import BlobStore
+from ai_assist.logindex import LogQuery, search_logs
+from ai_assist.logstore import MISSING_FIELD, LogStore, LogStoreError, resolve_compression, zstandard
+
+
+class TestLogStore:
+    """Test cases for appends, rotation and lookups."""
+
+    def test_append_and_get(self):
+        """Test that appended records can be fetched by id."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LogStore(Path(temp_dir) / "logs")
+            first = store.append({"model": "gpt-4", "prompt": "one"})
+            second = store.append({"model": "claude-3", "prompt": "two"})
+
+            assert first == "1:0"
+            assert second == "1:1"
+            assert store.get(second)["prompt"] == "two"
+            assert "timestamp" in store.get(first)
+            assert store.get("1:5") is None
+            assert store.get("bogus") is None
+
+    def test_rotation_seals_and_compresses(self):
+        """Test that full segments are sealed and compressed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LogStore(Path(temp_dir) / "logs", max_segment_bytes=200, compression="gzip")
+            ids = [store.append({"model": "m", "prompt": "p" * 60}) for _ in range(6)]
+
+            segments = store.segments()
+            assert len(segments) > 1
+            assert segments[0].sealed
+            assert segments[0].path.name.endswith(".jsonl.gz")
+            assert not segments[-1].sealed
+            assert sum(segment.record_count for segment in segments) == 6
+
+            # Records in sealed segments remain addressable
+            assert store.get(ids[0])["prompt"] == "p" * 60
+            assert [record_id for record_id, _ in store.iter_records()] == ids
+
+    def test_uncompressed_rotation(self):
+        """Test rotation without compression keeps plain JSONL segments."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LogStore(Path(temp_dir) / "logs", max_segment_bytes=100, compression="none")
+            ids = store.append_many([{"prompt": "x" * 60} for _ in range(3)])
+
+            assert ids == ["1:0", "2:0", "3:0"]
+            assert all(s.path.name.endswith(".jsonl") for s in store.segments())
+            assert store.get("2:0")["prompt"] == "x" * 60
+
+    def test_resolve_compression(self):
+        """Test codec resolution."""
+        assert resolve_compression("gzip") == "gzip"
+        assert resolve_compression("auto") in ("zstd", "gzip")
+        if zstandard is None:
+            with pytest.raises(LogStoreError):
+                resolve_compression("zstd")
+
+    def test_large_bodies_go_to_blob_store(self):
+        """Test that long prompts are stored as blobs and resolved on read."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LogStore(Path(temp_dir) / "logs", max_segment_bytes=400, compression="gzip")
+            preamble = "".join(f"context line {i} for the assistant\n" for i in range(500))
+            records = [{"model": "m", "prompt": preamble + f"question {i} about zebras", "response": "ok"}
+                       for i in range(4)]
+            ids = store.append_many(records)
+
+            assert (Path(temp_dir) / "logs" / "segment-00000001.jsonl.gz").exists()
+            assert "prompt" in records[0]
+            assert (Path(temp_dir) / "blobs" / "manifests").is_dir()
+            assert sum(segment.path.stat().st_size for segment in store.segments()) < len(preamble)
+
+            assert store.get(ids[3])["prompt"].endswith("question 3 about zebras")
+            assert store.get(ids[0])["response"] == "ok"
+            assert "$blobs" not in store.get(ids[0])
+
+            matches = list(search_logs(store, LogQuery(text="zebras")))
+            assert [record_id for record_id, _ in matches] == ids
+
+    def test_batch_flushes_blobs_once_after_writing(self, monkeypatch):
+        """Test that large records in a batch are flushed together, not one by one."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            store = LogStore(root / "logs")
+            events = []
+            real_write, real_fsync = BlobStore._write, os.fsync
+            monkeypatch.setattr(BlobStore, "_write", lambda *args: events.append("write") or real_write(*args))
+            monkeypatch.setattr(os, "fsync", lambda fd: events.append("fsync") or real_fsync(fd))
+
+            records = [{"model": "m", "prompt": f"body {i}\n" * 2000} for i in range(3)]
+            store.append_many(records, fsync=True)
+
+            assert "write" not in events[events.index("fsync"):]
+            entries = list((root / "blobs").rglob("*"))
+            files = [path for path in entries if path.is_file()]
+            directories = [path for path in entries if path.is_dir()] + [root / "blobs", root]
+            # Every new file and directory once, then the segment and its offset index
+            assert events.count("fsync") == len(files) + len(directories) + 2
+
+    def test_blob_threshold_disabled(self):
+        """Test that records are stored inline when blobs are disabled."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LogStore(Path(temp_dir) / "logs", blob_threshold=None)
+            record_id = store.append({"prompt": "p" * 10000})
+
+            assert store.get(record_id)["prompt"] == "p" * 10000
+            assert not (Path(temp_dir) / "blobs").exists()
+
+    def test_reserved_keys_in_records_are_escaped(self):
+        """Test that records with their own blob-like keys round-trip and never break rotation."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LogStore(Path(temp_dir) / "logs", max_segment_bytes=200)
+            hostile = {"model": "m", "prompt": "hello", "blobs": {"prompt": "00ff"}, "$blobs": {"prompt": "00ff"}}
+            ids = store.append_many([dict(hostile) for _ in range(5)])
+
+            assert len(store.segments()) > 1
+            assert store.get(ids[0]) == {**hostile, "timestamp": store.get(ids[0])["timestamp"]}
+            assert len(list(search_logs(store, LogQuery(text="hello")))) == 5
+
+    def test_missing_blob_is_reported_not_raised(self):
+        """Test that a record whose blob was deleted is still readable and searchable."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LogStore(Path(temp_dir) / "logs", max_segment_bytes=200)
+            record_id = store.append({"model": "m", "prompt": "q" * 5000, "response": "fine"})
+            for path in (Path(temp_dir) / "blobs" / "manifests").rglob("*"):
+                if path.is_file():
+                    path.unlink()
+
+            store.append_many([{"model": "m", "prompt": "later"} for _ in range(3)])  # Seals the segment
+            record = store.get(record_id)
+            assert record[MISSING_FIELD] == ["prompt"] and "prompt" not in record
+            assert [rid for rid, _ in search_logs(store, LogQuery(text="fine"))] == [record_id]
@@ -0,0 +1,191 @@
+"""Tests for memoized rendered preambles."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from ai_assist.cli import main
+from ai_assist.memo import Dependencies, collect_dependencies, fingerprint, get_memo_directory_path
+from ai_assist.scanner import scan_project
+
+
+def _bump(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestDependencies:
+    """Test cases for dependency collection and fingerprints."""
+
+    def test_collect_dependencies_covers_walked_directories_and_ignore_files(self):
+        """Test that every walked directory (even empty ones) and every ignore file is recorded."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "src" / "pkg").mkdir(parents=True)
+            (root / "src" / "pkg" / "a.py").write_text("x = 1\n")
+            (root / "empty").mkdir()
+            (root / "node_modules").mkdir()
+
+            scan = scan_project(root)
+            deps = collect_dependencies(scan.dirs, ["src/pkg/a.py"], None)
+            assert deps.dirs == ["", "empty", "src", "src/pkg"]
+            assert "src/pkg/a.py" in deps.files
+            assert ".gitignore" in deps.files and "empty/.gitignore" in deps.files
+            assert ".git/info/exclude" in deps.files
+            assert deps.context == []
+
+    def test_fingerprint_tracks_files_directories_and_templates(self):
+        """Test that edits, new files and template overrides change the hash."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "src").mkdir()
+            (root / "src" / "a.py").write_text("x = 1\n")
+            deps = Dependencies(files=["src/a.py"], dirs=["", "src"])
+
+            first = fingerprint(root, deps)
+            assert fingerprint(root, deps) == first
+
+            _bump(root / "src" / "a.py")
+            second = fingerprint(root, deps)
+            assert second != first
+
+            (root / "src" / "b.py").write_text("y = 2\n")
+            third = fingerprint(root, deps)
+            assert third != second
+
+            (root / "AI" / "templates").mkdir(parents=True)
+            (root / "AI" / "templates" / "preamble.md.j2").write_text("{{ topic }}")
+            assert fingerprint(root, deps) != third
+
+    def test_known_fingerprints_replace_stat(self):
+        """Test that a file changed after it was scanned invalidates the memo."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "a.py").write_text("x = 1\n")
+            deps = Dependencies(files=["a.py"])
+            st = os.stat(root / "a.py")
+            assert fingerprint(root, deps, known={"a.py": (st.st_mtime_ns, st.st_size)}) == fingerprint(root, deps)
+            assert fingerprint(root, deps, known={"a.py": (st.st_mtime_ns - 1, st.st_size)}) != fingerprint(root, deps)
+
+
+class TestPreambleMemo:
+    """Test cases for the preamble command's memoization."""
+
+    def test_repeat_request_is_served_until_a_dependency_changes(self):
+        """Test hits, per-topic keys and invalidation by file and context edits."""
+        runner = CliRunner()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "README.md").write_text("# Demo\n")
+            (root / "api.py").write_text("def get():\n    return 1\n")
+            (root / ".git" / "info").mkdir(parents=True)
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                runner.invoke(main, ["init"])
+
+                first = runner.invoke(main, ["preamble", "--topic", "api"])
+                assert first.exit_code == 0 and "Scanned" in first.output
+
+                repeat = runner.invoke(main, ["preamble", "--topic", "api"])
+                assert repeat.exit_code == 0
+                assert "Reused preamble for topic 'api'" in repeat.output
+                assert "Scanned" not in repeat.output
+                assert "def get()" in repeat.output
+
+                other = runner.invoke(main, ["preamble", "--topic", "api", "--format", "txt"])
+                assert "Reused" not in other.output
+
+                (root / "api.py").write_text("def get_all():\n    return 2\n")
+                _bump(root / "api.py")
+                changed = runner.invoke(main, ["preamble", "--topic", "api"])
+                assert "Reused" not in changed.output
+                assert "def get_all()" in changed.output
+
+                (root / "docs").mkdir()
+                assert "Reused" not in runner.invoke(main, ["preamble", "--topic", "api"]).output
+                assert "Reused" in runner.invoke(main, ["preamble", "--topic", "api"]).output
+                (root / "docs" / "api.md").write_text("# API guide\n")
+                assert "Reused" not in runner.invoke(main, ["preamble", "--topic", "api"]).output
+
+                assert "Reused" in runner.invoke(main, ["preamble", "--topic", "api"]).output
+                (root / ".git" / "info" / "exclude").write_text("docs/\n")
+                excluded = runner.invoke(main, ["preamble", "--topic", "api"])
+                assert "Reused" not in excluded.output
+                assert "API guide" not in excluded.output
+
+                runner.invoke(main, ["update", "--set", "project.owner=team"])
+                assert "Reused" not in runner.invoke(main, ["preamble", "--topic", "api"]).output
+                assert "Reused" not in runner.invoke(main, ["preamble", "--topic", "api", "--no-memo"]).output
+            finally:
+                os.chdir(original_cwd)
+
+    def test_edit_outside_the_listing_invalidates(self):
+        """Test that a file which ranked nowhere still invalidates the memo when edited."""
+        runner = CliRunner()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "src").mkdir()
+            for number in range(70):
+                (root / "src" / f"m{number:02d}.py").write_text(f"value_{number} = {number}\n")
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                runner.invoke(main, ["init"])
+                first = runner.invoke(main, ["preamble", "--topic", "api"])
+                assert "m69.py" not in first.output
+
+                (root / "src" / "m69.py").write_text("def api_handler():\n    pass\n")
+                _bump(root / "src" / "m69.py")
+                result = runner.invoke(main, ["preamble", "--topic", "api"])
+                assert "Reused" not in result.output
+                assert "api_handler" in result.output
+            finally:
+                os.chdir(original_cwd)
+
+    def test_memo_is_stored_as_json_and_text(self):
+        """Test the memo holds no pickles and no leftover temporary files."""
+        runner = CliRunner()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "README.md").write_text("# Demo\n")
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                runner.invoke(main, ["init"])
+                result = runner.invoke(main, ["preamble", "--topic", "api"])
+
+                names = sorted(path.suffix for path in get_memo_directory_path(root).iterdir())
+                assert names == [".json", ".txt"]
+                (text,) = get_memo_directory_path(root).glob("*.txt")
+                assert text.read_text() in result.output
+
+                text.unlink()
+                assert "Reused" not in runner.invoke(main, ["preamble", "--topic", "api"]).output
+            finally:
+                os.chdir(original_cwd)
+
+    def test_output_file_is_not_rewritten_on_hit(self):
+        """Test that an identical output file is left untouched."""
+        runner = CliRunner()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "README.md").write_text("# Demo\n")
+            original_cwd = os.getcwd()
+            try:
+                os.chdir(temp_dir)
+                runner.invoke(main, ["init"])
+                runner.invoke(main, ["preamble", "--topic", "api", "-o", "out.md"])
+                mtime = os.stat("out.md").st_mtime_ns
+
+                result = runner.invoke(main, ["preamble", "--topic", "api", "-o", "out.md"])
+                assert "Reused" in result.output
+                assert os.stat("out.md").st_mtime_ns == mtime
+
+                os.remove("out.md")
+                result = runner.invoke(main, ["preamble", "--topic", "api", "-o", "out.md"])
+                assert "Demo" in Path("out.md").read_text()
+            finally:
+                os.chdir(original_cwd)
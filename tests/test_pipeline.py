@@ -0,0 +1,128 @@
+"""Tests for the file ingestion pipeline."""
+
+import tempfile
+from pathlib import Path
+
+from ai_assist.pipeline import (
+    PipelineStats,
+    _bounded_map,
+    classify_language,
+    extract_item,
+    run_pipeline,
+)
+
+
+class TestClassify:
+    """Test cases for language classification."""
+
+    def test_known_extensions(self):
+        """Test classification by extension and special names."""
+        assert classify_language("src/app.py") == "python"
+        assert classify_language("web/index.TSX") == "typescript"
+        assert classify_language("Makefile") == "make"
+        assert classify_language("data.bin") is None
+
+
+class TestExtract:
+    """Test cases for metadata extraction."""
+
+    def test_python_docstring_headline(self):
+        """Test headline comes from the module docstring."""
+        meta = extract_item("a.py", "python", '"""Handles the API layer."""\n\nx = 1\n')
+        assert meta["language"] == "python"
+        assert meta["lines"] == 3
+        assert meta["headline"] == "Handles the API layer."
+        assert meta["tokens"] > 0
+
+    def test_markdown_heading_headline(self):
+        """Test headline comes from the first markdown heading."""
+        meta = extract_item("README.md", "markdown", "\n# My Project\n\nText\n")
+        assert meta["headline"] == "My Project"
+
+
+class TestBoundedMap:
+    """Test cases for the bounded in-flight window."""
+
+    def test_preserves_order_inline(self):
+        """Test inline mapping preserves input order."""
+        results = list(_bounded_map(None, lambda x: x * 2, [1, 2, 3], 2))
+        assert results == [(1, 2), (2, 4), (3, 6)]
+
+    def test_limits_items_pulled_ahead(self):
+        """Test that no more than ``limit`` items are pulled ahead of the consumer."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        pulled = []
+
+        def source():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            stream = _bounded_map(pool, lambda x: x, source(), 4)
+            next(stream)
+            assert len(pulled) <= 4
+
+
+class TestRunPipeline:
+    """Test cases for the end-to-end pipeline."""
+
+    def _make_tree(self, root: Path):
+        (root / "a.py").write_text('"""Module a."""\n')
+        (root / "b.md").write_text("# Bee\n")
+        (root / "blob.bin").write_bytes(b"\x00\x01\x02")
+
+    def test_inline_pipeline(self):
+        """Test the single-job pipeline extracts text files and skips binaries."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._make_tree(temp_path)
+
+            stats = PipelineStats()
+            results = dict(run_pipeline(temp_path, ["a.py", "b.md", "blob.bin"], jobs=1, stats=stats))
+
+            assert results["a.py"]["headline"] == "Module a."
+            assert results["b.md"]["headline"] == "Bee"
+            assert results["blob.bin"] is None
+            assert stats.files_discovered == 3
+            assert stats.files_extracted == 2
+            assert stats.files_skipped == 1
+            assert stats.bytes_read > 0
+
+    def test_parallel_pipeline_matches_inline(self):
+        """Test that thread and process pools produce the same results."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            self._make_tree(temp_path)
+            paths = ["a.py", "b.md", "blob.bin"]
+
+            inline = dict(run_pipeline(temp_path, paths, jobs=1))
+            parallel = dict(run_pipeline(temp_path, paths, jobs=2, queue_size=1))
+            assert inline == parallel
+
+
+class TestReadStage:
+    """Test cases for skipping and truncating in the read stage."""
+
+    def test_skips_lockfiles_and_truncates_large_files(self):
+        """Test lockfiles are skipped and oversized text is extracted from its prefix."""
+        from ai_assist import pipeline
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "package-lock.json").write_text('{"lockfileVersion": 3}\n')
+            (root / "dump.sql").write_text("-- Seed data\n" + "INSERT INTO t VALUES (1);\n" * 20000)
+
+            original = pipeline.MAX_EXTRACT_BYTES
+            pipeline.MAX_EXTRACT_BYTES = 64 * 1024
+            try:
+                stats = PipelineStats()
+                results = dict(run_pipeline(root, ["package-lock.json", "dump.sql"], jobs=1, stats=stats))
+            finally:
+                pipeline.MAX_EXTRACT_BYTES = original
+
+            assert results["package-lock.json"] is None
+            assert results["dump.sql"]["headline"] == "Seed data"
+            assert results["dump.sql"]["lines"] < 20000
+            assert stats.files_skipped == 1
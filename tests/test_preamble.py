@@ -0,0 +1,85 @@
+"""Tests for token-budgeted preamble assembly."""
+
+import tempfile
+from pathlib import Path
+
+from ai_assist.context_manager import LazyContext
+from ai_assist.preamble import (
+    Section,
+    assemble_preamble,
+    build_sections,
+    score_file,
+    select_sections,
+    topic_terms,
+)
+from ai_assist.scanner import FileIndex, FileRecord
+
+
+def _section(key, tokens, value, required=False):
+    return Section(key, key, tokens, value, lambda: key, required=required)
+
+
+class TestSelectSections:
+    """Test cases for budgeted selection."""
+
+    def test_greedy_by_density(self):
+        """Test that denser sections are preferred within the budget."""
+        sections = [_section("a", 50, 10), _section("b", 10, 5), _section("c", 10, 4)]
+        chosen = select_sections(sections, 25)
+        assert [s.key for s in chosen] == ["b", "c"]
+
+    def test_single_best_beats_poor_greedy(self):
+        """Test the best single section replaces a low-value greedy fill."""
+        sections = [_section("tiny", 1, 2), _section("big", 100, 150)]
+        chosen = select_sections(sections, 100)
+        assert [s.key for s in chosen] == ["big"]
+
+    def test_required_first_and_order_preserved(self):
+        """Test required sections are kept and output keeps input order."""
+        sections = [_section("ctx", 20, 1, required=True), _section("x", 5, 3), _section("y", 5, 9)]
+        chosen = select_sections(sections, 30)
+        assert [s.key for s in chosen] == ["ctx", "x", "y"]
+
+    def test_budget_never_exceeded(self):
+        """Test the selection respects the budget."""
+        sections = [_section(str(i), 7 + i, i + 1) for i in range(20)]
+        chosen = select_sections(sections, 60)
+        assert sum(s.tokens for s in chosen) <= 60
+
+
+class TestScoring:
+    """Test cases for topic relevance."""
+
+    def test_topic_terms(self):
+        """Test topic splitting."""
+        assert topic_terms("Data-Pipeline") == ["data", "pipeline"]
+
+    def test_path_and_headline_matches(self):
+        """Test path segments and headlines add to the score."""
+        api = FileRecord("src/api/routes.py", 0, 0, "d", {"headline": "HTTP api routes"})
+        other = FileRecord("src/db.py", 0, 0, "d", {"headline": "Database"})
+        assert score_file(api, ["api"]) > score_file(other, ["api"]) == 0
+
+
+class TestAssemble:
+    """Test cases for end-to-end assembly."""
+
+    def test_relevant_file_included_within_budget(self):
+        """Test that topic files are included and token counts are memoized."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "api.py").write_text("def handler():\n    return 1\n")
+            index = FileIndex(temp_path / "index.json")
+            index.put(FileRecord("api.py", 0, 0, "d", {"language": "python", "headline": ""}))
+
+            sections = build_sections(temp_path, index, "api", context=LazyContext.from_document({"project": {"name": "demo"}}))
+            assert index.get("api.py").meta["tokens"] > 0
+
+            text = assemble_preamble("api", sections, 1000)
+            assert text.startswith("# Project Preamble: api")
+            assert "## Context: project" in text
+            assert "name: demo" in text
+            assert "def handler()" in text
+
+            small = assemble_preamble("api", sections, 30)
+            assert "def handler()" not in small
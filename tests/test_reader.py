@@ -0,0 +1,58 @@
+"""Tests for the bounded, sniffing file reader."""
+
+import tempfile
+from pathlib import Path
+
+from ai_assist.reader import MMAP_THRESHOLD, read_source, read_text, sniff
+
+
+class TestSniff:
+    """Test cases for binary, lockfile and minified detection."""
+
+    def test_sniff(self):
+        """Test classification from names and leading bytes."""
+        assert sniff("app.py", b"import os\n") is None
+        assert sniff("logo.png", b"\x89PNG\r\n\x1a\n\x00\x00") == "binary"
+        assert sniff("web/package-lock.json", b"{}") == "lockfile"
+        assert sniff("dist/app.min.js", b"var a=1;") == "minified"
+        assert sniff("dist/app.js", b"var a=1;" * 1000) == "minified"
+        assert sniff("notes.md", b"a reasonably long line of prose\n" * 200) is None
+
+
+class TestReadSource:
+    """Test cases for reading, memory-mapping and truncation."""
+
+    def test_small_file(self):
+        """Test that small text files are decoded whole."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "a.py"
+            path.write_bytes("print('héllo')\n".encode())
+
+            source = read_source(path, 1024)
+            assert source.text == "print('héllo')\n"
+            assert not source.truncated
+            assert read_text(Path(temp_dir) / "missing.py", 1024) == ""
+
+    def test_large_file_is_mapped_and_truncated_at_line_break(self):
+        """Test that large files are cut at a line break below the limit."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "big.sql"
+            line = b"INSERT INTO t VALUES (1, 'some row data');\n"
+            path.write_bytes(line * (2 * MMAP_THRESHOLD // len(line)))
+
+            source = read_source(path, MMAP_THRESHOLD)
+            assert source.truncated
+            assert source.size <= MMAP_THRESHOLD
+            assert source.text.endswith("\n")
+            assert source.text.count("\n") == source.size // len(line)
+
+    def test_large_binary_is_skipped_without_decoding(self):
+        """Test that a large binary file is skipped after sniffing its head."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "asset.bin"
+            path.write_bytes(b"\x00\x01" * MMAP_THRESHOLD)
+
+            source = read_source(path, 1024 * 1024)
+            assert source.skipped == "binary"
+            assert source.text is None
+            assert source.size <= 8192
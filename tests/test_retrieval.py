@@ -0,0 +1,179 @@
+"""Tests for the local retrieval index."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from ai_assist.context_manager import LazyContext
+from ai_assist.preamble import build_sections
+from ai_assist.retrieval import (
+    ChunkIndex,
+    _shard_of,
+    count_terms,
+    get_retrieval_index_path,
+    identifier_terms,
+    refresh_index,
+    split_chunks,
+)
+from ai_assist.scanner import FileIndex, get_index_path, scan_project
+
+
+def _index_project(root):
+    """Scan a project and attach minimal extraction metadata."""
+    index = FileIndex.load(get_index_path(root))
+    scan_project(root, index)
+    for record in index:
+        language = "markdown" if record.path.endswith(".md") else "python"
+        index.set_meta(record.path, {"language": language})
+    return index
+
+
+class TestTerms:
+    """Test cases for identifier tokenization and chunking."""
+
+    def test_identifier_parts(self):
+        """Test camelCase and snake_case identifiers yield their parts."""
+        assert identifier_terms("getUserName") == ("getusername", "get", "user", "name")
+        assert identifier_terms("HTTPServer") == ("httpserver", "http", "server")
+        assert identifier_terms("max_retries") == ("max_retries", "max", "retries")
+        assert identifier_terms("x") == ()
+
+    def test_count_terms(self):
+        """Test term frequencies count every occurrence."""
+        counts = count_terms("load_file(path); load_file(other)")
+        assert counts["load_file"] == 2
+        assert counts["load"] == 2
+        assert counts["path"] == 1
+
+    def test_split_at_definitions(self):
+        """Test code is chunked at top-level definitions only."""
+        text = "import os\n\ndef a():\n    def inner():\n        pass\n\nclass B:\n    pass\n"
+        assert split_chunks(text, "python") == [
+            (1, 2, "import os"),
+            (3, 6, "def a():"),
+            (7, 8, "class B:"),
+        ]
+
+    def test_split_docs_at_headings(self):
+        """Test documentation is chunked at headings."""
+        text = "# Title\nintro\n## Usage\nrun it\n"
+        assert split_chunks(text, "markdown") == [(1, 2, "# Title"), (3, 4, "## Usage")]
+
+
+class TestChunkIndex:
+    """Test cases for building, querying and updating the index."""
+
+    def test_search_ranks_relevant_chunks(self):
+        """Test BM25 ranks the chunk mentioning the query terms first."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "api.py").write_text("def handle_request(request):\n    return api_response(request)\n")
+            (root / "db.py").write_text("def open_connection(url):\n    return connect(url)\n")
+
+            index, changed = refresh_index(root, _index_project(root))
+            assert changed == 2
+
+            hits = index.search("request handler")
+            assert hits[0].chunk.source == "api.py"
+            assert hits[0].chunk.title == "def handle_request(request):"
+            assert index.source_scores("connection") == {"db.py": 1.0}
+
+    def test_incremental_update(self):
+        """Test only changed sources are re-indexed and stale terms disappear."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "a.py").write_text("def alpha():\n    pass\n")
+            (root / "b.py").write_text("def beta():\n    pass\n")
+            refresh_index(root, _index_project(root))
+
+            (root / "a.py").write_text("def gamma():\n    pass\n")
+            (root / "b.py").unlink()
+            index, changed = refresh_index(root, _index_project(root))
+            assert changed == 2
+
+            reloaded = ChunkIndex.load(get_retrieval_index_path(root))
+            assert reloaded.source_scores("alpha") == {}
+            assert reloaded.source_scores("beta") == {}
+            assert reloaded.source_scores("gamma") == {"a.py": 1.0}
+            assert reloaded.live_count == 1
+
+            _, changed = refresh_index(root, _index_project(root))
+            assert changed == 0
+
+    def test_edit_rewrites_only_affected_shards(self):
+        """Test that editing one file leaves shards without its terms untouched."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            for name in ("billing", "shipping", "accounts", "reports"):
+                (root / f"{name}.py").write_text(f"def {name}_total(items):\n    return sum_{name}(items)\n")
+            (root / "a.py").write_text("def alpha():\n    pass\n")
+            refresh_index(root, _index_project(root))
+            directory = get_retrieval_index_path(root)
+
+            def stamps():
+                return {path.name: (path.stat().st_ino, path.stat().st_mtime_ns) for path in directory.glob("postings-*.dat")}
+
+            before = stamps()
+            (root / "a.py").write_text("def gamma():\n    pass\n")
+            _, changed = refresh_index(root, _index_project(root))
+            assert changed == 1
+
+            terms = count_terms("def alpha def gamma pass a py")
+            affected = {f"postings-{_shard_of(term):02d}.dat" for term in terms}
+            untouched = [name for name in before if name not in affected]
+            assert untouched
+            after = stamps()
+            assert all(after[name] == before[name] for name in untouched)
+
+    def test_index_files_are_data_only(self):
+        """Test the index is stored without pickles and legacy pickles are replaced."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "a.py").write_text("def alpha():\n    pass\n")
+            directory = get_retrieval_index_path(root)
+            directory.mkdir(parents=True)
+            (directory / "manifest.pickle").write_bytes(b"\x80\x05not a manifest")
+
+            refresh_index(root, _index_project(root))
+            assert not list(directory.glob("*.pickle"))
+            header = (directory / "manifest.dat").read_bytes().partition(b"\n")[0]
+            assert json.loads(header)["sources"]["a.py"][1] == [0]
+
+            (directory / "manifest.dat").write_bytes(b"{}\ngarbage")
+            _, changed = refresh_index(root, _index_project(root))
+            assert changed == 1
+
+    def test_context_sections_are_indexed(self):
+        """Test AI_CONTEXT sections are searchable as their own sources."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            context = LazyContext.from_document({"topics": {"billing": "Stripe webhooks"}})
+
+            index, _ = refresh_index(root, FileIndex(get_index_path(root)), context)
+            assert index.source_scores("webhooks") == {"context:topics": 1.0}
+
+    def test_ranking_feeds_preamble_selection(self):
+        """Test retrieval scores make files relevant beyond path matches."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "server.py").write_text("def payment_webhook():\n    pass\n")
+            (root / "util.py").write_text("def helper():\n    pass\n")
+            file_index = _index_project(root)
+            index, _ = refresh_index(root, file_index)
+
+            sections = build_sections(root, file_index, "payment", ranking=index.source_scores("payment"))
+            assert [s.key for s in sections if s.key.startswith("file:")] == ["file:server.py"]
+
+    def test_vectors_with_numpy(self):
+        """Test hashed n-gram vectors match near-miss terms when numpy is installed."""
+        pytest.importorskip("numpy")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "auth.py").write_text("def authenticate_user():\n    pass\n")
+            (root / "db.py").write_text("def open_connection():\n    pass\n")
+            refresh_index(root, _index_project(root))
+
+            index = ChunkIndex.load(get_retrieval_index_path(root))
+            assert "auth.py" in index.source_scores("authentication")
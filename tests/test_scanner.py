@@ -0,0 +1,144 @@
+"""Tests for the incremental project scanner."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from ai_assist.scanner import FileIndex, get_index_path, hash_file, scan_project
+
+
+class TestScanProject:
+    """Test cases for incremental scanning."""
+
+    def test_first_scan_adds_all_files(self):
+        """Test that every file is reported as added on the first scan."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "README.md").write_text("hello")
+            (temp_path / "src").mkdir()
+            (temp_path / "src" / "app.py").write_text("print('hi')")
+
+            result = scan_project(temp_path)
+            assert sorted(result.added) == ["README.md", "src/app.py"]
+            assert result.modified == []
+            assert result.removed == []
+
+    def test_excluded_directories_are_skipped(self):
+        """Test that .git and AI directories are never scanned."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / ".git").mkdir()
+            (temp_path / ".git" / "HEAD").write_text("ref")
+            (temp_path / "AI").mkdir()
+            (temp_path / "AI" / "AI_CONTEXT.yaml").write_text("x")
+            (temp_path / "main.py").write_text("x = 1")
+
+            result = scan_project(temp_path)
+            assert [rec.path for rec in result.files] == ["main.py"]
+
+    def test_repeat_scan_reuses_fingerprints(self):
+        """Test that an unchanged tree is not re-hashed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "a.py").write_text("a = 1")
+
+            index = FileIndex.load(get_index_path(temp_path))
+            scan_project(temp_path, index)
+            index.save()
+
+            index = FileIndex.load(get_index_path(temp_path))
+            result = scan_project(temp_path, index)
+            assert result.changed == []
+            assert result.bytes_hashed == 0
+            assert result.unchanged_count == 1
+            assert not index.dirty
+
+    def test_modified_and_removed_files(self):
+        """Test detection of modified and removed files."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "a.py").write_text("a = 1")
+            (temp_path / "b.py").write_text("b = 1")
+
+            index = FileIndex.load(get_index_path(temp_path))
+            scan_project(temp_path, index)
+
+            (temp_path / "a.py").write_text("a = 22")
+            (temp_path / "b.py").unlink()
+
+            result = scan_project(temp_path, index)
+            assert result.modified == ["a.py"]
+            assert result.removed == ["b.py"]
+            assert index.get("a.py").digest == hash_file(temp_path / "a.py")
+
+    def test_touch_without_content_change(self):
+        """Test that a touched file with identical content is not reported as modified."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            target = temp_path / "a.py"
+            target.write_text("a = 1")
+
+            index = FileIndex.load(get_index_path(temp_path))
+            scan_project(temp_path, index)
+
+            st = target.stat()
+            os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+            result = scan_project(temp_path, index)
+            assert result.modified == []
+            assert index.get("a.py").mtime_ns == st.st_mtime_ns + 10_000_000
+
+
+class TestFileIndex:
+    """Test cases for index persistence."""
+
+    def test_load_missing_index(self):
+        """Test that a missing index loads empty."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = FileIndex.load(Path(temp_dir) / "missing.json")
+            assert len(index) == 0
+
+    def test_load_corrupt_index(self):
+        """Test that a corrupt index is discarded."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "index.json"
+            path.write_text("{not json")
+            assert len(FileIndex.load(path)) == 0
+
+    def test_save_creates_cache_directory(self):
+        """Test that saving creates AI/.cache as needed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "a.py").write_text("a = 1")
+
+            index = FileIndex.load(get_index_path(temp_path))
+            scan_project(temp_path, index)
+            index.save()
+
+            assert get_index_path(temp_path).exists()
+            assert FileIndex.load(get_index_path(temp_path)).get("a.py") is not None
+
+    def test_lazy_lookups_and_directory_ranges(self):
+        """Test point lookups and prefix scans on a loaded index with pending changes."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "src").mkdir()
+            (temp_path / "src" / "a.py").write_text("a = 1")
+            (temp_path / "src" / "b.py").write_text("b = 1")
+            (temp_path / "setup.py").write_text("")
+
+            index = FileIndex.load(get_index_path(temp_path))
+            scan_project(temp_path, index)
+            index.save()
+
+            index = FileIndex.load(get_index_path(temp_path))
+            index.remove("src/b.py")
+            index.set_meta("src/a.py", {"headline": "A"})
+            assert index.get("src/a.py").meta == {"headline": "A"}
+            assert [record.path for record in index.under("src")] == ["src/a.py"]
+            assert len(index) == 2
+            index.save()
+
+            reloaded = FileIndex.load(get_index_path(temp_path))
+            assert reloaded.get("src/b.py") is None
+            assert reloaded.get("src/a.py").meta == {"headline": "A"}
@@ -0,0 +1,98 @@
+"""Startup regression tests: heavy modules must not load for light commands."""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import click
+
+
+HEAVY_MODULES = [
+    "yaml",
+    "jinja2",
+    "multiprocessing",
+    "concurrent.futures",
+    "ai_assist.scanner",
+    "ai_assist.pipeline",
+    "ai_assist.preamble",
+    "ai_assist.logstore",
+]
+
+PROBE = """
+import json, sys
+from ai_assist.cli import main
+try:
+    main(sys.argv[1:], standalone_mode=False)
+except SystemExit:
+    pass
+print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)), file=sys.stderr)
+"""
+
+
+def _loaded_heavy_modules(args, cwd):
+    """Run the CLI in a fresh interpreter and report heavy modules it imported."""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(heavy=HEAVY_MODULES), *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+class TestStartup:
+    """Test cases for lazy command loading."""
+
+    def test_version_imports_nothing_heavy(self):
+        """Test --version loads no subcommand dependencies."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            assert _loaded_heavy_modules(["--version"], temp_dir) == []
+
+    def test_status_skips_yaml_on_cache_hit(self):
+        """Test status on an initialized project avoids yaml and the scanner."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            Path(temp_dir, "README.md").touch()
+            subprocess.run(
+                [sys.executable, "-c", "from ai_assist.cli import main; main(['init'])"],
+                cwd=temp_dir,
+                capture_output=True,
+                env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            )
+            assert _loaded_heavy_modules(["status"], temp_dir) == []
+
+    def test_memoized_preamble_imports_nothing_heavy(self):
+        """Test a repeat preamble served from the memo skips the scanner and templates."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            Path(temp_dir, "README.md").write_text("# Demo\n")
+            for args in (["init"], ["preamble", "--topic", "api"]):
+                subprocess.run(
+                    [sys.executable, "-c", f"from ai_assist.cli import main; main({args!r})"],
+                    cwd=temp_dir,
+                    capture_output=True,
+                    env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+                )
+            assert _loaded_heavy_modules(["preamble", "--topic", "api"], temp_dir) == []
+
+    def test_help_lists_lazy_commands(self):
+        """Test lazy commands are still listed and resolvable."""
+        from ai_assist.cli import LAZY_COMMANDS, main
+
+        ctx = click.Context(main)
+        assert set(LAZY_COMMANDS) <= set(main.list_commands(ctx))
+        for name in LAZY_COMMANDS:
+            assert main.get_command(ctx, name).name == name
+
+    def test_client_entry_point_is_light(self):
+        """Test the console entry point loads neither click nor core before forwarding."""
+        result = subprocess.run(
+            [sys.executable, "-c",
+             "import sys, ai_assist.client; print(sorted(m for m in ('click', 'ai_assist.core') if m in sys.modules))"],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+        assert result.stdout.strip() == "[]"
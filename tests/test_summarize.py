@@ -0,0 +1,162 @@
+"""Tests for structural file summaries."""
+
+import json
+import tempfile
+from pathlib import Path
+
+from ai_assist.pipeline import PipelineStats
+from ai_assist.preamble import build_sections
+from ai_assist.summarize import (
+    SUMMARIZERS,
+    SummaryCache,
+    get_summary_cache_path,
+    register_summarizer,
+    summarize_records,
+    summarize_text,
+)
+from ai_assist.scanner import FileIndex, get_index_path, scan_project
+
+
+PYTHON_SOURCE = '''"""Billing helpers.
+
+More detail here.
+"""
+
+MAX_RETRIES = 3
+_cache = {}
+
+
+class Invoice(Base):
+    """An invoice."""
+
+    total: int
+
+    def pay(self, amount: int) -> bool:
+        """Pay the invoice."""
+        return True
+
+    def _internal(self):
+        pass
+
+
+async def fetch(url, *, timeout=10): 
+    return await get(url)
+'''
+
+
+class TestSummarizers:
+    """Test cases for the per-language summarizers."""
+
+    def test_python_outline(self):
+        """Test Python summaries keep signatures and first docstring lines."""
+        assert summarize_text("billing.py", "python", PYTHON_SOURCE) == "\n".join([
+            '"""Billing helpers."""',
+            "MAX_RETRIES = 3",
+            "class Invoice(Base):",
+            '    """An invoice."""',
+            "    total: int",
+            "    def pay(self, amount: int) -> bool:",
+            '        """Pay the invoice."""',
+            "async def fetch(url, *, timeout=10): ...",
+        ])
+
+    def test_python_syntax_error_falls_back(self):
+        """Test unparsable Python still yields its definition lines."""
+        text = "def ok(a):\n    pass\nx = (\ndef other(b):\n"
+        assert summarize_text("x.py", "python", text) == "def ok(a):\ndef other(b):"
+
+    def test_typescript_outline(self):
+        """Test TypeScript declarations are kept without bodies."""
+        text = (
+            "export class Api extends Base {\n"
+            "  async get(id: string): Promise<User> {\n"
+            "    if (id) {\n"
+            "    }\n"
+            "  }\n"
+            "}\n"
+            "export interface User {\n"
+            "  id: string;\n"
+            "}\n"
+        )
+        assert summarize_text("api.ts", "typescript", text) == (
+            "export class Api extends Base\n"
+            "  async get(id: string): Promise<User>\n"
+            "export interface User"
+        )
+
+    def test_go_outline(self):
+        """Test Go packages, types and functions are kept."""
+        text = "package server\n\ntype Server struct {\n}\n\nfunc (s *Server) Start() error {\n\treturn nil\n}\n"
+        assert summarize_text("s.go", "go", text) == "package server\ntype Server struct\nfunc (s *Server) Start() error"
+
+    def test_unsupported_language(self):
+        """Test unsupported languages produce no summary."""
+        assert summarize_text("a.css", "css", "body {}") == ""
+
+    def test_register_summarizer(self):
+        """Test custom summarizers can be plugged in."""
+        try:
+            register_summarizer("sql")(lambda text: text.splitlines()[0])
+            assert summarize_text("a.sql", "sql", "CREATE TABLE t;\nINSERT 1;") == "CREATE TABLE t;"
+        finally:
+            SUMMARIZERS.pop("sql", None)
+
+
+class TestSummarizeRecords:
+    """Test cases for cached summarization of project files."""
+
+    def test_only_changed_files_are_parsed(self):
+        """Test summaries are cached by content hash across runs."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "a.py").write_text("def a(): pass\n")
+            (root / "b.py").write_text("def b(): pass\n")
+            (root / "notes.css").write_text("body {}\n")
+            index = FileIndex.load(get_index_path(root))
+            scan_project(root, index)
+
+            cache = SummaryCache.load(get_summary_cache_path(root))
+            summaries = summarize_records(root, index, cache, jobs=1)
+            cache.save()
+            assert summaries == {"a.py": "def a(): ...", "b.py": "def b(): ..."}
+
+            (root / "b.py").write_text("def b2(): pass\n")
+            scan_project(root, index)
+            stats = PipelineStats()
+            cache = SummaryCache.load(get_summary_cache_path(root))
+            summaries = summarize_records(root, index, cache, jobs=1, stats=stats)
+            assert stats.files_discovered == 1
+            assert summaries["b.py"] == "def b2(): ..."
+            assert len(cache) == 2
+
+    def test_cache_is_plain_json(self):
+        """Test the cache is stored as JSON and replaces a legacy pickle."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = get_summary_cache_path(temp_dir)
+            path.parent.mkdir(parents=True)
+            path.with_name("summaries.pickle").write_bytes(b"\x80\x05legacy")
+
+            cache = SummaryCache.load(path)
+            cache.put("abc:python", "def a(): ...")
+            cache.save()
+            assert json.loads(path.read_text())["entries"] == {"abc:python": "def a(): ..."}
+            assert not path.with_name("summaries.pickle").exists()
+            assert SummaryCache.load(path).get("abc:python") == "def a(): ..."
+
+            path.write_text('{"version": 2, "entries": [], "used": {}}')
+            assert len(SummaryCache.load(path)) == 0
+
+    def test_outlines_replace_file_bodies(self):
+        """Test preamble sections use the outline when one is available."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "billing.py").write_text(PYTHON_SOURCE)
+            index = FileIndex.load(get_index_path(root))
+            scan_project(root, index)
+            index.set_meta("billing.py", {"language": "python", "headline": "Billing helpers."})
+
+            summaries = summarize_records(root, index, SummaryCache(get_summary_cache_path(root)), jobs=1)
+            sections = build_sections(root, index, "billing", summaries=summaries)
+            outline = [s for s in sections if s.key == "file:billing.py"][0]
+            assert outline.title == "Outline: billing.py"
+            assert outline.body.startswith('"""Billing helpers."""')
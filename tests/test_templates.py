@@ -0,0 +1,112 @@
+"""Tests for the Jinja2 preamble template subsystem."""
+
+import io
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from ai_assist.preamble import Section
+from ai_assist.templates import (
+    TemplateError,
+    clear_environments,
+    get_environment,
+    render_preamble,
+    template_names,
+)
+
+
+def _sections():
+    return [
+        Section("ctx", "Context: project", 1, 1, lambda: "name: demo\n", language="yaml"),
+        Section("files", "Relevant Files", 1, 1, lambda: "- a.py\n"),
+    ]
+
+
+class TestTemplates:
+    """Test cases for template lookup, caching and rendering."""
+
+    def setup_method(self):
+        """Start every test with fresh environments."""
+        clear_environments()
+
+    def test_template_names(self):
+        """Test topic-specific templates are tried first."""
+        assert template_names("api", "markdown") == ["preamble-api.md.j2", "preamble.md.j2"]
+        assert template_names("api", "txt")[-1] == "preamble.txt.j2"
+
+    def test_builtin_markdown(self):
+        """Test the built-in markdown layout."""
+        out = io.StringIO()
+        render_preamble(out, "api", _sections(), "markdown")
+        assert out.getvalue() == (
+            "# Project Preamble: api\n\n"
+            "## Context: project\n\n```yaml\nname: demo\n```\n\n"
+            "## Relevant Files\n\n- a.py\n"
+        )
+
+    def test_builtin_txt(self):
+        """Test the built-in plain-text layout."""
+        out = io.StringIO()
+        render_preamble(out, "api", _sections(), "txt")
+        assert "Relevant Files\n==============\n\n- a.py\n" in out.getvalue()
+
+    def test_topic_override_and_bytecode_cache(self):
+        """Test per-topic user templates win and compiled bytecode is cached."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_dir = Path(temp_dir) / "AI" / "templates"
+            template_dir.mkdir(parents=True)
+            (template_dir / "preamble-api.md.j2").write_text(
+                "API {{ topic }}:{% for s in sections %} {{ s.title }}{% endfor %}\n"
+            )
+
+            out = io.StringIO()
+            render_preamble(out, "api", _sections(), "markdown", temp_dir)
+            assert out.getvalue() == "API api: Context: project Relevant Files"
+
+            out = io.StringIO()
+            render_preamble(out, "db", _sections(), "markdown", temp_dir)
+            assert out.getvalue().startswith("# Project Preamble: db")
+
+            cache_dir = Path(temp_dir) / "AI" / ".cache" / "jinja2"
+            assert any(cache_dir.iterdir())
+
+    def test_sections_are_flushed_as_they_render(self):
+        """Test the stream is flushed before each section and at the end."""
+        class Recorder(io.StringIO):
+            def __init__(self):
+                super().__init__()
+                self.flushed = []
+
+            def flush(self):
+                self.flushed.append(self.getvalue())
+
+        out = Recorder()
+        render_preamble(out, "api", _sections(), "markdown")
+        assert out.flushed[0] == "# Project Preamble: api\n"
+        assert out.flushed[1].endswith("```\n")
+        assert out.flushed[-1] == out.getvalue()
+
+    def test_sections_support_length(self):
+        """Test user templates can still take the length of sections."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_dir = Path(temp_dir) / "AI" / "templates"
+            template_dir.mkdir(parents=True)
+            (template_dir / "preamble.md.j2").write_text("{{ sections | length }} {{ sections[1].title }}")
+            out = io.StringIO()
+            render_preamble(out, "api", _sections(), "markdown", temp_dir)
+            assert out.getvalue() == "2 Relevant Files"
+
+    def test_environment_is_reused(self):
+        """Test environments are cached per project."""
+        assert get_environment() is get_environment()
+
+    def test_syntax_error_is_reported(self):
+        """Test broken user templates raise TemplateError."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_dir = Path(temp_dir) / "AI" / "templates"
+            template_dir.mkdir(parents=True)
+            (template_dir / "preamble.md.j2").write_text("{% for %}")
+
+            with pytest.raises(TemplateError):
+                render_preamble(io.StringIO(), "api", [], "markdown", temp_dir)
@@ -0,0 +1,57 @@
+"""Tests for token counting."""
+
+import sys
+
+import pytest
+
+from ai_assist.core import AIAssistError
+from ai_assist.tokens import _load_encoder, cached_file_tokens, count_tokens, estimate_tokens
+
+
+class TestEstimate:
+    """Test cases for the fast estimator."""
+
+    def test_empty_text(self):
+        """Test that empty text has no tokens."""
+        assert estimate_tokens("") == 0
+
+    def test_estimate_scales_with_length(self):
+        """Test that the estimate is roughly four characters per token."""
+        assert estimate_tokens("a") == 1
+        assert estimate_tokens("x" * 400) == 100
+
+    def test_exact_counts_with_tiktoken(self):
+        """Test exact mode counts tokens when tiktoken is installed."""
+        pytest.importorskip("tiktoken")
+        assert count_tokens("hello world", exact=True) > 0
+
+    def test_exact_requires_tiktoken(self, monkeypatch):
+        """Test exact mode reports the missing dependency."""
+        monkeypatch.setitem(sys.modules, "tiktoken", None)
+        _load_encoder.cache_clear()
+        try:
+            with pytest.raises(AIAssistError):
+                count_tokens("hello world", exact=True)
+        finally:
+            _load_encoder.cache_clear()
+
+
+class TestCachedFileTokens:
+    """Test cases for memoized per-file counts."""
+
+    def test_count_is_memoized_in_meta(self):
+        """Test that the loader is only called when no count is stored."""
+        calls = []
+
+        def load():
+            calls.append(1)
+            return "x" * 40
+
+        meta = {"language": "python"}
+        tokens, updated = cached_file_tokens(meta, load)
+        assert tokens == 10
+        assert updated == {"language": "python", "tokens": 10}
+        assert meta == {"language": "python"}
+        assert cached_file_tokens(updated, load) == (10, None)
+        assert len(calls) == 1
+        assert cached_file_tokens(None, load) == (10, None)
@@ -0,0 +1,68 @@
+"""Tests for file change watchers."""
+
+import time
+
+import pytest
+
+from ai_assist.watch import InotifyWatcher, PollingWatcher, WatchError, open_watcher
+
+
+def _collect(watcher, expected, timeout=5.0):
+    seen = set()
+    deadline = time.monotonic() + timeout
+    while not expected <= seen and time.monotonic() < deadline:
+        seen |= watcher.poll(0.1)
+    return seen
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("a = 1\n")
+    (tmp_path / "node_modules").mkdir()
+    return tmp_path
+
+
+class TestPollingWatcher:
+    """Test cases for PollingWatcher."""
+
+    def test_reports_changes(self, tree):
+        watcher = PollingWatcher(tree, interval=0.05)
+        assert watcher.poll(0.2) == set()
+        (tree / "src" / "a.py").write_text("a = 22\n")
+        (tree / "b.py").write_text("b = 1\n")
+        (tree / "node_modules" / "x.js").write_text("x\n")
+        assert _collect(watcher, {"src/a.py", "b.py"}) == {"src/a.py", "b.py"}
+        (tree / "b.py").unlink()
+        assert _collect(watcher, {"b.py"}) == {"b.py"}
+
+
+class TestInotifyWatcher:
+    """Test cases for InotifyWatcher."""
+
+    @pytest.fixture
+    def watcher(self, tree):
+        try:
+            watcher = InotifyWatcher(tree)
+        except WatchError as e:
+            pytest.skip(str(e))
+        yield watcher
+        watcher.close()
+
+    def test_reports_changes(self, watcher, tree):
+        (tree / "src" / "a.py").write_text("a = 22\n")
+        assert "src/a.py" in _collect(watcher, {"src/a.py"})
+
+    def test_watches_new_directories(self, watcher, tree):
+        (tree / "pkg").mkdir()
+        assert "pkg" in _collect(watcher, {"pkg"})
+        (tree / "pkg" / "mod.py").write_text("m = 1\n")
+        assert "pkg/mod.py" in _collect(watcher, {"pkg/mod.py"})
+
+    def test_ignored_directories_are_not_watched(self, watcher, tree):
+        (tree / "node_modules" / "x.js").write_text("x\n")
+        assert watcher.poll(0.3) == set()
+
+
+def test_open_watcher_polling(tree):
+    assert isinstance(open_watcher(tree, polling=True), PollingWatcher)